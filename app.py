@@ -1,11 +1,13 @@
 import streamlit as st
 from pathlib import Path
 import pandas as pd
-import json
 from src.data_loader import DataLoader
 from src.validator import DataValidator
-from src.analyzer import DataAnalyzer
 from src.exporter import DataExporter
+from src.cache import load_dataset_file, load_dataset_bytes, export_dataset
+from src.dataset import OfficialsDataset, StoreDataset
+from src.sqlite_store import open_store
+from src import profiling
 
 # Set page config
 st.set_page_config(
@@ -24,11 +26,59 @@ def local_css(file_name):
 
 local_css("style.css")
 
+# Per-rerun stage timings, shown in the "Performance" expander at the bottom of the page
+profiler = profiling.Profiler().start() if st.session_state.get('profile_mode') else None
+
+def open_dataset(loaded):
+    """Session view over a shared cached dataset; additions stay private to the session"""
+    return OfficialsDataset(
+        DataLoader.get_officials(loaded.data),
+        loaded.df,
+        loaded.summary,
+        compact=st.session_state.compact_mode,
+        search_index=loaded.search_index,
+        sort_index=loaded.sort_index,
+        base_key=loaded.key
+    )
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+def paginated_table(dataset, key, positions=None, columns=None, labels=None):
+    """Show one page of a dataset's rows (all, or the given positions).
+
+    Only the visible page is read and sent to the browser; sorting uses the
+    dataset's per-column sort index (or SQL for a database), so the cost of
+    a rerun does not grow with the roster.
+    """
+    labels = labels or {}
+    columns = columns or dataset.columns
+    total = len(dataset) if positions is None else len(positions)
+    
+    sort_col, order_col, size_col, page_col = st.columns([3, 2, 2, 2])
+    with sort_col:
+        sort = st.selectbox("Sort by", [None] + columns, key=f"{key}_sort",
+                            format_func=lambda col: "Position" if col is None else labels.get(col, col))
+    with order_col:
+        descending = st.selectbox("Order", ["Ascending", "Descending"], key=f"{key}_order") == "Descending"
+    with size_col:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key=f"{key}_page_size")
+    pages = max(1, -(-total // page_size))
+    # The row count can shrink between reruns (a narrower search, a smaller file)
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    with page_col:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total)
+    with profiling.stage('page'):
+        frame = dataset.page(start, stop, positions, sort, descending)
+    st.caption(f"Rows {start + 1 if total else 0}–{stop} of {total}")
+    st.dataframe(frame.reindex(columns=columns).rename(columns=labels))
+
 # Initialize session state
-if 'officials_data' not in st.session_state:
-    st.session_state.officials_data = None
-if 'officials_df' not in st.session_state:
-    st.session_state.officials_df = None
+if 'dataset' not in st.session_state:
+    st.session_state.dataset = None
 
 # App title and description
 st.title("🏛️ Public Office Data Tracker")
@@ -40,176 +90,178 @@ A tool for collecting, organizing, and analyzing public records of elected offic
 with st.sidebar:
     st.header("Data Management")
     
+    st.checkbox(
+        "Compact memory mode",
+        key="compact_mode",
+        help="Store loaded data with categorical and flattened columns to reduce memory"
+    )
+    st.checkbox(
+        "Profile this run",
+        key="profile_mode",
+        help="Time loading, validation, export and analysis on each interaction"
+    )
+    
     # File uploader
     uploaded_file = st.file_uploader(
-        "Upload JSON file", 
-        type=["json"],
-        help="Upload a JSON file containing officials data"
+        "Upload data file", 
+        type=["json", "parquet", "arrow", "feather"],
+        help="Upload a JSON, Parquet or Arrow file containing officials data"
     )
     
-    # Load default data button
+    # Load default data button; datasets are cached and shared across sessions
     if st.button("Load Sample Data"):
         try:
-            data = DataLoader.load_json("data/officials.json")
-            validator = DataValidator("data/schema.json")
+            loaded = load_dataset_file("data/officials.json", "data/schema.json",
+                                       compact=st.session_state.compact_mode)
             
-            if validator.validate_data(data):
-                st.session_state.officials_data = data
-                officials_list = DataLoader.get_officials(data)
-                st.session_state.officials_df = DataAnalyzer.officials_to_dataframe(officials_list)
+            if loaded.report.valid:
+                st.session_state.dataset = open_dataset(loaded)
                 st.success("Sample data loaded successfully!")
             else:
                 st.error("Sample data validation failed")
         except Exception as e:
             st.error(f"Error loading sample data: {str(e)}")
     
+    # Open a Parquet/Arrow snapshot from disk; Arrow files are memory-mapped
+    snapshot_path = st.text_input("Snapshot path (.parquet/.arrow)")
+    if snapshot_path and st.button("Open Snapshot"):
+        try:
+            loaded = load_dataset_file(snapshot_path, "data/schema.json",
+                                       compact=st.session_state.compact_mode)
+            
+            if loaded.report.valid:
+                st.session_state.dataset = open_dataset(loaded)
+                st.success(f"Snapshot loaded: {len(loaded.df)} officials")
+            else:
+                st.error("Snapshot validation failed")
+        except Exception as e:
+            st.error(f"Error opening snapshot: {str(e)}")
+    
+    # Open a SQLite database built with main.py --sqlite; it stays on disk and is shared by all sessions
+    db_path = st.text_input("SQLite database path")
+    if db_path and st.button("Open Database"):
+        try:
+            if not Path(db_path).exists():
+                raise FileNotFoundError(f"File not found: {db_path}")
+            store = open_store(db_path)
+            if len(store) == 0:
+                st.error("The database holds no officials")
+            else:
+                st.session_state.dataset = StoreDataset(store, compact=st.session_state.compact_mode)
+                st.success(f"Database opened: {len(store)} officials")
+        except Exception as e:
+            st.error(f"Error opening database: {str(e)}")
+    
     # Export options
-    if st.session_state.officials_data:
+    if st.session_state.dataset is not None:
         st.header("Export Options")
         export_format = st.selectbox(
             "Select export format",
-            ["CSV", "JSON"]
+            ["CSV", "JSON", "Parquet", "Arrow"]
+        )
+        compression = st.selectbox(
+            "Compression",
+            [None] + DataExporter.available_compressions(),
+            format_func=lambda name: "None" if name is None else name,
+            help="Compress large exports to cut download size"
         )
         
+        # Built in memory and cached per dataset version, so repeat downloads are free
         if st.button(f"Export as {export_format}"):
             try:
-                officials = DataLoader.get_officials(st.session_state.officials_data)
-                if export_format == "CSV":
-                    DataExporter.export_to_csv(officials, "officials_export.csv")
-                    with open("officials_export.csv", "rb") as f:
-                        st.download_button(
-                            "Download CSV",
-                            f,
-                            file_name="officials_export.csv"
-                        )
-                else:
-                    DataExporter.export_to_json(officials, "officials_export.json")
-                    with open("officials_export.json", "rb") as f:
-                        st.download_button(
-                            "Download JSON",
-                            f,
-                            file_name="officials_export.json"
-                        )
-                st.success(f"Data exported to {export_format} successfully!")
+                exported = export_dataset(st.session_state.dataset, export_format.lower(), compression,
+                                          "data/schema.json")
+                st.download_button(
+                    f"Download {export_format}",
+                    exported.data,
+                    file_name=exported.file_name
+                )
+                st.success(f"Data exported to {export_format} successfully! ({exported.nbytes / 1024:,.1f} KiB)")
             except Exception as e:
                 st.error(f"Export failed: {str(e)}")
 
 # Main content area
 if uploaded_file is not None:
     try:
-        data = json.load(uploaded_file)
-        validator = DataValidator("data/schema.json")
+        loaded = load_dataset_bytes(uploaded_file.getvalue(), uploaded_file.name,
+                                    "data/schema.json", compact=st.session_state.compact_mode)
         
-        if validator.validate_data(data):
-            st.session_state.officials_data = data
-            officials_list = DataLoader.get_officials(data)
-            st.session_state.officials_df = DataAnalyzer.officials_to_dataframe(officials_list)
-            st.success("File uploaded and validated successfully!")
-        else:
+        # Keep this session's additions unless a different file was uploaded
+        upload_key = (uploaded_file.file_id, st.session_state.compact_mode)
+        if not loaded.report.valid:
             st.error("Data validation failed")
+            for line in loaded.report.summary():
+                st.caption(line)
+        elif st.session_state.get('upload_key') != upload_key:
+            st.session_state.dataset = open_dataset(loaded)
+            st.session_state.upload_key = upload_key
+            st.success("File uploaded and validated successfully!")
     except Exception as e:
         st.error(f"Error processing file: {str(e)}")
 
-if st.session_state.officials_df is not None:
+if st.session_state.dataset is not None:
+    dataset = st.session_state.dataset
+    summary = dataset.summary
     st.header("Data Overview")
     
     # Show raw data
     if st.checkbox("Show raw data"):
-        st.dataframe(st.session_state.officials_df)
+        paginated_table(dataset, "raw")
     
-    # Statistics with column existence checks
+    # Statistics from the dataset's running counters
     st.subheader("Basic Statistics")
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Total Officials", len(st.session_state.officials_df))
+        st.metric("Total Officials", len(dataset))
     
     with col2:
-        if 'party' in st.session_state.officials_df.columns:
-            unique_parties = st.session_state.officials_df['party'].nunique()
-            st.metric("Unique Parties", unique_parties)
-        else:
-            st.metric("Unique Parties", "N/A")
+        st.metric("Unique Parties", summary.unique_parties if summary.parties else "N/A")
     
     with col3:
-        if 'designation' in st.session_state.officials_df.columns:
-            unique_designations = st.session_state.officials_df['designation'].nunique()
-            st.metric("Unique Designations", unique_designations)
-        else:
-            st.metric("Unique Designations", "N/A")
+        st.metric("Unique Designations",
+                  summary.unique_designations if summary.designations else "N/A")
     
     # Visualization tabs with error handling
     tab1, tab2, tab3 = st.tabs(["Party Distribution", "Designation Breakdown", "Social Media Presence"])
     
     with tab1:
-        if 'party' in st.session_state.officials_df.columns:
+        if summary.parties:
             try:
-                party_counts = st.session_state.officials_df['party'].value_counts().reset_index()
-                party_counts.columns = ['party', 'count']
-                st.bar_chart(party_counts.set_index('party'))
+                st.bar_chart(dataset.count_by_party().set_index('party'))
             except Exception as e:
                 st.error(f"Could not generate party distribution: {str(e)}")
         else:
             st.warning("Party information not available in the dataset")
     
     with tab2:
-        if 'designation' in st.session_state.officials_df.columns:
+        if summary.designations:
             try:
-                designation_counts = st.session_state.officials_df['designation'].value_counts().reset_index()
-                designation_counts.columns = ['designation', 'count']
-                st.bar_chart(designation_counts.set_index('designation'))
+                st.bar_chart(dataset.officials_by_designation().set_index('designation'))
             except Exception as e:
                 st.error(f"Could not generate designation breakdown: {str(e)}")
         else:
             st.warning("Designation information not available in the dataset")
     
     with tab3:
-        if 'social_media' in st.session_state.officials_df.columns:
+        if summary.social_platforms:
             try:
-                df_with_social = st.session_state.officials_df.copy()
-                # Safely extract social media data
-                social_data = {
-                    'twitter': [],
-                    'facebook': [],
-                    'instagram': []
-                }
+                social_counts = dataset.social_media_counts().rename(
+                    columns={'platform': 'Platform', 'count': 'Count'}
+                )
+                st.bar_chart(social_counts.set_index('Platform'))
                 
-                for sm in df_with_social['social_media']:
-                    if isinstance(sm, dict):
-                        for platform in social_data.keys():
-                            social_data[platform].append(sm.get(platform))
-                    else:
-                        for platform in social_data.keys():
-                            social_data[platform].append(None)
-                
-                for platform, values in social_data.items():
-                    df_with_social[platform] = values
-                
-                social_cols = [col for col in ['twitter', 'facebook', 'instagram'] 
-                             if col in df_with_social.columns and df_with_social[col].notna().any()]
+                st.subheader("Officials with Social Media")
+                social_cols = [f'social_{platform}' for platform in sorted(summary.social_platforms)]
+                platforms = {col: col.split('_', 1)[1] for col in social_cols}
+                display_cols = ['name']
+                if summary.designations:
+                    display_cols.append('designation')
+                if summary.parties:
+                    display_cols.append('party')
                 
-                if social_cols:
-                    social_counts = pd.DataFrame({
-                        'Platform': social_cols,
-                        'Count': [df_with_social[col].notna().sum() for col in social_cols]
-                    })
-                    st.bar_chart(social_counts.set_index('Platform'))
-                    
-                    st.subheader("Officials with Social Media")
-                    display_cols = ['name']
-                    if 'designation' in df_with_social.columns:
-                        display_cols.append('designation')
-                    if 'party' in df_with_social.columns:
-                        display_cols.append('party')
-                    
-                    st.dataframe(
-                        df_with_social[display_cols + social_cols].dropna(
-                            how='all', 
-                            subset=social_cols
-                        )
-                    )
-                else:
-                    st.warning("No social media data available")
+                paginated_table(dataset, "social", dataset.social_positions(),
+                                display_cols + social_cols, platforms)
             except Exception as e:
                 st.error(f"Error processing social media data: {str(e)}")
         else:
@@ -223,22 +275,16 @@ if st.session_state.officials_df is not None:
         search_name = st.text_input("Search by name")
     
     with search_col2:
-        party_options = ["All"]
-        if 'party' in st.session_state.officials_df.columns:
-            party_options.extend(st.session_state.officials_df['party'].dropna().unique().tolist())
+        party_options = ["All"] + sorted(summary.parties)
         search_party = st.selectbox("Filter by party", party_options)
     
-    filtered_df = st.session_state.officials_df.copy()
-    
-    if search_name:
-        filtered_df = filtered_df[
-            filtered_df['name'].str.contains(search_name, case=False, na=False)
-        ]
-    
-    if search_party != "All" and 'party' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['party'] == search_party]
-    
-    st.dataframe(filtered_df)
+    with profiling.stage('search'):
+        positions = dataset.search(
+            name=search_name,
+            party=None if search_party == "All" else search_party
+        )
+    st.caption(f"{len(positions)} of {len(dataset)} officials")
+    paginated_table(dataset, "search", positions)
     
     # Add new official form
     st.header("Add New Official")
@@ -297,16 +343,22 @@ if st.session_state.officials_df is not None:
                 try:
                     validator = DataValidator("data/schema.json")
                     if validator.validate_official(new_official):
-                        if 'officials' not in st.session_state.officials_data:
-                            st.session_state.officials_data['officials'] = []
-                        st.session_state.officials_data['officials'].append(new_official)
-                        st.session_state.officials_df = DataAnalyzer.officials_to_dataframe(
-                            DataLoader.get_officials(st.session_state.officials_data)
-                        )
+                        dataset.append(new_official)
                         st.success("Official added successfully!")
                     else:
                         st.error("Validation failed. Please check your inputs.")
                 except Exception as e:
                     st.error(f"Error adding official: {str(e)}")
 else:
-    st.info("Please upload a JSON file or load sample data to get started")
\ No newline at end of file
+    st.info("Please upload a JSON file or load sample data to get started")
+
+if profiler is not None:
+    profiler.stop()
+    with st.expander("Performance", expanded=True):
+        if profiler.stages:
+            st.dataframe(pd.DataFrame([stats.to_dict() for stats in profiler.stages.values()]))
+        else:
+            st.caption("No instrumented stages ran (cached datasets are not reloaded)")
+        report = profiler.to_dict()
+        if report['max_rss_bytes'] is not None:
+            st.caption(f"Process peak RSS: {report['max_rss_bytes'] / 2**20:.1f} MiB")
@@ -0,0 +1,65 @@
+"""CSV export rows/sec and peak memory: legacy two-pass export vs schema-driven streaming.
+
+Peak memory is what the export allocates on top of the input records.
+
+    python -m benchmarks.bench_csv_export 10000 100000
+"""
+import csv
+import os
+import sys
+import tempfile
+
+from benchmarks.harness import measure
+from benchmarks.synthetic import make_officials
+from src.exporter import DataExporter
+from src.validator import DataValidator
+
+
+def legacy_export_to_csv(officials, file_path):
+    """The original implementation: copy and flatten everything, then scan for columns"""
+    flattened = []
+    for official in officials:
+        flat_official = official.copy()
+        if 'social_media' in flat_official:
+            for platform, handle in flat_official['social_media'].items():
+                flat_official[f'social_{platform}'] = handle
+            del flat_official['social_media']
+        if 'contact' in flat_official:
+            for method, value in flat_official['contact'].items():
+                flat_official[f'contact_{method}'] = value
+            del flat_official['contact']
+        flattened.append(flat_official)
+
+    fieldnames = set()
+    for record in flattened:
+        fieldnames.update(record.keys())
+
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=sorted(fieldnames))
+        writer.writeheader()
+        writer.writerows(flattened)
+
+
+def report(label, size, export):
+    _, elapsed, peak = measure(export)
+    print(f"{label:<22} {size:>9} {size / elapsed:>12,.0f} {peak / 2**20:>10.1f}")
+
+
+def main(sizes):
+    fieldnames = DataExporter.csv_fieldnames(DataValidator('data/schema.json').schema)
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    print(f"{'exporter':<22} {'rows':>9} {'rows/sec':>12} {'peak MiB':>10}")
+    try:
+        for size in sizes:
+            officials = make_officials(size)
+            report('legacy (list)', size, lambda: legacy_export_to_csv(officials, path))
+            report('export_to_csv (list)', size, lambda: DataExporter.export_to_csv(officials, path))
+            report('schema stream', size,
+                    lambda: DataExporter.export_to_csv(iter(officials), path, fieldnames))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,49 @@
+"""Adding officials: OfficialsDataset.append vs rebuilding the DataFrame.
+
+    python -m benchmarks.bench_dataset 100000
+
+tests/test_dataset.py checks that the running counters match a full recompute.
+"""
+import random
+import sys
+import time
+
+from benchmarks.synthetic import make_official, make_officials
+from src.analyzer import DataAnalyzer
+from src.dataset import OfficialsDataset
+
+
+def rebuild_metrics(officials):
+    """What the dashboard used to do after every add"""
+    df = DataAnalyzer.normalize(DataAnalyzer.officials_to_dataframe(officials))
+    return (len(df), df['party'].nunique(), df['designation'].nunique(),
+            DataAnalyzer.count_by_party(df), DataAnalyzer.officials_by_designation(df))
+
+
+def main(sizes, adds=20):
+    print(f"{'rows':>9} {'rebuild ms/add':>15} {'append ms/add':>14}")
+    for size in sizes:
+        officials = make_officials(size)
+        rng = random.Random(1)
+        new = [make_official(size + i, rng) for i in range(adds)]
+
+        started = time.perf_counter()
+        rebuilt = list(officials)
+        for official in new[:3]:
+            rebuilt.append(official)
+            rebuild_metrics(rebuilt)
+        rebuild = (time.perf_counter() - started) / 3
+
+        for compact in (False, True):
+            dataset = OfficialsDataset(officials, compact=compact)
+            started = time.perf_counter()
+            for official in new:
+                dataset.append(official)
+                dataset.count_by_party(), dataset.officials_by_designation()
+            append = (time.perf_counter() - started) / adds
+
+        print(f"{size:>9} {rebuild * 1000:>15.1f} {append * 1000:>14.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
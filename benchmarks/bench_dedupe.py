@@ -0,0 +1,80 @@
+"""Duplicate detection: scaling and accuracy on rosters with planted duplicates.
+
+    python -m benchmarks.bench_dedupe 10000 100000 1000000 --workers 4
+
+Each roster has --duplicates (default 0.1) extra copies of its officials,
+renamed and reformatted the way another feed would report them. Names carry
+no index, so different people of one jurisdiction and office can share a
+name or have similar ones. Recall is the share of planted duplicates
+clustered with their original, and typo recall the same for those whose
+comparison name differs from the original's (only these depend on the
+sorted-neighbourhood window); false merges are clusters holding more than
+one person, and "same name" counts those whose members all have one
+comparison name (no name matcher can tell them apart).
+"""
+import argparse
+
+from benchmarks.harness import measure
+from benchmarks.synthetic import make_roster_with_duplicates
+from src.dedupe import find_duplicates, name_key, DEFAULT_THRESHOLD
+
+
+def comparison_name(official):
+    """A name as the matcher compares it, ignoring word order"""
+    name, distinguishing = name_key(official.get('name'))
+    return ' '.join(sorted(name.split())), distinguishing
+
+
+def accuracy(result, officials, people):
+    """(found, planted) for all planted duplicates and for those with a changed
+    comparison name, clusters with more than one person, and those of them
+    whose members share one comparison name"""
+    cluster_of = {}
+    false_merges = same_name = 0
+    for number, cluster in enumerate(result.clusters):
+        for position in cluster.members:
+            cluster_of[position] = number
+        if len({people[position] for position in cluster.members}) > 1:
+            false_merges += 1
+            if len({comparison_name(officials[position]) for position in cluster.members}) == 1:
+                same_name += 1
+    first_seen = {}
+    found = planted = typos_found = typos = 0
+    for position, person in enumerate(people):
+        if person not in first_seen:
+            first_seen[person] = position
+            continue
+        planted += 1
+        original = cluster_of.get(first_seen[person])
+        matched = original is not None and cluster_of.get(position) == original
+        found += matched
+        if comparison_name(officials[position]) != comparison_name(officials[first_seen[person]]):
+            typos += 1
+            typos_found += matched
+    return (found, planted), (typos_found, typos), false_merges, same_name
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sizes', type=int, nargs='*', default=[10000, 100000, 1000000])
+    parser.add_argument('--duplicates', type=float, default=0.1, help="Fraction of officials duplicated")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'records':>9} {'seconds':>9} {'us/record':>10} {'compared':>11} {'clusters':>9} "
+          f"{'recall':>7} {'typo recall':>12} {'false':>6} {'same name':>10}")
+    for size in args.sizes:
+        officials, people = make_roster_with_duplicates(size, args.duplicates)
+        result, seconds, _ = measure(
+            lambda: find_duplicates(officials, args.threshold, workers=args.workers), memory=False)
+        (found, planted), (typos_found, typos), false_merges, same_name = accuracy(result, officials, people)
+        recall = found / planted if planted else 1.0
+        typo_recall = typos_found / typos if typos else 1.0
+        print(f"{len(officials):>9} {seconds:>9.2f} {seconds / len(officials) * 1e6:>10.1f} "
+              f"{result.compared:>11,} {len(result.clusters):>9} {recall:>7.1%} {typo_recall:>12.1%} {false_merges:>6} {same_name:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Dashboard tables: one sorted page vs the full frame the app used to render.
+
+    python -m benchmarks.bench_pagination 10000 100000 1000000
+
+For each roster size this times building a sorted page of --page-size rows
+(the sort index is built once per column, reported separately) for all
+officials, for search results and through a SQLite store (whose sort order
+is also built once, by SQL), next to sorting
+the whole DataFrame. Page payloads are the bytes st.dataframe would send
+(the frame as Arrow IPC). Sorted pages are checked against a plain Python sort.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.harness import measure
+from benchmarks.synthetic import make_officials
+from src import columnar
+from src.dataset import OfficialsDataset, StoreDataset
+from src.sqlite_store import OfficialsStore
+from src.sort_index import sort_keys
+
+
+def payload_bytes(df) -> int:
+    columnar.require_pyarrow()
+    sink = columnar.pa.BufferOutputStream()
+    table = columnar.pa.Table.from_pandas(df.astype(str))
+    with columnar.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def check_page(dataset, page, start, column, descending, positions):
+    """The page must match a plain sort of the same rows: missing last, ties in position order"""
+    keys = sort_keys(dataset.df[column]).to_numpy(dtype=object)[positions]
+    present = [(key, position) for key, position in zip(keys, positions) if not pd.isna(key)]
+    present.sort(key=lambda item: (item[0], -item[1] if descending else item[1]), reverse=descending)
+    expected = [position for _, position in present]
+    expected += [position for key, position in zip(keys, positions) if pd.isna(key)]
+    assert list(page.index) == expected[start:start + len(page)], (column, descending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sizes', type=int, nargs='*', default=[10000, 100000, 1000000])
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--column', default='name')
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'index s':>8} {'page ms':>8} {'search ms':>10} {'sqlite s':>9} {'sqlite ms':>10} "
+          f"{'full sort s':>12} {'page KiB':>9} {'full KiB':>9}")
+    for size in args.sizes:
+        dataset = OfficialsDataset(make_officials(size))
+        start = size // 2
+        stop = start + args.page_size
+
+        _, index_seconds, _ = measure(lambda: dataset.sort_order(args.column), memory=False)
+        page, page_seconds, _ = measure(
+            lambda: dataset.page(start, stop, sort=args.column, descending=True), memory=False, repeat=5)
+        check_page(dataset, page, start, args.column, True, np.arange(size))
+        positions = dataset.search(name='son')
+        results, search_seconds, _ = measure(
+            lambda: dataset.page(0, args.page_size, positions, sort=args.column), memory=False, repeat=5)
+        check_page(dataset, results, 0, args.column, False, positions)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = OfficialsStore(os.path.join(tmp, 'officials.db'))
+            store.load(dataset.officials())
+            stored = StoreDataset(store)
+            _, sqlite_index_seconds, _ = measure(lambda: store.sort_order(args.column, True), memory=False)
+            from_store, sqlite_seconds, _ = measure(
+                lambda: stored.page(start, stop, sort=args.column, descending=True), memory=False, repeat=3)
+            store.close()
+        if list(from_store.index) != list(page.index):
+            print(f"❌ SQLite page differs from the in-memory page for {size} rows")
+            sys.exit(1)
+
+        _, full_seconds, _ = measure(
+            lambda: dataset.df.sort_values(args.column, ascending=False, kind='stable'), memory=False)
+        print(f"{size:>9} {index_seconds:>8.2f} {page_seconds * 1000:>8.2f} {search_seconds * 1000:>10.2f} {sqlite_index_seconds:>9.2f} "
+              f"{sqlite_seconds * 1000:>10.1f} {full_seconds:>12.2f} "
+              f"{payload_bytes(page) / 1024:>9.1f} {payload_bytes(dataset.df) / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Compiled schema validation: differential check against jsonschema, then speed.
+
+    python -m benchmarks.bench_schema_compiler --records 100000 --fuzz 20000
+
+Fuzzed records (synthetic officials with fields deleted, retyped, shortened,
+added or replaced by random JSON) must get the same verdict and the same
+errors, in order, from the generated code as from jsonschema, for
+data/schema.json and for a few schemas exercising the other compiled
+keywords and the jsonschema fallback. Exits with status 1 on any mismatch.
+"""
+import argparse
+import json
+import random
+import sys
+
+from jsonschema.validators import validator_for
+
+from benchmarks.harness import measure
+from benchmarks.synthetic import make_officials
+from src.schema_compiler import compile_schema, error_path
+
+SCHEMA_FILE = 'data/schema.json'
+
+# Extra schemas: arrays, numeric types, maxLength, and keywords left to jsonschema
+EXTRA_SCHEMAS = [
+    {
+        "type": "object",
+        "properties": {
+            "name": {"type": ["string", "null"], "maxLength": 5, "minLength": 1},
+            "terms": {"type": "array", "items": {"type": "integer"}},
+            "score": {"type": "number"},
+            "flags": {"type": "array", "items": {"type": "object", "required": ["id"],
+                                                 "properties": {"id": {"type": "boolean"}}}},
+        },
+        "required": ["name", "terms"],
+    },
+    {
+        "type": "object",
+        "properties": {
+            "party": {"enum": ["Democratic", "Republican"]},
+            "name": {"type": "string", "pattern": "^[A-Z]"},
+            "contact": {"type": "object", "minProperties": 1, "additionalProperties": {"type": "string"}},
+        },
+        "additionalProperties": False,
+    },
+]
+
+
+def random_value(rng, depth=0):
+    kind = rng.randrange(9 if depth < 2 else 7)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.choice([True, False])
+    if kind == 2:
+        return rng.randint(-3, 3)
+    if kind == 3:
+        return rng.choice([0.5, 2.0, -1.0, 1e300])
+    if kind in (4, 5, 6):
+        return rng.choice(['', 'a', 'ab', 'abcdef', 'A', '@x', '@toolong_handle_1234', 'https://twitter.com/x',
+                           'https://www.facebook.com/a.b', '+12025550100', '555', 'é', 'x' * 20, '\n'])
+    if kind == 7:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(3))]
+    return {rng.choice(['id', 'name', 'twitter', 'phone', 'email', 'x', '1']): random_value(rng, depth + 1)
+            for _ in range(rng.randrange(3))}
+
+
+def mutate(value, rng, depth=0):
+    """A copy of value with a few random changes"""
+    if isinstance(value, dict):
+        value = dict(value)
+        for _ in range(rng.randrange(1, 3)):
+            action = rng.randrange(4)
+            if action == 0 and value:
+                del value[rng.choice(list(value))]
+            elif action == 1 and value:
+                key = rng.choice(list(value))
+                value[key] = mutate(value[key], rng, depth + 1)
+            elif action == 2:
+                value[rng.choice(['nickname', 'name', 'id', 'terms', 'score', 'zz', 'aa'])] = random_value(rng)
+            elif value:
+                value[rng.choice(list(value))] = random_value(rng)
+        return value
+    if isinstance(value, str) and rng.random() < 0.5:
+        return value[:rng.randrange(len(value) + 1)]
+    return random_value(rng, depth)
+
+
+def differences(schema, instances):
+    """Instances where the generated validator disagrees with jsonschema"""
+    cls = validator_for(schema)
+    reference = cls(schema)
+    compiled = compile_schema(schema, cls)
+    mismatches = []
+    for instance in instances:
+        expected = [(error_path(error), error.message) for error in reference.iter_errors(instance)]
+        if compiled.errors(instance) != expected or compiled.is_valid(instance) != (not expected):
+            mismatches.append(instance)
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=100000, help="Records for the speed comparison")
+    parser.add_argument('--fuzz', type=int, default=20000, help="Fuzzed records per schema")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with open(SCHEMA_FILE, encoding='utf-8') as f:
+        document_schema = json.load(f)
+    record_schema = document_schema['properties']['officials']['items']
+    base = make_officials(min(args.fuzz, 1000), args.seed)
+    records = [mutate(rng.choice(base), rng) if rng.random() < 0.8 else rng.choice(base)
+               for _ in range(args.fuzz)]
+
+    failed = False
+    for schema in [record_schema] + EXTRA_SCHEMAS:
+        extra = [random_value(rng) for _ in range(args.fuzz // 10)]
+        mismatches = differences(dict(schema, **{'$schema': document_schema['$schema']}), records + extra)
+        print(f"{'❌' if mismatches else '✅'} {len(records) + len(extra)} fuzzed records, "
+              f"{len(mismatches)} mismatch(es) for schema with properties {sorted(schema.get('properties', {}))}")
+        for instance in mismatches[:3]:
+            print(f"   {instance!r}")
+        failed = failed or bool(mismatches)
+
+    officials = make_officials(args.records, args.seed, invalid_fraction=0.01)
+    cls = validator_for(document_schema)
+    reference = cls(record_schema)
+    compiled = compile_schema(record_schema, cls)
+    for label, is_valid in (('jsonschema', reference.is_valid), ('compiled', compiled.is_valid)):
+        _, seconds, _ = measure(lambda: [is_valid(official) for official in officials], memory=False, repeat=3)
+        print(f"{label:<11} is_valid: {seconds:>7.3f}s {len(officials) / seconds:>12,.0f} records/sec")
+    invalid = [official for official in officials if not reference.is_valid(official)]
+    for label, errors in (('jsonschema', lambda o: list(reference.iter_errors(o))), ('compiled', compiled.errors)):
+        _, seconds, _ = measure(lambda: [errors(official) for official in invalid], memory=False, repeat=3)
+        print(f"{label:<11} errors:   {seconds:>7.3f}s for {len(invalid)} invalid records")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""SearchIndex build time and query latency vs a pandas str.contains scan.
+
+    python -m benchmarks.bench_search 1000000
+"""
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import make_officials
+from src.analyzer import DataAnalyzer
+from src.search_index import SearchIndex
+
+QUERIES = [
+    dict(name='garcia'),
+    dict(name='kim 12'),
+    dict(name='ma'),
+    dict(name='alex smith 4242'),
+    dict(name='gr', prefix=True),
+    dict(party='Green'),
+    dict(name='nguyen', party='Independent'),
+    dict(name='patel', party='Democratic', designation='Mayor'),
+    dict(jurisdiction='district 49', designation='Governor'),
+]
+
+
+def latency_ms(func, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), max(timings)
+
+
+def main(size):
+    officials = make_officials(size)
+    df = DataAnalyzer.officials_to_dataframe(officials)
+
+    started = time.perf_counter()
+    index = SearchIndex(officials)
+    print(f"{size} officials, index built in {time.perf_counter() - started:.1f}s\n")
+
+    print(f"{'query':<58} {'hits':>8} {'p50 ms':>8} {'max ms':>8} {'cached':>8} {'scan ms':>8}")
+    for query in QUERIES:
+        # Time the uncached path first: a zero-size result cache keeps nothing
+        index.RESULT_CACHE_SIZE = 0
+        hits = len(index.search(**query))
+        p50, worst = latency_ms(lambda: index.search(**query))
+        index.RESULT_CACHE_SIZE = SearchIndex.RESULT_CACHE_SIZE
+        cached, _ = latency_ms(lambda: index.search(**query))
+        scan, _ = latency_ms(lambda: df[df['name'].str.contains(query.get('name', ''), case=False)], 1)
+        print(f"{str(query):<58} {hits:>8} {p50:>8.2f} {worst:>8.2f} {cached:>8.3f} {scan:>8.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
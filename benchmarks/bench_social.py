@@ -0,0 +1,47 @@
+"""Social media expansion: per-row pd.Series apply vs DataAnalyzer.normalize.
+
+    python -m benchmarks.bench_social 10000 100000 1000000
+
+The legacy apply is skipped above --legacy-max rows (default 100000), since
+it takes minutes at 1M.
+"""
+import argparse
+
+import pandas as pd
+
+from benchmarks.harness import measure
+from benchmarks.synthetic import make_officials
+from src.analyzer import DataAnalyzer
+
+
+def legacy_extract_social_media(df):
+    """The original implementation: one pd.Series per row"""
+    social_df = df['social_media'].apply(
+        lambda x: pd.Series(x) if isinstance(x, dict) else pd.Series()
+    )
+    return pd.concat([df, social_df], axis=1)
+
+
+def timed(func, *args):
+    return measure(lambda: func(*args), memory=False)[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sizes', type=int, nargs='*', default=[10000, 100000, 1000000])
+    parser.add_argument('--legacy-max', type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'legacy s':>10} {'normalize s':>12} {'speedup':>8}")
+    for size in args.sizes:
+        df = DataAnalyzer.officials_to_dataframe(make_officials(size))
+        new = timed(DataAnalyzer.normalize, df)
+        if size <= args.legacy_max:
+            old = timed(legacy_extract_social_media, df)
+            print(f"{size:>9} {old:>10.2f} {new:>12.3f} {old / new:>7.0f}x")
+        else:
+            print(f"{size:>9} {'-':>10} {new:>12.3f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
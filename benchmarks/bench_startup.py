@@ -0,0 +1,109 @@
+"""CLI startup cost per command, from python -X importtime.
+
+    python -m benchmarks.bench_startup --output startup.json
+
+For each command this reports the best wall time of --repeat runs and the
+time spent importing modules beyond what the interpreter loads on its own.
+It exits with status 1 if a command goes over its import budget or loads a
+heavy module it should not need (validation and JSON export should never
+import pandas, numpy or pyarrow).
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any, Tuple
+
+INPUT_FILE = 'data/officials.json'
+HEAVY_MODULES = ['pandas', 'numpy', 'pyarrow', 'jsonschema']
+
+# (name, arguments to main.py, import budget in ms, heavy modules it must not import)
+COMMANDS = [
+    ('help', ['--help'], 60, ['pandas', 'numpy', 'pyarrow', 'jsonschema']),
+    ('validate', ['validate', INPUT_FILE], 150, ['pandas', 'numpy', 'pyarrow']),
+    ('export json', ['export', INPUT_FILE, '--json', '{tmp}/out.json'], 150, ['pandas', 'numpy', 'pyarrow']),
+    ('export csv', ['export', INPUT_FILE, '--csv', '{tmp}/out.csv'], 150, ['pandas', 'numpy', 'pyarrow']),
+    ('analyze', ['analyze', INPUT_FILE], None, []),
+]
+
+
+def import_times(argv: List[str]) -> Dict[str, Tuple[int, int]]:
+    """Module -> (nesting depth, cumulative microseconds) for one run under -X importtime"""
+    completed = subprocess.run([sys.executable, '-X', 'importtime'] + argv, capture_output=True, text=True)
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules[name.strip()] = (depth, int(cumulative))
+    return modules
+
+
+def wall_time(argv: List[str], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable] + argv, capture_output=True)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure_command(argv: List[str], baseline: Dict[str, Tuple[int, int]], repeat: int) -> Dict[str, Any]:
+    modules = import_times(argv)
+    # Top-level imports the interpreter would not have made anyway
+    own = {name: micros for name, (depth, micros) in modules.items() if depth == 0 and name not in baseline}
+    heaviest = sorted(own.items(), key=lambda item: -item[1])[:5]
+    return {
+        'wall_ms': round(wall_time(argv, repeat) * 1000, 1),
+        'import_ms': round(sum(own.values()) / 1000, 1),
+        'heavy_modules': [name for name in HEAVY_MODULES if name in modules],
+        'heaviest_imports': {name: round(micros / 1000, 1) for name, micros in heaviest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per command (best is kept)")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply every budget (for slower machines)")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    baseline = import_times(['-c', 'pass'])
+    interpreter_ms = wall_time(['-c', 'pass'], args.repeat) * 1000
+    print(f"interpreter startup: {interpreter_ms:.0f} ms")
+    print(f"{'command':<12} {'wall ms':>8} {'import ms':>10} {'budget':>7}  heavy modules")
+
+    results, violations = {}, []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, command, budget, forbidden in COMMANDS:
+            argv = ['main.py'] + [part.format(tmp=tmp) for part in command]
+            result = measure_command(argv, baseline, args.repeat)
+            result['budget_ms'] = budget * args.scale if budget is not None else None
+            results[name] = result
+            print(f"{name:<12} {result['wall_ms']:>8.0f} {result['import_ms']:>10.0f} "
+                  f"{result['budget_ms'] or '-':>7}  {', '.join(result['heavy_modules']) or '-'}")
+            if result['budget_ms'] is not None and result['import_ms'] > result['budget_ms']:
+                violations.append(f"{name}: imports take {result['import_ms']:.0f} ms "
+                                  f"(budget {result['budget_ms']:.0f} ms); heaviest: {result['heaviest_imports']}")
+            for module in forbidden:
+                if module in result['heavy_modules']:
+                    violations.append(f"{name}: imports {module}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'python': sys.version.split()[0], 'platform': sys.platform,
+                       'interpreter_ms': round(interpreter_ms, 1), 'commands': results}, f, indent=2)
+        print(f"✅ Results written to {args.output}")
+    if violations:
+        print("\n❌ Over budget:")
+        for violation in violations:
+            print(f"  - {violation}")
+        sys.exit(1)
+    print("\n✅ Every command is within budget")
+
+
+if __name__ == "__main__":
+    main()
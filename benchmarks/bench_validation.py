@@ -0,0 +1,21 @@
+"""Batch validation throughput at increasing roster sizes.
+
+    python -m benchmarks.bench_validation 10000 100000 1000000
+"""
+import sys
+
+from benchmarks.synthetic import make_officials
+from src.validator import DataValidator
+
+
+def main(sizes):
+    validator = DataValidator('data/schema.json')
+    print(f"{'records':>10} {'seconds':>9} {'records/sec':>12}")
+    for size in sizes:
+        report = validator.validate_records(make_officials(size))
+        assert report.valid, report.summary()
+        print(f"{report.total:>10} {report.elapsed:>9.2f} {report.records_per_sec:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000])
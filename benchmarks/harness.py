@@ -0,0 +1,205 @@
+"""Time and memory-profile every pipeline stage on synthetic rosters.
+
+    python -m benchmarks.harness run --sizes 1000 100000 --invalid 0.01 --output base.json
+    python -m benchmarks.harness compare base.json head.json --threshold 0.15
+
+Each stage is timed --repeat times (the best run is kept) and run once
+more under tracemalloc for peak allocated memory (skip it with
+--no-memory). compare exits with status 1 if any stage got slower or
+bigger than the threshold allows.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+from benchmarks import synthetic
+from src.analyzer import DataAnalyzer
+from src.data_loader import DataLoader
+from src.exporter import DataExporter
+from src.validator import DataValidator
+
+SCHEMA_FILE = 'data/schema.json'
+
+
+@dataclass
+class StageResult:
+    stage: str
+    records: int
+    seconds: float
+    peak_bytes: Optional[int] = None
+
+    @property
+    def records_per_sec(self) -> float:
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(asdict(self), records_per_sec=round(self.records_per_sec, 1))
+
+
+def measure(func: Callable[[], Any], memory: bool = True,
+            repeat: int = 1) -> Tuple[Any, float, Optional[int]]:
+    """Run func and return (result, best wall seconds of `repeat` runs, peak traced bytes or None).
+
+    Wall time comes from runs without tracemalloc, which slows allocation-heavy
+    code several times over; the peak comes from one more, traced run.
+    """
+    elapsed = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = min(elapsed, time.perf_counter() - started)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run_stages(size: int, work_dir: str, invalid_fraction: float = 0.0,
+               memory: bool = True, repeat: int = 1) -> List[StageResult]:
+    """Benchmark each stage on `size` synthetic officials"""
+    input_path = os.path.join(work_dir, f'officials_{size}.json')
+    synthetic.write_officials(input_path, size, invalid_fraction=invalid_fraction)
+    validator = DataValidator(SCHEMA_FILE)
+    results = []
+
+    def stage(name: str, func: Callable[[], Any]) -> Any:
+        value, seconds, peak = measure(func, memory, repeat)
+        results.append(StageResult(name, size, seconds, peak))
+        return value
+
+    data = stage('load_json', lambda: DataLoader.load_json(input_path))
+    officials = DataLoader.get_officials(data)
+    stage('validate_data', lambda: validator.validate_data(data))
+    stage('validate_records', lambda: validator.validate_records(officials))
+    stage('export_to_csv', lambda: DataExporter.export_to_csv(officials, os.path.join(work_dir, 'out.csv')))
+    stage('export_to_json', lambda: DataExporter.export_to_json(officials, os.path.join(work_dir, 'out.json')))
+
+    df = stage('officials_to_dataframe', lambda: DataAnalyzer.officials_to_dataframe(officials))
+    normalized = stage('normalize', lambda: DataAnalyzer.normalize(df))
+    compact = stage('compact', lambda: DataAnalyzer.compact(df))
+    stage('memory_usage', lambda: DataAnalyzer.memory_usage(normalized))
+    stage('count_by_party', lambda: DataAnalyzer.count_by_party(normalized))
+    stage('count_by_party (compact)', lambda: DataAnalyzer.count_by_party(compact))
+    stage('officials_by_designation', lambda: DataAnalyzer.officials_by_designation(normalized))
+    stage('social_media_columns', lambda: DataAnalyzer.social_media_columns(normalized))
+    stage('extract_social_media', lambda: DataAnalyzer.extract_social_media(df))
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes: List[int], invalid_fraction: float = 0.0, memory: bool = True,
+        repeat: int = 1) -> Dict[str, Any]:
+    """Benchmark all stages at each size and return the machine-readable results"""
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            for result in run_stages(size, work_dir, invalid_fraction, memory, repeat):
+                results.append(result)
+                peak = f"{result.peak_bytes / 2**20:>10.1f}" if result.peak_bytes is not None else f"{'-':>10}"
+                print(f"{result.stage:<26} {size:>9} {result.seconds:>9.3f} "
+                      f"{result.records_per_sec:>13,.0f} {peak}")
+    return {
+        'commit': _git_commit(),
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'invalid_fraction': invalid_fraction,
+        'repeat': repeat,
+        'results': [result.to_dict() for result in results],
+    }
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float = 0.1,
+            min_seconds: float = 0.01) -> List[str]:
+    """Print per-stage changes between two runs and return the regressions.
+
+    Stages faster than min_seconds in both runs are too noisy to flag on time.
+    """
+    base_results = {(r['stage'], r['records']): r for r in base['results']}
+    regressions = []
+    print(f"{'stage':<26} {'records':>9} {'base s':>9} {'head s':>9} {'time':>8} {'memory':>8}")
+    for result in head['results']:
+        key = (result['stage'], result['records'])
+        if key not in base_results:
+            continue
+        old = base_results[key]
+        changes = {}
+        for metric in ('seconds', 'peak_bytes'):
+            if old.get(metric) and result.get(metric) is not None:
+                changes[metric] = result[metric] / old[metric] - 1
+        print(f"{key[0]:<26} {key[1]:>9} {old['seconds']:>9.3f} {result['seconds']:>9.3f} "
+              + ' '.join(f"{changes[m]:>+8.0%}" if m in changes else f"{'-':>8}"
+                         for m in ('seconds', 'peak_bytes')))
+        for metric, change in changes.items():
+            if metric == 'seconds' and max(old['seconds'], result['seconds']) < min_seconds:
+                continue
+            if change > threshold:
+                regressions.append(f"{key[0]} @ {key[1]}: {metric} {change:+.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline benchmark harness")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Benchmark every stage")
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000])
+    run_parser.add_argument('--invalid', type=float, default=0.0, help="Fraction of schema-invalid records")
+    run_parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (best is kept)")
+    run_parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc runs")
+    run_parser.add_argument('--output', help="Write results as JSON to this file")
+
+    compare_parser = commands.add_parser('compare', help="Compare two result files")
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help="Allowed relative increase before a stage counts as a regression")
+    compare_parser.add_argument('--min-seconds', type=float, default=0.01,
+                                help="Ignore time changes of stages faster than this")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        print(f"{'stage':<26} {'records':>9} {'seconds':>9} {'records/sec':>13} {'peak MiB':>10}")
+        report = run(args.sizes, args.invalid, not args.no_memory, args.repeat)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"✅ Results written to {args.output}")
+        return
+
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.head, encoding='utf-8') as f:
+        head = json.load(f)
+    regressions = compare(base, head, args.threshold, args.min_seconds)
+    if regressions:
+        print("\n❌ Regressions:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Deterministic synthetic officials for benchmarks.
+
+Party and designation frequencies are skewed the way real rosters are (two
+large parties, many council members, few governors); social_media and
+contact are sparse. A fraction of records can be made schema-invalid, and
+rosters with planted near-duplicates can be built for deduplication.
+
+    python -m benchmarks.synthetic 1000000 /tmp/officials.json --invalid 0.01
+"""
+import argparse
+import random
+from typing import Dict, List, Any, Iterator, Tuple
+
+from src.exporter import JSONStreamWriter
+
+PARTIES = ['Democratic', 'Republican', 'Independent', 'Green', 'Libertarian']
+PARTY_WEIGHTS = [46, 45, 6, 2, 1]
+DESIGNATIONS = ['U.S. Senator', 'U.S. Representative', 'Governor', 'Mayor',
+                'State Senator', 'State Representative', 'Council Member']
+DESIGNATION_WEIGHTS = [1, 4, 0.5, 10, 10, 25, 50]
+FIRST_NAMES = ['Alex', 'Maria', 'John', 'Priya', 'Wei', 'Fatima', 'Carlos', 'Grace',
+               'James', 'Aisha', 'David', 'Elena', 'Hiro', 'Olivia', 'Kwame', 'Sofia',
+               'Michael', 'Sarah', 'Robert', 'Linda', 'Ahmed', 'Mei', 'Daniel', 'Laura',
+               'Thomas', 'Anna', 'Jose', 'Nadia', 'Kevin', 'Rachel', 'Samuel', 'Yuki',
+               'Brian', 'Emily', 'Luis', 'Hannah', 'Omar', 'Julia', 'Peter', 'Amara',
+               'Mark', 'Karen', 'Ivan', 'Lucia', 'Paul', 'Chloe', 'Ravi', 'Ines']
+LAST_NAMES = ['Smith', 'Garcia', 'Nguyen', 'Johnson', 'Patel', 'Kim', 'Brown', 'Lopez',
+              'Williams', 'Okafor', 'Miller', 'Chen', 'Davis', 'Rossi', 'Silva', 'Cohen',
+              'Jones', 'Martinez', 'Wilson', 'Anderson', 'Taylor', 'Thomas', 'Moore', 'Jackson',
+              'Martin', 'Lee', 'Thompson', 'White', 'Harris', 'Clark', 'Lewis', 'Walker',
+              'Hall', 'Young', 'Allen', 'Wright', 'Scott', 'Green', 'Baker', 'Adams',
+              'Nelson', 'Hill', 'Campbell', 'Mitchell', 'Roberts', 'Carter', 'Phillips', 'Evans']
+# Share of plain (unindexed) names with a middle initial
+MIDDLE_INITIAL_RATE = 0.3
+JURISDICTIONS = 500
+
+# Ways a record can break the schema in data/schema.json
+INVALID_KINDS = ['missing_required', 'short_name', 'bad_twitter', 'bad_phone', 'extra_field']
+
+
+def make_official(i: int, rng: random.Random, indexed_names: bool = True) -> Dict[str, Any]:
+    """Build one schema-valid official.
+
+    Names end in the official's index, which keeps them unique; without
+    indexed_names they are plain names (some with a middle initial), so
+    different officials can share one.
+    """
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    if indexed_names:
+        name = f"{first} {last} {i}"
+    elif rng.random() < MIDDLE_INITIAL_RATE:
+        name = f"{first} {chr(ord('A') + rng.randrange(26))}. {last}"
+    else:
+        name = f"{first} {last}"
+    official = {
+        "name": name,
+        "designation": rng.choices(DESIGNATIONS, DESIGNATION_WEIGHTS)[0],
+        "jurisdiction": f"District {i % JURISDICTIONS}",
+    }
+    # Party is optional in the schema; a few officials leave it out
+    if rng.random() < 0.98:
+        official["party"] = rng.choices(PARTIES, PARTY_WEIGHTS)[0]
+    # Unique per official and within the 15-character Twitter limit below 10M officials
+    handle = f"{first[:4]}{last[:4]}{i}"
+    social_media = {}
+    if rng.random() < 0.7:
+        social_media["twitter"] = f"@{handle}"
+    if rng.random() < 0.3:
+        social_media["facebook"] = f"https://www.facebook.com/{handle}"
+    if rng.random() < 0.3:
+        social_media["instagram"] = f"@{handle}"
+    if social_media:
+        official["social_media"] = social_media
+    if rng.random() < 0.5:
+        official["contact"] = {"email": f"{handle.lower()}@example.gov",
+                               "phone": f"+1202{i % 10000000:07d}"}
+    return official
+
+
+def make_invalid(official: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """Break one schema rule of an official, in place"""
+    kind = rng.choice(INVALID_KINDS)
+    if kind == 'missing_required':
+        del official[rng.choice(['name', 'designation', 'jurisdiction'])]
+    elif kind == 'short_name':
+        official["name"] = official["name"][0]
+    elif kind == 'bad_twitter':
+        official.setdefault("social_media", {})["twitter"] = "not a handle"
+    elif kind == 'bad_phone':
+        official.setdefault("contact", {})["phone"] = "555-CALL-NOW"
+    else:
+        official["nickname"] = "unexpected"
+    return official
+
+
+def make_duplicate(official: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """A schema-valid copy of an official the way another feed might report them"""
+    duplicate = dict(official)
+    first, last = duplicate["name"].split(" ", 1)
+    variant = rng.randrange(4)
+    if variant == 0:
+        duplicate["name"] = f"Hon. {duplicate['name'].upper()}"
+    elif variant == 1:
+        duplicate["name"] = f"{last}, {first}"
+    elif variant == 2 and len(first) > 3:
+        # One transposed pair of letters
+        at = rng.randrange(1, len(first) - 2)
+        duplicate["name"] = f"{first[:at]}{first[at + 1]}{first[at]}{first[at + 2:]} {last}"
+    else:
+        duplicate["jurisdiction"] = duplicate["jurisdiction"].lower()
+    # Identifiers are reformatted, or missing so only the name can match
+    social_media = dict(official.get("social_media", {}))
+    if "twitter" in social_media and rng.random() < 0.5:
+        social_media["twitter"] = f"https://twitter.com/{social_media['twitter'][1:]}"
+    contact = dict(official.get("contact", {}))
+    if "phone" in contact:
+        contact["phone"] = contact["phone"][2:]
+    if rng.random() < 0.5:
+        social_media, contact = {}, {}
+    duplicate.pop("social_media", None)
+    duplicate.pop("contact", None)
+    if social_media:
+        duplicate["social_media"] = social_media
+    if contact:
+        duplicate["contact"] = contact
+    return duplicate
+
+
+def make_roster_with_duplicates(count: int, duplicate_fraction: float = 0.1,
+                                seed: int = 0) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """`count` distinct officials plus planted duplicates of some of them, shuffled.
+
+    Names are plain, so unrelated officials of one jurisdiction and office
+    can share a name the way real rosters do. Returns the officials and, for
+    each, the index of the person it stands for.
+    """
+    rng = random.Random(seed)
+    officials, people = [], []
+    for i, official in enumerate(iter_officials(count, seed, indexed_names=False)):
+        officials.append(official)
+        people.append(i)
+        if rng.random() < duplicate_fraction:
+            officials.append(make_duplicate(official, rng))
+            people.append(i)
+    order = list(range(len(officials)))
+    rng.shuffle(order)
+    return [officials[i] for i in order], [people[i] for i in order]
+
+
+def iter_officials(count: int, seed: int = 0, invalid_fraction: float = 0.0,
+                   indexed_names: bool = True) -> Iterator[Dict[str, Any]]:
+    """Yield `count` officials, identical for the same arguments (see make_official)"""
+    rng = random.Random(seed)
+    for i in range(count):
+        official = make_official(i, rng, indexed_names)
+        if invalid_fraction and rng.random() < invalid_fraction:
+            make_invalid(official, rng)
+        yield official
+
+
+def make_officials(count: int, seed: int = 0, invalid_fraction: float = 0.0) -> List[Dict[str, Any]]:
+    """Build `count` officials, identical for the same seed and invalid fraction"""
+    return list(iter_officials(count, seed, invalid_fraction))
+
+
+def write_officials(file_path: str, count: int, seed: int = 0, invalid_fraction: float = 0.0) -> None:
+    """Write a synthetic {"officials": [...]} document without holding it in memory"""
+    with JSONStreamWriter(file_path) as writer:
+        for official in iter_officials(count, seed, invalid_fraction):
+            writer.write(official)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic officials JSON file")
+    parser.add_argument("count", type=int)
+    parser.add_argument("output")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--invalid", type=float, default=0.0, help="Fraction of schema-invalid records")
+    args = parser.parse_args()
+    write_officials(args.output, args.count, args.seed, args.invalid)
+    print(f"✅ Wrote {args.count} officials to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,71 +1,680 @@
 import argparse
 from pathlib import Path
 from src.data_loader import DataLoader
-from src.validator import DataValidator
-from src.analyzer import DataAnalyzer
-from src.exporter import DataExporter
-import pandas as pd
+from src.validator import DEFAULT_CHUNK_SIZE
+from src import profiling
+from itertools import chain
+from contextlib import ExitStack
+from dataclasses import replace
+import copy
+import json
+import sys
+import time
+
+# pandas, numpy, pyarrow and jsonschema take hundreds of milliseconds to import, so each
+# command imports what it needs inside its run_* function instead of at startup
+
+COMMANDS = ('validate', 'export', 'analyze')
 
 def main():
     parser = argparse.ArgumentParser(description="Public Office Data Tracker")
     parser.add_argument('--input', type=str, default='data/officials.json', 
-                       help='Input JSON file with officials data')
+                       help='Input file with officials data (.json, .jsonl, .parquet or .arrow), '
+                            'or a directory or glob of such files')
     parser.add_argument('--schema', type=str, default='data/schema.json',
                        help='JSON schema file for validation')
     parser.add_argument('--export-csv', type=str, 
                        help='Export data to CSV file')
     parser.add_argument('--export-json', type=str,
                        help='Export data to JSON file')
+    parser.add_argument('--export-parquet', type=str,
+                       help='Export data to Parquet file (requires pyarrow)')
+    parser.add_argument('--export-arrow', type=str,
+                       help='Export data to Arrow IPC/Feather file (requires pyarrow)')
     parser.add_argument('--analyze', action='store_true',
                        help='Show analysis of the data')
+    parser.add_argument('--compact', action='store_true',
+                       help='Analyze a memory-compact DataFrame (categoricals, flattened columns)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Process records one at a time in a single pass '
+                            '(constant memory; accepts .jsonl input)')
+    parser.add_argument('--workers', type=int,
+                       help='Validate and flatten records in N worker processes')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                       help='Records per chunk for --stream/--workers processing')
+    parser.add_argument('--io-threads', type=int, default=8,
+                       help='Threads reading files for directory/glob input')
+    parser.add_argument('--source-field', type=str,
+                       help='For directory/glob input, add the source file path to each '
+                            'exported record under this field name')
+    parser.add_argument('--dedupe', action='store_true',
+                       help='Find officials listed more than once (also across directory/glob input)')
+    parser.add_argument('--dedupe-threshold', type=float,
+                       help='Name similarity (0-1) at which officials of the same jurisdiction '
+                            'and designation are duplicates (default: 0.88)')
+    parser.add_argument('--dedupe-output', type=str,
+                       help='Write the --dedupe clusters to a JSON file')
+    parser.add_argument('--merge-duplicates', action='store_true',
+                       help='With --dedupe, export one merged record per duplicate cluster')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only validate and export officials that changed since the last run')
+    parser.add_argument('--manifest', type=str,
+                       help='Manifest of the last --incremental run '
+                            '(default: officials.manifest.json next to the first export)')
+    parser.add_argument('--change-report', type=str,
+                       help='Write the --incremental change report to a JSON file')
+    parser.add_argument('--sqlite', type=str,
+                       help='Load valid officials into this SQLite database (skipped if it already '
+                            'holds the current input) and export/analyze from it')
+    parser.add_argument('--profile', action='store_true',
+                       help='Print time, CPU, memory and record counts per stage')
+    parser.add_argument('--profile-output', type=str,
+                       help='Write the profile to a file (.prom for Prometheus text, otherwise JSON)')
+    parser.add_argument('--profile-memory', action='store_true',
+                       help='Also trace Python allocations per stage (slower)')
+    
+    
+    # The flags above also work without a command, as they always have. The commands repeat
+    # some of them with SUPPRESS defaults, so a value given before the command is kept
+    commands = parser.add_subparsers(dest='command', metavar='{validate,export,analyze}')
+    validate_parser = commands.add_parser('validate', help='Validate a roster; exits with status 1 if it is invalid')
+    export_parser = commands.add_parser('export', help='Validate and export a roster in one streaming pass')
+    analyze_parser = commands.add_parser('analyze', help='Validate and analyze a roster')
+    for command_parser in (validate_parser, export_parser, analyze_parser):
+        command_parser.add_argument('input', help='Input file, directory or glob')
+        command_parser.add_argument('--schema', type=str, default=argparse.SUPPRESS,
+                                    help='JSON schema file for validation')
+    validate_parser.add_argument('--report', type=str, help='Write the validation report to a JSON file')
+    export_parser.add_argument('--csv', dest='export_csv', type=str, default=argparse.SUPPRESS,
+                               help='Export data to CSV file')
+    export_parser.add_argument('--json', dest='export_json', type=str, default=argparse.SUPPRESS,
+                               help='Export data to JSON file')
+    export_parser.add_argument('--parquet', dest='export_parquet', type=str, default=argparse.SUPPRESS,
+                               help='Export data to Parquet file (requires pyarrow)')
+    export_parser.add_argument('--arrow', dest='export_arrow', type=str, default=argparse.SUPPRESS,
+                               help='Export data to Arrow IPC/Feather file (requires pyarrow)')
+    for command_parser in (validate_parser, export_parser):
+        command_parser.add_argument('--workers', type=int, default=argparse.SUPPRESS,
+                                    help='Validate records in N worker processes')
+        command_parser.add_argument('--chunk-size', type=int, default=argparse.SUPPRESS,
+                                    help='Records per chunk')
+    export_parser.set_defaults(stream=True)
+    analyze_parser.add_argument('--compact', action='store_true', default=argparse.SUPPRESS,
+                                help='Analyze a memory-compact DataFrame (categoricals, flattened columns)')
+    analyze_parser.set_defaults(analyze=True)
     
     args = parser.parse_args()
+    check_arguments(parser, args)
     
-    # Load and validate data
+    if not (args.profile or args.profile_output or args.profile_memory):
+        return run(args)
+    
+    with profiling.Profiler(trace_memory=args.profile_memory) as profiler:
+        with profiling.stage('total'):
+            status = run(args)
+    
+    if args.profile or not args.profile_output:
+        print("\n=== Profile ===")
+        for line in profiler.table():
+            print(line)
+    if args.profile_output:
+        profiler.write(args.profile_output)
+        print(f"⏱️ Profile written to: {args.profile_output}")
+    return status
+
+def check_arguments(parser, args):
+    """Reject flag combinations that run() would otherwise silently ignore"""
+    multi = DataLoader.is_multi_input(args.input)
+    exports = [flag for flag, value in (
+        ('--export-csv', args.export_csv), ('--export-json', args.export_json),
+        ('--export-parquet', args.export_parquet), ('--export-arrow', args.export_arrow),
+    ) if value]
+    modes = [flag for flag, used in (
+        ('--sqlite', args.sqlite), ('--dedupe', args.dedupe), ('--incremental', args.incremental),
+    ) if used]
+    
+    if args.command == 'validate':
+        ignored = modes + exports + (['--analyze'] if args.analyze else [])
+        if ignored:
+            parser.error(f"validate does not take {', '.join(ignored)}")
+        return
+    if len(modes) > 1:
+        parser.error(f"{' and '.join(modes)} cannot be combined")
+    if multi and (args.sqlite or args.incremental):
+        parser.error(f"{modes[0]} needs a single input file, not a directory or glob")
+    if args.incremental and (args.stream or args.workers):
+        parser.error("--incremental does not take --stream or --workers")
+    if args.sqlite and args.stream:
+        parser.error("--sqlite always streams the input; drop --stream")
+    if args.source_field and not multi:
+        parser.error("--source-field needs a directory or glob input")
+    dedupe_options = [flag for flag, used in (
+        ('--dedupe-threshold', args.dedupe_threshold is not None),
+        ('--dedupe-output', args.dedupe_output), ('--merge-duplicates', args.merge_duplicates),
+    ) if used]
+    if dedupe_options and not args.dedupe:
+        parser.error(f"{', '.join(dedupe_options)} requires --dedupe")
+    if (args.manifest or args.change_report) and not args.incremental:
+        parser.error("--manifest and --change-report require --incremental")
+    if args.compact and (modes or multi or args.stream or args.workers):
+        parser.error("--compact only applies to the default in-memory analysis")
+
+def run(args):
+    """Dispatch to the command or mode the arguments ask for; returns the exit status.
+
+    The status is 1 if the input had invalid records (so nothing, or not all
+    of it, was exported), a file could not be read, or an error occurred.
+    """
+    if args.command == 'validate':
+        runner = run_validate
+    elif args.sqlite:
+        runner = run_sqlite
+    elif args.dedupe:
+        runner = run_dedupe
+    elif DataLoader.is_multi_input(args.input):
+        runner = run_multi
+    elif args.incremental:
+        runner = run_incremental
+    elif args.stream or args.workers:
+        runner = run_pipeline
+    else:
+        runner = run_default
     try:
-        data = DataLoader.load_json(args.input)
-        validator = DataValidator(args.schema)
+        return 0 if runner(args) else 1
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+def run_default(args):
+    """Load the whole input, validate it, then export and analyze it; returns whether it was valid"""
+    from src.validator import DataValidator
+    from src.exporter import DataExporter
+    
+    # Load and validate data
+    data = DataLoader.load_file(args.input)
+    validator = DataValidator(args.schema)
+    
+    report = validator.validate_report(data)
+    if report.valid:
+        print(f"✅ Data validation successful "
+              f"({report.total} records, {report.records_per_sec:,.0f} records/sec)")
+    else:
+        print(f"❌ Data validation failed ({report.invalid_records} invalid record(s))")
+        for line in report.summary():
+            print(f"   {line}")
+        return False
+    
+    officials = DataLoader.get_officials(data)
+    
+    # Export if requested
+    if args.export_csv:
+        DataExporter.export_to_csv(officials, args.export_csv,
+                                   DataExporter.csv_fieldnames(validator.schema))
+        print(f"📊 Data exported to CSV: {args.export_csv}")
+    
+    if args.export_json:
+        DataExporter.export_to_json(officials, args.export_json)
+        print(f"📄 Data exported to JSON: {args.export_json}")
+    
+    if args.export_parquet:
+        DataExporter.export_to_parquet(officials, args.export_parquet, validator.schema)
+        print(f"🧱 Data exported to Parquet: {args.export_parquet}")
+    
+    if args.export_arrow:
+        DataExporter.export_to_arrow(officials, args.export_arrow, validator.schema)
+        print(f"🏹 Data exported to Arrow: {args.export_arrow}")
+    
+    # Analyze if requested
+    if args.analyze:
+        from src.analyzer import DataAnalyzer
+        analyzer = DataAnalyzer()
+        df = analyzer.officials_to_dataframe(officials)
         
-        if validator.validate_data(data):
-            print("✅ Data validation successful")
-        else:
-            print("❌ Data validation failed")
-            return
+        print("\n=== Basic Analysis ===")
+        print(f"Total officials: {len(df)}")
         
-        officials = DataLoader.get_officials(data)
+        if args.compact:
+            before = analyzer.memory_usage(df)
+            df = analyzer.compact(df)
+            print(f"DataFrame memory: {before:,} bytes -> "
+                  f"{analyzer.memory_usage(df):,} bytes (compact)")
         
-        # Export if requested
-        if args.export_csv:
-            DataExporter.export_to_csv(officials, args.export_csv)
-            print(f"📊 Data exported to CSV: {args.export_csv}")
+        party_counts = analyzer.count_by_party(df)
+        print("\nOfficials by party:")
+        print(party_counts.to_string(index=False))
         
-        if args.export_json:
-            DataExporter.export_to_json(officials, args.export_json)
-            print(f"📄 Data exported to JSON: {args.export_json}")
+        designation_counts = analyzer.officials_by_designation(df)
+        print("\nOfficials by designation:")
+        print(designation_counts.to_string(index=False))
         
-        # Analyze if requested
-        if args.analyze:
-            analyzer = DataAnalyzer()
-            df = analyzer.officials_to_dataframe(officials)
-            
-            print("\n=== Basic Analysis ===")
-            print(f"Total officials: {len(df)}")
-            
-            party_counts = analyzer.count_by_party(df)
-            print("\nOfficials by party:")
-            print(party_counts.to_string(index=False))
-            
-            designation_counts = analyzer.officials_by_designation(df)
-            print("\nOfficials by designation:")
-            print(designation_counts.to_string(index=False))
+        df_with_social = analyzer.extract_social_media(df)
+        print("\nSocial media presence:")
+        social_cols = [col for col in df_with_social.columns if col in ['twitter', 'facebook', 'instagram']]
+        print(df_with_social[['name'] + social_cols].to_string(index=False))
+
+    return True
+
+def run_validate(args):
+    """Validate the input and print a report; returns whether it is valid"""
+    from src.parallel import ingest_files, process_officials
+    from src.validator import DataValidator, ValidationReport
+    
+    report = ValidationReport()
+    started = time.perf_counter()
+    if DataLoader.is_multi_input(args.input):
+        failures = 0
+        for result in ingest_files(DataLoader.expand_inputs(args.input), args.schema, workers=args.workers):
+            if result.failure:
+                print(f"⚠️ {result.path}: {result.failure}")
+                failures += 1
+                continue
+            # Record indices are per file, so each error keeps its file
+            report.errors.extend(replace(error, source=result.path) for error in result.errors)
+            report.total += result.total
+        if failures:
+            report.document_errors.append(f"{failures} file(s) could not be read")
+    else:
+        shell = {}
+        for chunk in process_officials(DataLoader.iter_officials(args.input, shell), args.schema,
+                                       workers=args.workers or 1, chunk_size=args.chunk_size, flatten=False):
+            report.errors.extend(chunk.errors)
+            report.total += chunk.total
+        # The records are checked above; this covers the document around them
+        report.document_errors = DataValidator(args.schema).document_errors(shell)
+    report.elapsed = time.perf_counter() - started
+    
+    if report.valid:
+        print(f"✅ Data validation successful "
+              f"({report.total} records, {report.records_per_sec:,.0f} records/sec)")
+    else:
+        print(f"❌ Data validation failed ({report.invalid_records} invalid record(s))")
+        for line in report.summary():
+            print(f"   {line}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"📝 Validation report written to: {args.report}")
+    return report.valid
+
+def run_sqlite(args):
+    """Validate the input into a SQLite store, then export and analyze straight from the database.
+
+    Returns whether the input was valid (the invalid records are left out of the store).
+    """
+    from src.exporter import DataExporter
+    from src.parallel import process_officials
+    from src.sqlite_store import OfficialsStore
+    from src.validator import DataValidator, ValidationReport
+    
+    store = OfficialsStore(args.sqlite)
+    input_path = Path(args.input)
+    if not input_path.exists():
+        raise FileNotFoundError(f"File not found: {args.input}")
+    stat = input_path.stat()
+    source = json.dumps([str(input_path.resolve()), stat.st_mtime_ns, stat.st_size,
+                         Path(args.schema).stat().st_mtime_ns])
+    
+    valid = True
+    if store.get_metadata('source') == source:
+        # Only recorded for a valid load
+        print(f"🗄️ Using {len(store)} officials already in {args.sqlite}")
+    else:
+        report = ValidationReport()
+        started = time.perf_counter()
+        chunks = process_officials(DataLoader.iter_officials(args.input), args.schema,
+                                   workers=args.workers or 1, chunk_size=args.chunk_size, flatten=False)
+        
+        def valid_officials():
+            for chunk in chunks:
+                report.errors.extend(chunk.errors)
+                report.total += chunk.total
+                yield chunk.officials
+        
+        with profiling.stage('sqlite.load') as stats:
+            loaded = store.load(chain.from_iterable(valid_officials()))
+            if stats:
+                stats.add_records(loaded)
+        # Invalid input is loaded and reported again next time rather than reused silently
+        store.set_metadata('source', source if report.valid else '')
+        report.elapsed = time.perf_counter() - started
+        
+        if report.valid:
+            print(f"✅ Data validation successful ({report.total} records)")
+        else:
+            print(f"❌ Data validation failed for {report.invalid_records} record(s); "
+                  f"they were not stored")
+            for line in report.summary():
+                print(f"   {line}")
+        print(f"🗄️ Loaded {loaded} officials into {args.sqlite} in {report.elapsed:.1f}s")
+        valid = report.valid
+    
+    officials = store.iter_officials
+    schema = DataValidator(args.schema).schema
+    if args.export_csv:
+        DataExporter.export_to_csv(officials(), args.export_csv, DataExporter.csv_fieldnames(schema))
+        print(f"📊 Data exported to CSV: {args.export_csv}")
+    if args.export_json:
+        DataExporter.export_to_json(officials(), args.export_json)
+        print(f"📄 Data exported to JSON: {args.export_json}")
+    if args.export_parquet:
+        DataExporter.export_to_parquet(officials(), args.export_parquet, schema)
+        print(f"🧱 Data exported to Parquet: {args.export_parquet}")
+    if args.export_arrow:
+        DataExporter.export_to_arrow(officials(), args.export_arrow, schema)
+        print(f"🏹 Data exported to Arrow: {args.export_arrow}")
+    
+    if args.analyze:
+        with profiling.stage('sqlite.summary'):
+            summary = store.summary()
+        print_summary(summary)
+    return valid
+
+def run_incremental(args):
+    """Validate and export only what changed since the manifest was written.
+
+    Returns whether the input has no invalid records (changed or skipped earlier).
+    """
+    exports = {
+        export_format: path for export_format, path in (
+            ('csv', args.export_csv), ('json', args.export_json),
+            ('parquet', args.export_parquet), ('arrow', args.export_arrow),
+        ) if path
+    }
+    from src.incremental import sync as sync_incremental
+    
+    summary = new_summary(args)
+    report = sync_incremental(args.input, args.schema, exports, args.manifest, summary)
+    
+    print(f"🔁 {report.total} records: {len(report.added)} added, {len(report.modified)} modified, "
+          f"{len(report.removed)} removed")
+    for line in report.summary():
+        print(f"   {line}")
+    if report.errors:
+        print(f"❌ {len(report.errors)} validation error(s) in changed records; they were not exported")
+        for error in report.errors[:10]:
+            print(f"   record {error.index} [{error.field}]: {error.message}")
+    if report.invalid:
+        print(f"⚠️ {report.invalid} invalid record(s) skipped in total")
+    for path, action in report.exports.items():
+        print(f"💾 {path}: {action}")
+    
+    if args.change_report:
+        with open(args.change_report, 'w', encoding='utf-8') as f:
+            json.dump(report.to_dict(), f, indent=2)
+        print(f"📝 Change report written to: {args.change_report}")
+    
+    if summary is not None:
+        print_summary(summary)
+    return not report.invalid
+
+class _DiscardExports(Exception):
+    """Raised inside the writers' context so they drop their unfinished files"""
+
+def run_pipeline(args):
+    """Validate, export and analyze the input in one chunked pass.
+
+    Like the default path, nothing is exported or analyzed unless the whole
+    input is valid: the writers work on temporary files, which are discarded
+    if any record or the document around the records is invalid. Returns
+    whether the input was valid.
+    """
+    from src.parallel import process_officials
+    from src.validator import DataValidator, ValidationReport
+    
+    validator = DataValidator(args.schema)
+    schema = validator.schema
+    report = ValidationReport()
+    shell = {}
+    if args.stream:
+        # The shell is filled in as the file is read and checked at the end
+        officials = DataLoader.iter_officials(args.input, shell)
+    else:
+        data = DataLoader.load_file(args.input)
+        officials = data.get('officials') if isinstance(data, dict) else None
+        if DataLoader.is_officials_list(officials):
+            shell = dict(data, officials=[])
+        else:
+            shell, officials = data, []
+        report.document_errors = validator.document_errors(shell)
+    summary = new_summary(args)
+    started = time.perf_counter()
+    
+    try:
+        with ExitStack() as stack:
+            pipeline_stats = stack.enter_context(profiling.stage('pipeline'))
+            csv_writer, writers = open_writers(stack, args, schema)
             
-            df_with_social = analyzer.extract_social_media(df)
-            print("\nSocial media presence:")
-            social_cols = [col for col in df_with_social.columns if col in ['twitter', 'facebook', 'instagram']]
-            print(df_with_social[['name'] + social_cols].to_string(index=False))
+            chunks = [] if report.document_errors else process_officials(
+                officials, args.schema, workers=args.workers or 1,
+                chunk_size=args.chunk_size, flatten=bool(csv_writer))
+            for chunk in chunks:
+                report.errors.extend(chunk.errors)
+                report.total += chunk.total
+                if report.errors:
+                    # Keep validating to report every error, but stop writing
+                    continue
+                
+                with profiling.stage('pipeline.export', len(chunk.officials)):
+                    if csv_writer:
+                        for row in chunk.rows:
+                            csv_writer.write_row(row)
+                    for official in chunk.officials:
+                        for writer in writers:
+                            writer.write(official)
+                if args.analyze:
+                    with profiling.stage('pipeline.analyze', len(chunk.officials)):
+                        summary.update(chunk.officials)
+            if args.stream and not report.document_errors:
+                report.document_errors = validator.document_errors(shell)
+            if pipeline_stats:
+                pipeline_stats.add_records(report.total)
+            if not report.valid:
+                raise _DiscardExports()
+    except _DiscardExports:
+        pass
+    report.elapsed = time.perf_counter() - started
     
-    except Exception as e:
-        print(f"Error: {e}")
+    if not report.valid:
+        print(f"❌ Data validation failed ({report.invalid_records} invalid record(s))")
+        for line in report.summary():
+            print(f"   {line}")
+        return False
+    print(f"✅ Data validation successful ({report.total} records)")
+    
+    print_exports(args)
+    
+    if args.analyze:
+        print_summary(summary)
+    return True
+
+def run_multi(args):
+    """Ingest every file of a directory or glob as one roster, skipping files that fail.
+
+    Returns whether every file was read and every record was valid.
+    """
+    from src.parallel import ingest_files
+    from src.validator import DataValidator
+    
+    paths = DataLoader.expand_inputs(args.input)
+    schema = DataValidator(args.schema).schema
+    if args.source_field:
+        # The source becomes one more exported column
+        schema = copy.deepcopy(schema)
+        items = schema.setdefault('properties', {}).setdefault('officials', {}).setdefault('items', {})
+        items.setdefault('properties', {})[args.source_field] = {'type': 'string'}
+    summary = new_summary(args)
+    total = 0
+    invalid_files = []
+    failures = []
+    started = time.perf_counter()
+    
+    with ExitStack() as stack:
+        stats = stack.enter_context(profiling.stage('ingest'))
+        csv_writer, writers = open_writers(stack, args, schema)
+        if csv_writer:
+            writers.append(csv_writer)
+        
+        for result in ingest_files(paths, args.schema, workers=args.workers, io_threads=args.io_threads):
+            if result.failure:
+                failures.append(result)
+                continue
+            total += result.total
+            if result.errors:
+                invalid_files.append(result)
+            for official in result.officials:
+                if args.source_field:
+                    official = dict(official, **{args.source_field: result.path})
+                for writer in writers:
+                    writer.write(official)
+                if args.analyze:
+                    summary.add(official)
+        if stats:
+            stats.add_records(total)
+    elapsed = time.perf_counter() - started
+    
+    print(f"📂 Read {len(paths) - len(failures)} of {len(paths)} file(s), {total} records "
+          f"in {elapsed:.1f}s")
+    if failures:
+        print(f"⚠️ {len(failures)} file(s) skipped:")
+        for result in failures[:20]:
+            print(f"   {result.path}: {result.failure}")
+        if len(failures) > 20:
+            print(f"   ... and {len(failures) - 20} more file(s)")
+    if invalid_files:
+        invalid = sum(len({error.index for error in result.errors}) for result in invalid_files)
+        print(f"❌ Data validation failed for {invalid} record(s) in {len(invalid_files)} file(s); "
+              f"they were not exported")
+        shown = 0
+        for result in invalid_files:
+            for error in result.errors:
+                if shown < 10:
+                    print(f"   {result.path} record {error.index} [{error.field}]: {error.message}")
+                shown += 1
+        if shown > 10:
+            print(f"   ... and {shown - 10} more error(s)")
+    else:
+        print(f"✅ Data validation successful ({total} records)")
+    
+    print_exports(args)
+    
+    if args.analyze:
+        print_summary(summary)
+    return not (failures or invalid_files)
+
+def run_dedupe(args):
+    """Validate the whole input, cluster duplicate officials and export the (optionally merged) roster.
+
+    Returns whether every file was read and every record was valid.
+    """
+    from src.dedupe import find_duplicates, merged_roster, DEFAULT_THRESHOLD
+    from src.parallel import ingest_files, process_officials
+    from src.validator import DataValidator
+    
+    officials = []
+    invalid = skipped = 0
+    if DataLoader.is_multi_input(args.input):
+        for result in ingest_files(DataLoader.expand_inputs(args.input), args.schema,
+                                   workers=args.workers, io_threads=args.io_threads):
+            if result.failure:
+                print(f"⚠️ Skipped {result.path}: {result.failure}")
+                skipped += 1
+                continue
+            officials.extend(result.officials)
+            invalid += len({error.index for error in result.errors})
+    else:
+        for chunk in process_officials(DataLoader.iter_officials(args.input), args.schema,
+                                       workers=args.workers or 1, chunk_size=args.chunk_size,
+                                       flatten=False):
+            officials.extend(chunk.officials)
+            invalid += len({error.index for error in chunk.errors})
+    if invalid:
+        print(f"❌ {invalid} invalid record(s) skipped")
+    print(f"✅ {len(officials)} valid officials loaded")
+    
+    started = time.perf_counter()
+    threshold = DEFAULT_THRESHOLD if args.dedupe_threshold is None else args.dedupe_threshold
+    result = find_duplicates(officials, threshold, workers=args.workers or 1)
+    elapsed = time.perf_counter() - started
+    print(f"🔍 {len(result.clusters)} duplicate cluster(s), {result.duplicates} redundant record(s) "
+          f"({result.compared:,} name comparisons in {elapsed:.1f}s)")
+    for line in result.summary(officials):
+        print(f"   {line}")
+    if result.generic_keys:
+        print(f"⚠️ {result.generic_keys} handle/email/phone value(s) shared by too many officials were ignored")
+    if args.dedupe_output:
+        with open(args.dedupe_output, 'w', encoding='utf-8') as f:
+            json.dump(result.to_dict(), f, indent=2)
+        print(f"🧾 Duplicate clusters written to: {args.dedupe_output}")
+    
+    roster = merged_roster(officials, result) if args.merge_duplicates else iter(officials)
+    summary = new_summary(args)
+    schema = DataValidator(args.schema).schema
+    with ExitStack() as stack:
+        csv_writer, writers = open_writers(stack, args, schema)
+        if csv_writer:
+            writers.append(csv_writer)
+        for official in roster:
+            for writer in writers:
+                writer.write(official)
+            if args.analyze:
+                summary.add(official)
+    
+    print_exports(args)
+    
+    if args.analyze:
+        print_summary(summary)
+    return not (invalid or skipped)
+
+def open_writers(stack, args, schema):
+    """Enter the streaming writers for the requested exports; returns (CSV writer or None, others)"""
+    from src.columnar import ColumnarStreamWriter
+    from src.exporter import DataExporter, CSVStreamWriter, JSONStreamWriter
+    
+    csv_writer = None
+    writers = []
+    if args.export_csv:
+        fieldnames = DataExporter.csv_fieldnames(schema)
+        csv_writer = stack.enter_context(CSVStreamWriter(args.export_csv, fieldnames))
+    if args.export_json:
+        writers.append(stack.enter_context(JSONStreamWriter(args.export_json)))
+    if args.export_parquet:
+        writers.append(stack.enter_context(
+            ColumnarStreamWriter(args.export_parquet, schema, file_format='parquet')))
+    if args.export_arrow:
+        writers.append(stack.enter_context(
+            ColumnarStreamWriter(args.export_arrow, schema, file_format='arrow')))
+    return csv_writer, writers
+
+def new_summary(args):
+    """Running counters for --analyze (None without it, which keeps pandas unimported)"""
+    if not args.analyze:
+        return None
+    from src.analyzer import OfficialsSummary
+    return OfficialsSummary()
+
+def print_exports(args):
+    if args.export_csv:
+        print(f"📊 Data exported to CSV: {args.export_csv}")
+    if args.export_json:
+        print(f"📄 Data exported to JSON: {args.export_json}")
+    if args.export_parquet:
+        print(f"🧱 Data exported to Parquet: {args.export_parquet}")
+    if args.export_arrow:
+        print(f"🏹 Data exported to Arrow: {args.export_arrow}")
+
+def print_summary(summary):
+    """Print the analysis computed from running counters"""
+    print("\n=== Basic Analysis ===")
+    print(f"Total officials: {summary.total}")
+    
+    print("\nOfficials by party:")
+    print(summary.count_by_party().to_string(index=False))
+    
+    print("\nOfficials by designation:")
+    print(summary.officials_by_designation().to_string(index=False))
+    
+    print("\nSocial media presence:")
+    print(summary.social_media_counts().to_string(index=False))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -1,29 +1,187 @@
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Iterable, Sequence
+import numpy as np
 import pandas as pd
 
+from src import columnar
+from src.exporter import FLATTENED_FIELDS
+from src.profiling import profiled, argument_records
+
+# Low-cardinality text columns stored as pandas categoricals in compact mode
+CATEGORICAL_FIELDS = ['party', 'designation', 'jurisdiction']
+
+# DataFrame.attrs entry listing the columns normalize() expanded the nested fields into
+_EXPANDED = 'officials_expanded_columns'
+
 class DataAnalyzer:
     @staticmethod
-    def officials_to_dataframe(officials: List[Dict[str, Any]]) -> pd.DataFrame:
-        """Convert officials list to pandas DataFrame"""
-        return pd.DataFrame(officials)
+    @profiled('officials_to_dataframe', records=argument_records(0))
+    def officials_to_dataframe(officials: Sequence[Dict[str, Any]], compact: bool = False) -> pd.DataFrame:
+        """Convert officials list to pandas DataFrame (see compact for the compact form)"""
+        if isinstance(officials, columnar.TableOfficials):
+            df = DataAnalyzer.table_to_dataframe(officials.table)
+        else:
+            df = pd.DataFrame(officials)
+        return DataAnalyzer.compact(df) if compact else df
+    
+    @staticmethod
+    @profiled('compact', records=argument_records(0))
+    def compact(df: pd.DataFrame) -> pd.DataFrame:
+        """Memory-compact form of an officials DataFrame.
+
+        Nested dicts are replaced by their flattened social_*/contact_* columns,
+        party/designation/jurisdiction become categoricals and the remaining
+        text columns use pyarrow-backed strings when pyarrow is installed.
+        """
+        df = DataAnalyzer.normalize(df).drop(columns=list(FLATTENED_FIELDS), errors='ignore')
+        text_dtype = 'string[pyarrow]' if columnar.has_pyarrow() else 'string'
+        dtypes = {}
+        for col in df.columns:
+            if col in CATEGORICAL_FIELDS:
+                dtypes[col] = 'category'
+            elif df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype):
+                dtypes[col] = text_dtype
+        compacted = df.astype(dtypes)
+        compacted.attrs.update(df.attrs)
+        return compacted
+    
+    @staticmethod
+    def memory_usage(df: pd.DataFrame) -> int:
+        """Total bytes held by a DataFrame, including the contents of object cells"""
+        return int(df.memory_usage(deep=True).sum())
     
     @staticmethod
+    def table_to_dataframe(table) -> pd.DataFrame:
+        """Convert an Arrow table (see src.columnar) to a DataFrame.
+
+        Dictionary-encoded columns become categoricals and struct columns dict cells.
+        """
+        return table.to_pandas()
+    
+    @staticmethod
+    def _category_counts(column: pd.Series) -> pd.Series:
+        """Non-zero counts per category, computed on the integer codes"""
+        codes = column.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(column.cat.categories))
+        counts = pd.Series(counts, index=column.cat.categories.astype(object))
+        return counts[counts > 0]
+    
+    @staticmethod
+    @profiled('count_by_party', records=argument_records(0))
     def count_by_party(df: pd.DataFrame) -> pd.DataFrame:
         """Count officials by political party"""
-        return df['party'].value_counts().reset_index().rename(
-            columns={'index': 'party', 'party': 'count'}
-        )
+        if isinstance(df['party'].dtype, pd.CategoricalDtype):
+            counts = DataAnalyzer._category_counts(df['party']).sort_values(
+                ascending=False, kind='stable'
+            )
+        else:
+            counts = df['party'].value_counts()
+        return pd.DataFrame({'party': counts.index, 'count': counts.to_numpy()})
     
     @staticmethod
+    @profiled('officials_by_designation', records=argument_records(0))
     def officials_by_designation(df: pd.DataFrame) -> pd.DataFrame:
         """Group officials by their designation"""
+        if isinstance(df['designation'].dtype, pd.CategoricalDtype):
+            counts = DataAnalyzer._category_counts(df['designation']).sort_index()
+            return pd.DataFrame({'designation': counts.index, 'count': counts.to_numpy()})
         return df.groupby('designation').size().reset_index(name='count')
     
     @staticmethod
+    @profiled('normalize', records=argument_records(0))
+    def normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """Expand social_media and contact dicts into typed social_*/contact_* columns.
+
+        The expanded column names are kept in df.attrs; later calls return the
+        frame unchanged while the nested fields and all of those columns are
+        still there (pandas copies attrs to projections, which may drop them).
+        """
+        nested = [field for field in FLATTENED_FIELDS if field in df.columns]
+        done = df.attrs.get(_EXPANDED)
+        if not nested or (done is not None and set(done) <= set(df.columns)):
+            return df
+        expanded = []
+        for field, prefix in FLATTENED_FIELDS.items():
+            if field not in df.columns:
+                continue
+            records = [value if isinstance(value, dict) else {} for value in df[field].tolist()]
+            columns = pd.DataFrame.from_records(records, index=df.index)
+            expanded.append(columns.add_prefix(f'{prefix}_').astype('string'))
+        columns = [col for frame in expanded for col in frame.columns]
+        # Replace columns left over from an earlier expansion rather than duplicating them
+        df = df.drop(columns=[col for col in columns if col in df.columns])
+        normalized = pd.concat([df] + expanded, axis=1) if expanded else df.copy()
+        normalized.attrs[_EXPANDED] = columns
+        return normalized
+    
+    @staticmethod
+    def social_media_columns(df: pd.DataFrame) -> List[str]:
+        """Names of the social_* columns of a normalized DataFrame"""
+        prefix = FLATTENED_FIELDS['social_media'] + '_'
+        return [col for col in df.columns if col.startswith(prefix) and col not in FLATTENED_FIELDS]
+    
+    @staticmethod
+    @profiled('extract_social_media', records=argument_records(0))
     def extract_social_media(df: pd.DataFrame) -> pd.DataFrame:
         """Extract social media information into separate columns"""
-        # Expand social media data
-        social_df = df['social_media'].apply(
-            lambda x: pd.Series(x) if isinstance(x, dict) else pd.Series()
-        )
-        return pd.concat([df, social_df], axis=1)
\ No newline at end of file
+        df = DataAnalyzer.normalize(df)
+        social = {col.split('_', 1)[1]: df[col] for col in DataAnalyzer.social_media_columns(df)}
+        return df.assign(**social)
+
+
+class OfficialsSummary:
+    """Running counts over a stream of officials, for single-pass analysis"""
+
+    def __init__(self):
+        self.total = 0
+        self.parties = Counter()
+        self.designations = Counter()
+        self.social_platforms = Counter()
+
+    def add(self, official: Dict[str, Any]) -> None:
+        """Count one official"""
+        self.total += 1
+        if official.get('party') is not None:
+            self.parties[official['party']] += 1
+        if official.get('designation') is not None:
+            self.designations[official['designation']] += 1
+        social_media = official.get('social_media')
+        if isinstance(social_media, dict):
+            self.social_platforms.update(
+                platform for platform, handle in social_media.items() if handle is not None
+            )
+
+    def update(self, officials: Iterable[Dict[str, Any]]) -> 'OfficialsSummary':
+        """Count many officials"""
+        for official in officials:
+            self.add(official)
+        return self
+
+    def copy(self) -> 'OfficialsSummary':
+        """Independent copy; costs O(distinct values), not O(officials)"""
+        summary = OfficialsSummary()
+        summary.total = self.total
+        summary.parties = self.parties.copy()
+        summary.designations = self.designations.copy()
+        summary.social_platforms = self.social_platforms.copy()
+        return summary
+
+    @property
+    def unique_parties(self) -> int:
+        return len(self.parties)
+
+    @property
+    def unique_designations(self) -> int:
+        return len(self.designations)
+
+    def count_by_party(self) -> pd.DataFrame:
+        """Count officials by political party, shaped like DataAnalyzer.count_by_party"""
+        return pd.DataFrame(self.parties.most_common(), columns=['party', 'count'])
+
+    def officials_by_designation(self) -> pd.DataFrame:
+        """Group officials by designation, shaped like DataAnalyzer.officials_by_designation"""
+        return pd.DataFrame(sorted(self.designations.items()), columns=['designation', 'count'])
+
+    def social_media_counts(self) -> pd.DataFrame:
+        """Count officials per social media platform"""
+        return pd.DataFrame(self.social_platforms.most_common(), columns=['platform', 'count'])
@@ -0,0 +1,224 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Any, Callable, Hashable, Optional
+import hashlib
+import json
+import threading
+
+import pandas as pd
+
+from src import columnar
+from src.analyzer import DataAnalyzer, OfficialsSummary
+from src.data_loader import DataLoader
+from src.exporter import DataExporter
+from src.search_index import SearchIndex
+from src.sort_index import SortIndex
+from src.validator import DataValidator, ValidationReport
+
+# Bounds for datasets cached from uploads; files on disk are few and are keyed by mtime
+UPLOAD_CACHE_BYTES = 512 * 2**20
+FILE_CACHE_ENTRIES = 16
+# Parsed JSON (dicts and strings) takes about this many times its size in bytes
+PARSED_JSON_FACTOR = 4
+# In-memory exports, keyed by dataset version hash, format and compression
+EXPORT_CACHE_BYTES = 256 * 2**20
+
+
+@dataclass
+class LoadedDataset:
+    """A parsed, validated dataset and its DataFrame.
+
+    Instances are shared between sessions and must be treated as read-only.
+    key is a hash of the cache key (source contents or file state, schema).
+    nbytes estimates the memory of both df and the parsed source in data.
+    """
+    data: Dict[str, Any]
+    df: pd.DataFrame
+    report: ValidationReport
+    summary: OfficialsSummary
+    nbytes: int
+    key: Optional[str] = None
+    _search_index: Optional[SearchIndex] = field(default=None, init=False, repr=False)
+    _sort_index: Optional[SortIndex] = field(default=None, init=False, repr=False)
+    _index_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def search_index(self) -> SearchIndex:
+        """Search index over the officials, built on first use and shared like the rest"""
+        with self._index_lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex(DataLoader.get_officials(self.data))
+        return self._search_index
+
+    def sort_index(self) -> SortIndex:
+        """Per-column sort ranks over the DataFrame, shared like the search index"""
+        with self._index_lock:
+            if self._sort_index is None:
+                self._sort_index = SortIndex(self.df)
+        return self._sort_index
+
+
+@dataclass
+class ExportedFile:
+    """An export built in memory, ready for a download"""
+    data: bytes
+    file_name: str
+    nbytes: int
+
+
+class DatasetCache:
+    """Thread-safe LRU cache bounded by entry count and approximate size in bytes.
+
+    Entries are LoadedDatasets or anything else with an nbytes attribute.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, LoadedDataset]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[Hashable, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_load(self, key: Hashable, load: Callable[[], LoadedDataset]) -> LoadedDataset:
+        """Return the cached dataset for key, loading it once if missing"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        # Concurrent sessions asking for the same key wait for a single load
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key]
+            try:
+                dataset = load()
+            except BaseException:
+                with self._lock:
+                    self._release(key, key_lock)
+                raise
+            # Inserting and releasing the key lock together leaves no gap for a second load
+            with self._lock:
+                self.misses += 1
+                replaced = self._entries.pop(key, None)
+                if replaced is not None:
+                    self.nbytes -= replaced.nbytes
+                self._entries[key] = dataset
+                self.nbytes += dataset.nbytes
+                self._evict()
+                self._release(key, key_lock)
+        return dataset
+
+    def _release(self, key: Hashable, key_lock: threading.Lock) -> None:
+        if self._loading.get(key) is key_lock:
+            del self._loading[key]
+
+    def _evict(self) -> None:
+        # Always keep the newest entry, even if it alone exceeds max_bytes
+        while len(self._entries) > 1 and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+_file_cache = DatasetCache(max_entries=FILE_CACHE_ENTRIES)
+_upload_cache = DatasetCache(max_bytes=UPLOAD_CACHE_BYTES)
+_export_cache = DatasetCache(max_bytes=EXPORT_CACHE_BYTES)
+
+
+def _file_key(file_path: str) -> tuple:
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    stat = path.stat()
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def _hash_key(key: tuple) -> str:
+    return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+
+def _source_nbytes(data: Dict[str, Any], source_bytes: int) -> int:
+    """Approximate memory held by the parsed source a LoadedDataset keeps in data"""
+    officials = DataLoader.get_officials(data)
+    if isinstance(officials, columnar.TableOfficials):
+        return officials.table.nbytes
+    return source_bytes * PARSED_JSON_FACTOR
+
+
+def _build(data: Dict[str, Any], schema_file: str, compact: bool, key: tuple,
+           source_bytes: int) -> LoadedDataset:
+    """source_bytes is the size of the file or upload data was parsed from"""
+    report = DataValidator(schema_file).validate_report(data)
+    df = DataAnalyzer.officials_to_dataframe(DataLoader.get_officials(data))
+    df = DataAnalyzer.compact(df) if compact else DataAnalyzer.normalize(df)
+    summary = OfficialsSummary().update(DataLoader.get_officials(data))
+    nbytes = DataAnalyzer.memory_usage(df) + _source_nbytes(data, source_bytes)
+    return LoadedDataset(data, df, report, summary, nbytes, _hash_key(key))
+
+
+def load_dataset_file(file_path: str, schema_file: str, compact: bool = False) -> LoadedDataset:
+    """Load, validate and build a dataset from disk, shared until the file or schema changes"""
+    file_state = _file_key(file_path)
+    key = (file_state, _file_key(schema_file), compact)
+
+    def load() -> LoadedDataset:
+        _, _, size = file_state
+        return _build(DataLoader.load_file(file_path), schema_file, compact, key, size)
+
+    return _file_cache.get_or_load(key, load)
+
+
+def load_dataset_bytes(content: bytes, file_name: str, schema_file: str,
+                       compact: bool = False) -> LoadedDataset:
+    """Load, validate and build a dataset from uploaded bytes, shared by content hash"""
+    is_columnar = file_name.lower().endswith(tuple(columnar.COLUMNAR_SUFFIXES))
+    key = (hashlib.sha256(content).hexdigest(), is_columnar, _file_key(schema_file), compact)
+
+    def load() -> LoadedDataset:
+        if is_columnar:
+            table = columnar.read_table_bytes(content, file_name)
+            return _build({"officials": columnar.TableOfficials(table)}, schema_file, compact, key, len(content))
+        return _build(json.loads(content), schema_file, compact, key, len(content))
+
+    return _upload_cache.get_or_load(key, load)
+
+
+def export_dataset(dataset, file_format: str, compression: Optional[str] = None,
+                   schema_file: Optional[str] = None, stem: str = "officials_export") -> ExportedFile:
+    """Export a dataset in memory, shared across sessions until its version_hash changes.
+
+    dataset is an OfficialsDataset or StoreDataset; see DataExporter.iter_export
+    for the formats and compressions. Parquet and Arrow columns come from
+    schema_file; without it they are inferred from the first record batch.
+    """
+    key = (dataset.version_hash, file_format, compression,
+           _file_key(schema_file) if schema_file else None)
+
+    def load() -> ExportedFile:
+        officials = dataset.officials()
+        if file_format == 'csv':
+            # The CSV columns are the union of keys, found without a spill file
+            officials = list(officials)
+        schema = DataValidator(schema_file).schema if schema_file else None
+        data = DataExporter.export_to_bytes(officials, file_format, compression, schema)
+        return ExportedFile(data, DataExporter.export_file_name(stem, file_format, compression), len(data))
+
+    return _export_cache.get_or_load(key, load)
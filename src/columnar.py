@@ -0,0 +1,268 @@
+import os
+from collections.abc import Sequence
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+
+# pyarrow is optional and slow to import, so it is only imported by the first call that needs it
+pa = ipc = pq = None
+_pyarrow_missing = False
+
+PARQUET_SUFFIXES = {'.parquet', '.pq'}
+ARROW_SUFFIXES = {'.arrow', '.feather', '.ipc'}
+COLUMNAR_SUFFIXES = PARQUET_SUFFIXES | ARROW_SUFFIXES
+
+# Low-cardinality columns stored dictionary-encoded (categorical in pandas)
+DICTIONARY_FIELDS = {'party', 'designation'}
+DEFAULT_BATCH_SIZE = 65536
+
+_JSON_TO_ARROW = {
+    'string': 'string',
+    'integer': 'int64',
+    'number': 'float64',
+    'boolean': 'bool_',
+}
+
+
+def has_pyarrow() -> bool:
+    """Import pyarrow if it is installed; pa, ipc and pq are set afterwards"""
+    global pa, ipc, pq, _pyarrow_missing
+    if pa is None and not _pyarrow_missing:
+        try:
+            import pyarrow
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            _pyarrow_missing = True
+        else:
+            pa, ipc, pq = pyarrow, pyarrow.ipc, pyarrow.parquet
+    return pa is not None
+
+
+def require_pyarrow() -> None:
+    if not has_pyarrow():
+        raise ImportError("pyarrow is required for Parquet/Arrow support: pip install pyarrow")
+
+
+def _arrow_type(name: str, prop: Dict[str, Any]):
+    if prop.get('type') == 'object':
+        return pa.struct([
+            pa.field(key, _arrow_type(key, sub)) for key, sub in prop.get('properties', {}).items()
+        ])
+    if name in DICTIONARY_FIELDS and prop.get('type') == 'string':
+        return pa.dictionary(pa.int32(), pa.string())
+    return getattr(pa, _JSON_TO_ARROW.get(prop.get('type'), 'string'))()
+
+
+def arrow_schema(schema: Dict[str, Any]):
+    """Build the Arrow schema of an official from the JSON schema.
+
+    Nested objects (social_media, contact) become struct columns.
+    """
+    require_pyarrow()
+    item_schema = schema.get('properties', {}).get('officials', {}).get('items', {})
+    return pa.schema([
+        pa.field(name, _arrow_type(name, prop)) for name, prop in item_schema.get('properties', {}).items()
+    ])
+
+
+def _drop_nulls(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Undo the null padding of struct columns so records match their JSON form"""
+    cleaned = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            value = {sub: item for sub, item in value.items() if item is not None}
+        if value is not None:
+            cleaned[key] = value
+    return cleaned
+
+
+def officials_to_table(officials: List[Dict[str, Any]], schema: Optional[Dict[str, Any]] = None):
+    """Convert officials to an Arrow table, typed by the JSON schema when given"""
+    require_pyarrow()
+    if schema is not None:
+        return pa.Table.from_pylist(officials, schema=arrow_schema(schema))
+    # from_pylist infers columns from the first record only; pa.array looks at all of them
+    table = pa.Table.from_struct_array(pa.array(officials))
+    for name in DICTIONARY_FIELDS & set(table.column_names):
+        index = table.schema.get_field_index(name)
+        table = table.set_column(index, name, table.column(name).dictionary_encode())
+    return table
+
+
+def table_to_officials(table) -> List[Dict[str, Any]]:
+    """Convert an Arrow table back to official dicts"""
+    return [_drop_nulls(record) for record in table.to_pylist()]
+
+
+class TableOfficials(Sequence):
+    """Read-only list of officials backed by an Arrow table.
+
+    The table stays the source (memory-mapped for Arrow IPC files); dicts are
+    built one record batch at a time while iterating, and one row at a time
+    when indexing, and are not kept.
+    """
+
+    def __init__(self, table):
+        self.table = table
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return TableOfficials(self.table.slice(start, max(stop - start, 0)))
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("officials index out of range")
+        return _drop_nulls(self.table.slice(index, 1).to_pylist()[0])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for batch in self.table.to_batches(max_chunksize=DEFAULT_BATCH_SIZE):
+            for record in batch.to_pylist():
+                yield _drop_nulls(record)
+
+
+def is_parquet(file_path: str) -> bool:
+    return file_path.lower().endswith(tuple(PARQUET_SUFFIXES))
+
+
+def read_table(file_path: str, memory_map: bool = True):
+    """Read a Parquet or Arrow IPC file into an Arrow table.
+
+    Arrow IPC files are memory-mapped, so uncompressed snapshots are not copied.
+    """
+    require_pyarrow()
+    if is_parquet(file_path):
+        return pq.read_table(file_path, memory_map=memory_map)
+    source = pa.memory_map(file_path) if memory_map else pa.OSFile(file_path)
+    return ipc.open_file(source).read_all()
+
+
+def read_table_bytes(data: bytes, file_name: str):
+    """Read a Parquet or Arrow IPC file held in memory (e.g. an upload) without copying it"""
+    require_pyarrow()
+    buffer = pa.py_buffer(data)
+    if is_parquet(file_name):
+        return pq.read_table(pa.BufferReader(buffer))
+    return ipc.open_file(buffer).read_all()
+
+
+def iter_officials(file_path: str) -> Iterator[Dict[str, Any]]:
+    """Yield officials from a Parquet or Arrow IPC file one record batch at a time"""
+    require_pyarrow()
+    if is_parquet(file_path):
+        batches = pq.ParquetFile(file_path).iter_batches(batch_size=DEFAULT_BATCH_SIZE)
+    else:
+        reader = ipc.open_file(pa.memory_map(file_path))
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        for record in batch.to_pylist():
+            yield _drop_nulls(record)
+
+
+class ColumnarStreamWriter:
+    """Write officials to a Parquet or Arrow IPC file in record batches.
+
+    Only one batch of records is buffered at a time. file_format is 'parquet'
+    or 'arrow'; by default it is chosen from the file suffix. file_path may
+    also be a writable binary file object (which is left open) if file_format
+    is given. A file is written next to file_path and only moved into place
+    if the writer exits without an exception; a file object is left without
+    its footer. Without a JSON schema the columns are inferred from the first batch.
+    """
+
+    def __init__(self, file_path: str, schema: Optional[Dict[str, Any]] = None,
+                 file_format: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        require_pyarrow()
+        if file_format is None and hasattr(file_path, 'write'):
+            raise ValueError("file_format is required when writing to a file object")
+        self.file_path = file_path
+        self.schema = schema
+        self.file_format = file_format or ('parquet' if is_parquet(file_path) else 'arrow')
+        self.batch_size = batch_size
+        self.count = 0
+        self._arrow_schema = arrow_schema(schema) if schema is not None else None
+        self._batch = []
+        self._writer = None
+        # Dictionaries only ever grow, so Arrow IPC can store them as deltas
+        self._dictionaries: Dict[str, Dict[str, int]] = {}
+
+    def __enter__(self) -> 'ColumnarStreamWriter':
+        return self
+
+    def write(self, official: Dict[str, Any]) -> None:
+        self._batch.append(official)
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _encode(self, name: str, column):
+        """Dictionary-encode a column against the dictionary of earlier batches"""
+        lookup = self._dictionaries.setdefault(name, {})
+        indices = [
+            None if value is None else lookup.setdefault(value, len(lookup))
+            for value in column.cast(pa.string()).to_pylist()
+        ]
+        if not lookup and self.file_format == 'arrow':
+            # IPC files cannot grow an empty first dictionary by deltas, so an
+            # all-null first batch gets one unreferenced (still valid) entry
+            lookup[''] = 0
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, pa.int32()), pa.array(list(lookup), pa.string())
+        )
+
+    def _flush(self) -> None:
+        if self._arrow_schema is None:
+            table = officials_to_table(self._batch, self.schema)
+            self._arrow_schema = table.schema
+        else:
+            table = pa.Table.from_pylist(self._batch, schema=self._arrow_schema)
+        self._batch = []
+        if self._writer is None:
+            target = self.file_path if self._is_file else self._staging
+            if self.file_format == 'parquet':
+                self._writer = pq.ParquetWriter(target, self._arrow_schema)
+            else:
+                options = ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+                self._writer = ipc.new_file(target, self._arrow_schema, options=options)
+        for index, field in enumerate(self._arrow_schema):
+            if pa.types.is_dictionary(field.type):
+                table = table.set_column(index, field, self._encode(field.name, table.column(index)))
+        self._writer.write_table(table)
+
+    @property
+    def _is_file(self) -> bool:
+        return hasattr(self.file_path, 'write')
+
+    @property
+    def _staging(self) -> str:
+        return f"{self.file_path}.tmp"
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        succeeded = False
+        try:
+            if exc_type is None and (self._batch or self._writer is None):
+                if self._batch or self._arrow_schema is not None:
+                    self._flush()
+                else:
+                    raise ValueError("No officials data to export")
+            succeeded = exc_type is None
+        finally:
+            if self._writer is not None and (succeeded or not self._is_file):
+                self._writer.close()
+            if self._writer is not None and not self._is_file:
+                if succeeded:
+                    os.replace(self._staging, self.file_path)
+                elif os.path.exists(self._staging):
+                    os.remove(self._staging)
+
+
+def write_officials(officials: Iterable[Dict[str, Any]], file_path: str,
+                    schema: Optional[Dict[str, Any]] = None, file_format: Optional[str] = None) -> None:
+    """Write officials to a Parquet or Arrow IPC file"""
+    with ColumnarStreamWriter(file_path, schema, file_format) as writer:
+        for official in officials:
+            writer.write(official)
@@ -1,26 +1,247 @@
+import glob
 import json
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Optional, Sequence, TextIO
+
+from src import columnar
+from src.profiling import profiled, result_records
+
+try:
+    import ijson
+except ImportError:  # optional, the built-in incremental parser is used instead
+    ijson = None
+
+JSON_LINES_SUFFIXES = {'.jsonl', '.ndjson'}
+INPUT_SUFFIXES = {'.json'} | JSON_LINES_SUFFIXES | columnar.COLUMNAR_SUFFIXES
+_GLOB_CHARS = set('*?[')
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = ' \t\n\r'
+
 
 class DataLoader:
     @staticmethod
+    @profiled('load_json', records=result_records)
     def load_json(file_path: str) -> Dict[str, Any]:
         """Load JSON data from file"""
         path = Path(file_path)
         if not path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
-        
+
+        if path.suffix.lower() in JSON_LINES_SUFFIXES:
+            return {"officials": list(DataLoader.iter_officials(file_path))}
+
         with open(path, 'r', encoding='utf-8') as f:
             return json.load(f)
-    
+
+    @staticmethod
+    @profiled('load_file', records=result_records)
+    def load_file(file_path: str) -> Dict[str, Any]:
+        """Load officials data from a JSON, JSON Lines, Parquet or Arrow file.
+
+        Columnar officials come as a columnar.TableOfficials over the table.
+        """
+        path = Path(file_path)
+        if path.suffix.lower() not in columnar.COLUMNAR_SUFFIXES:
+            return DataLoader.load_json(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        return {"officials": columnar.TableOfficials(columnar.read_table(file_path))}
+
+    @staticmethod
+    def loads(content: bytes, file_name: str) -> Dict[str, Any]:
+        """Parse officials data held in memory; the format is chosen from file_name's suffix"""
+        suffix = Path(file_name).suffix.lower()
+        if suffix in columnar.COLUMNAR_SUFFIXES:
+            return {"officials": columnar.table_to_officials(columnar.read_table_bytes(content, file_name))}
+        if suffix in JSON_LINES_SUFFIXES:
+            officials = []
+            for line_no, line in enumerate(content.decode('utf-8').splitlines(), 1):
+                if not line.strip():
+                    continue
+                try:
+                    officials.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{file_name}:{line_no}: invalid JSON: {e.msg}") from e
+            return {"officials": officials}
+        return json.loads(content)
+
+    @staticmethod
+    def is_officials_list(value: Any) -> bool:
+        """Whether a document's "officials" value is a list (parsed JSON or an Arrow table)"""
+        return isinstance(value, (list, columnar.TableOfficials))
+
+    @staticmethod
+    def is_multi_input(pattern: str) -> bool:
+        """Whether an --input value names a directory or glob rather than one file"""
+        return Path(pattern).is_dir() or bool(_GLOB_CHARS & set(pattern))
+
+    @staticmethod
+    def expand_inputs(pattern: str) -> List[str]:
+        """Data files under a directory (recursively) or matching a glob, in sorted order"""
+        if Path(pattern).is_dir():
+            paths = (str(path) for path in Path(pattern).rglob('*'))
+        else:
+            paths = glob.iglob(pattern, recursive=True)
+        files = sorted(
+            path for path in paths
+            if Path(path).suffix.lower() in INPUT_SUFFIXES and Path(path).is_file()
+        )
+        if not files:
+            raise FileNotFoundError(f"No officials files found for: {pattern}")
+        return files
+
     @staticmethod
     def save_json(data: Dict[str, Any], file_path: str) -> None:
         """Save data to JSON file"""
         path = Path(file_path)
         with open(path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2)
-    
+
     @staticmethod
-    def get_officials(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def get_officials(data: Dict[str, Any]) -> Sequence[Dict[str, Any]]:
         """Extract officials list from loaded data"""
-        return data.get('officials', [])
\ No newline at end of file
+        return data.get('officials', [])
+
+    @staticmethod
+    def iter_officials(file_path: str, shell: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield officials one at a time without loading the whole file.
+
+        JSON Lines files (.jsonl/.ndjson) hold one official per line, Parquet
+        and Arrow files are read a record batch at a time; any other file is
+        parsed incrementally and the "officials" array is streamed.
+
+        If shell is given, it is filled with the document around the officials
+        (with "officials" as an empty list when the array was found) for
+        document-level validation; it is complete once iteration ends.
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        if path.suffix.lower() in columnar.COLUMNAR_SUFFIXES or path.suffix.lower() in JSON_LINES_SUFFIXES:
+            if shell is not None:
+                shell['officials'] = []
+
+        if path.suffix.lower() in columnar.COLUMNAR_SUFFIXES:
+            yield from columnar.iter_officials(file_path)
+            return
+
+        if path.suffix.lower() in JSON_LINES_SUFFIXES:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"{file_path}:{line_no}: invalid JSON: {e.msg}") from e
+            return
+
+        # ijson only sees the officials array, so the shell needs the built-in reader
+        if ijson is not None and shell is None:
+            with open(path, 'rb') as f:
+                yield from ijson.items(f, 'officials.item', use_float=True)
+            return
+
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from _OfficialsArrayReader(f, shell)
+
+
+class _OfficialsArrayReader:
+    """Incremental reader for the top-level "officials" array of a JSON document.
+
+    Only one array element (plus one read chunk) is held in memory at a time.
+    Other top-level members are collected in shell when one is given, which
+    means reading on past the array to the end of the document.
+    """
+
+    def __init__(self, stream: TextIO, shell: Optional[Dict[str, Any]] = None):
+        self.stream = stream
+        self.shell = shell
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._expect('{')
+        if self._peek() == '}':
+            return
+        while True:
+            key = self._decode()
+            self._expect(':')
+            if key == 'officials' and self._peek() == '[':
+                yield from self._iter_array()
+                if self.shell is None:
+                    return
+                self.shell[key] = []
+            elif self.shell is not None:
+                self.shell[key] = self._decode()
+            else:
+                self._decode()
+            if self._peek() == ',':
+                self.pos += 1
+                continue
+            self._expect('}')
+            return
+
+    def _iter_array(self) -> Iterator[Dict[str, Any]]:
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self._decode()
+            if self._peek() == ',':
+                self.pos += 1
+                continue
+            self._expect(']')
+            return
+
+    def _fill(self, size: int = _CHUNK_SIZE) -> bool:
+        """Read more input, discarding what has already been consumed"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of input)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Invalid officials JSON: expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def _decode(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed"""
+        self._peek()
+        read_size = _CHUNK_SIZE
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if not self._fill(read_size):
+                    raise ValueError(f"Invalid officials JSON: {e.msg}") from e
+                read_size *= 2
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self.buf[end - 1] not in '}]"el':
+                self._fill(read_size)
+                continue
+            self.pos = end
+            return value
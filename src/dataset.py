@@ -0,0 +1,333 @@
+from itertools import chain
+import hashlib
+import json
+from typing import Dict, List, Any, Callable, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer import DataAnalyzer, OfficialsSummary
+from src.exporter import FLATTENED_FIELDS
+from src.search_index import SearchIndex
+from src.sort_index import SortIndex, directed
+from src.sqlite_store import OfficialsStore
+
+
+class OfficialsDataset:
+    """A session's view of a roster: a shared, read-only base plus its own additions.
+
+    Appending is O(1): the official goes to a private list and the running
+    counters (party, designation, social platform) are updated in place.
+    The base data, DataFrame and counters are never modified, so the base can
+    come straight from the cross-session cache. search_index and sort_index,
+    if given, return (possibly shared) indexes over the base officials;
+    base_key, if given, identifies the base contents (see version_hash).
+    """
+
+    def __init__(self, officials: Sequence[Dict[str, Any]], df: Optional[pd.DataFrame] = None,
+                 summary: Optional[OfficialsSummary] = None, compact: bool = False,
+                 search_index: Optional[Callable[[], SearchIndex]] = None,
+                 sort_index: Optional[Callable[[], SortIndex]] = None,
+                 base_key: Optional[str] = None):
+        self.compact = compact
+        self._base = officials
+        self._base_df = df if df is not None else self._build_df(list(officials))
+        self._base_summary = summary if summary is not None else OfficialsSummary().update(officials)
+        self._summary = self._base_summary
+        self._added: List[Dict[str, Any]] = []
+        self._added_df: Optional[pd.DataFrame] = None
+        self._df: Optional[pd.DataFrame] = self._base_df
+        self.version = 0
+        self._search_index = search_index
+        self._index: Optional[SearchIndex] = None
+        self._sort_index = sort_index
+        self._sorter: Optional[SortIndex] = None
+        self._orders: Dict[Any, np.ndarray] = {}
+        self._base_social: Optional[np.ndarray] = None
+        self._base_key = base_key
+        self._added_hash = hashlib.sha256()
+
+    def _build_df(self, officials: List[Dict[str, Any]]) -> pd.DataFrame:
+        df = DataAnalyzer.officials_to_dataframe(officials)
+        return DataAnalyzer.compact(df) if self.compact else DataAnalyzer.normalize(df)
+
+    def __len__(self) -> int:
+        return self._summary.total
+
+    @property
+    def summary(self) -> OfficialsSummary:
+        """Running counters over base and added officials"""
+        return self._summary
+
+    def append(self, official: Dict[str, Any]) -> None:
+        """Add an official without rebuilding anything derived from the base"""
+        if self._summary is self._base_summary:
+            self._summary = self._base_summary.copy()
+        self._summary.add(official)
+        self._added.append(official)
+        self._added_hash.update(json.dumps(official, sort_keys=True, default=str).encode('utf-8'))
+        self._added_df = None
+        self._df = None
+        self._orders = {}
+        self.version += 1
+
+    def officials(self) -> Iterator[Dict[str, Any]]:
+        """Base and added officials, in order"""
+        return chain(self._base, self._added)
+
+    @property
+    def version_hash(self) -> str:
+        """Hash identifying the contents, for caching things derived from them.
+
+        Made from base_key and a running hash of the added officials, so it
+        costs nothing after an append; without base_key the base officials
+        are hashed once.
+        """
+        if self._base_key is None:
+            digest = hashlib.sha256()
+            for official in self._base:
+                digest.update(json.dumps(official, sort_keys=True, default=str).encode('utf-8'))
+            self._base_key = digest.hexdigest()
+        return hashlib.sha256(f"{self._base_key}:{self._added_hash.hexdigest()}".encode('utf-8')).hexdigest()
+
+    def to_data(self) -> Dict[str, Any]:
+        """The dataset as a {"officials": [...]} document"""
+        return {"officials": list(self.officials())}
+
+    @property
+    def added_df(self) -> pd.DataFrame:
+        """DataFrame of the added officials only (small, rebuilt after an append)"""
+        if self._added_df is None:
+            self._added_df = self._build_df(self._added)
+            self._added_df.index = pd.RangeIndex(len(self._base_df), len(self))
+        return self._added_df
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Full DataFrame, materialized on first use after an append"""
+        if self._df is None:
+            df = pd.concat([self._base_df, self.added_df])
+            if self.compact:
+                categories = [col for col, dtype in self._base_df.dtypes.items()
+                              if isinstance(dtype, pd.CategoricalDtype)]
+                df = df.astype({col: 'category' for col in categories})
+            self._df = df
+        return self._df
+
+    def take(self, positions: Sequence[int]) -> pd.DataFrame:
+        """Rows at the given positions, without materializing the full DataFrame"""
+        positions = np.asarray(positions, dtype=np.int64)
+        base_count = len(self._base_df)
+        if not self._added or (len(positions) and positions.max() < base_count):
+            return self._base_df.iloc[positions]
+        in_base = positions < base_count
+        parts = [self._base_df.iloc[positions[in_base]],
+                 self.added_df.iloc[positions[~in_base] - base_count]]
+        # Index labels are row positions, so this restores the requested order
+        return pd.concat(parts).loc[positions]
+
+    @property
+    def index(self) -> SearchIndex:
+        """Search index over the base officials, built on first use"""
+        if self._index is None:
+            self._index = self._search_index() if self._search_index else SearchIndex(self._base)
+        return self._index
+
+    def search(self, name: Optional[str] = None, jurisdiction: Optional[str] = None,
+               party: Optional[str] = None, designation: Optional[str] = None,
+               prefix: bool = False) -> np.ndarray:
+        """Positions of matching officials, for take(); added officials are scanned directly"""
+        positions = self.index.search(name, jurisdiction, party, designation, prefix)
+        if not self._added:
+            return positions
+        added = [
+            len(self._base) + offset for offset, official in enumerate(self._added)
+            if SearchIndex.matches(official, name, jurisdiction, party, designation, prefix)
+        ]
+        return np.concatenate([positions, np.array(added, dtype=np.int64)])
+
+    @property
+    def columns(self) -> List[str]:
+        """Flattened columns of the rows returned by take() and page()"""
+        columns = [col for col in self._base_df.columns if col not in FLATTENED_FIELDS]
+        if self._added:
+            columns += [col for col in self.added_df.columns
+                        if col not in FLATTENED_FIELDS and col not in columns]
+        return columns
+
+    @property
+    def sort_index(self) -> SortIndex:
+        """Sort ranks over the base officials, built per column on first use"""
+        if self._sorter is None:
+            self._sorter = self._sort_index() if self._sort_index else SortIndex(self._base_df)
+        return self._sorter
+
+    def sort_order(self, column: str, descending: bool = False,
+                   positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """Positions (all, or the given ones) sorted by a column, case-insensitively.
+
+        Missing values go last and ties keep position order. Sorting every row
+        reuses the base order, cached per column; a subset only sorts itself.
+        """
+        if positions is None and not self._added:
+            return self.sort_index.order(column, descending)
+        ranks = self.sort_index.ranks(column)
+        if self._added:
+            key = (column, descending)
+            if positions is None and key in self._orders:
+                return self._orders[key]
+            added = self.added_df[column] if column in self.added_df.columns else [None] * len(self._added)
+            ranks = np.concatenate([ranks, self.sort_index.rank_values(column, added)])
+        ranks = directed(ranks, descending)
+        if positions is None:
+            self._orders[(column, descending)] = np.argsort(ranks, kind='stable')
+            return self._orders[(column, descending)]
+        positions = np.asarray(positions, dtype=np.int64)
+        return positions[np.lexsort((positions, ranks[positions]))]
+
+    def page(self, start: int, stop: int, positions: Optional[np.ndarray] = None,
+             sort: Optional[str] = None, descending: bool = False) -> pd.DataFrame:
+        """Rows start:stop of the given positions (default: every official), optionally sorted"""
+        if sort is not None:
+            positions = self.sort_order(sort, descending, positions)
+        elif positions is None:
+            return self.take(np.arange(start, min(stop, len(self)), dtype=np.int64))
+        return self.take(np.asarray(positions, dtype=np.int64)[start:stop])
+
+    def social_positions(self) -> np.ndarray:
+        """Positions of officials with at least one social media handle"""
+        if self._base_social is None:
+            columns = DataAnalyzer.social_media_columns(self._base_df)
+            has_social = self._base_df[columns].notna().any(axis=1).to_numpy()
+            self._base_social = np.flatnonzero(has_social).astype(np.int64)
+        if not self._added:
+            return self._base_social
+        added = [len(self._base) + offset for offset, official in enumerate(self._added)
+                 if any(handle is not None for handle in (official.get('social_media') or {}).values())]
+        return np.concatenate([self._base_social, np.array(added, dtype=np.int64)])
+
+    def count_by_party(self) -> pd.DataFrame:
+        return self._summary.count_by_party()
+
+    def officials_by_designation(self) -> pd.DataFrame:
+        return self._summary.officials_by_designation()
+
+    def social_media_counts(self) -> pd.DataFrame:
+        return self._summary.social_media_counts()
+
+
+class StoreDataset:
+    """The OfficialsDataset interface over an on-disk OfficialsStore.
+
+    Counts and searches run as SQL queries and only the rows asked for are
+    read, so the roster does not have to fit in memory; df reads everything
+    and is meant for small stores. Officials appended here are written to
+    the database and are visible to every session sharing it.
+    """
+
+    def __init__(self, store: OfficialsStore, compact: bool = False):
+        self.store = store
+        self.compact = compact
+        self.version = 0
+        self._summary: Optional[OfficialsSummary] = None
+        self._summary_version = -1
+        self._columns: Optional[List[str]] = None
+        self._columns_version = -1
+
+    def _build_df(self, officials: List[Dict[str, Any]]) -> pd.DataFrame:
+        df = DataAnalyzer.officials_to_dataframe(officials)
+        return DataAnalyzer.compact(df) if self.compact else DataAnalyzer.normalize(df)
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    @property
+    def summary(self) -> OfficialsSummary:
+        """Counters computed by SQL, refreshed after this session appends"""
+        if self._summary_version != self.version:
+            self._summary = self.store.summary()
+            self._summary_version = self.version
+        return self._summary
+
+    def append(self, official: Dict[str, Any]) -> None:
+        self.store.append(official)
+        self.version += 1
+
+    def officials(self) -> Iterator[Dict[str, Any]]:
+        """All officials in order, read from the database in batches"""
+        return self.store.iter_officials()
+
+    def to_data(self) -> Dict[str, Any]:
+        return {"officials": list(self.officials())}
+
+    @property
+    def version_hash(self) -> str:
+        """Hash identifying the database contents, changed by writes from any session"""
+        return self.store.fingerprint()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Full DataFrame (reads the whole store)"""
+        return self._build_df(list(self.officials()))
+
+    def take(self, positions: Sequence[int]) -> pd.DataFrame:
+        """Rows at the given positions, read from the database.
+
+        Raises IndexError, like OfficialsDataset.take, if any position is not in the store.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        officials = self.store.get(positions.tolist())
+        if len(officials) != len(positions):
+            raise IndexError(f"{len(positions) - len(officials)} of {len(positions)} "
+                             f"positions are not in the store")
+        df = self._build_df(officials)
+        df.index = pd.Index(positions)
+        return df
+
+    def search(self, name: Optional[str] = None, jurisdiction: Optional[str] = None,
+               party: Optional[str] = None, designation: Optional[str] = None,
+               prefix: bool = False) -> np.ndarray:
+        return self.store.search(name, jurisdiction, party, designation, prefix)
+
+    @property
+    def columns(self) -> List[str]:
+        """Flattened columns present in the store, refreshed after this session appends"""
+        if self._columns_version != self.version:
+            self._columns = self.store.columns()
+            self._columns_version = self.version
+        return self._columns
+
+    def page(self, start: int, stop: int, positions: Optional[np.ndarray] = None,
+             sort: Optional[str] = None, descending: bool = False) -> pd.DataFrame:
+        """Rows start:stop of the given positions (default: every official), optionally sorted.
+
+        Sort orders come from the store's per-column cache, so only the page is read.
+        """
+        if sort is not None:
+            order, ranks = self.store.sort_order(sort, descending)
+            if positions is None:
+                rows = order[start:stop]
+            else:
+                positions = np.asarray(positions, dtype=np.int64)
+                # Officials written since the order was taken go last
+                position_ranks = np.full(len(positions), len(order), dtype=np.int64)
+                known = positions < len(ranks)
+                position_ranks[known] = ranks[positions[known]]
+                rows = positions[np.argsort(position_ranks, kind='stable')][start:stop]
+        elif positions is None:
+            rows = np.arange(start, min(stop, len(self)), dtype=np.int64)
+        else:
+            rows = np.asarray(positions, dtype=np.int64)[start:stop]
+        return self.take(rows)
+
+    def social_positions(self) -> np.ndarray:
+        return self.store.social_positions()
+
+    def count_by_party(self) -> pd.DataFrame:
+        return self.summary.count_by_party()
+
+    def officials_by_designation(self) -> pd.DataFrame:
+        return self.summary.officials_by_designation()
+
+    def social_media_counts(self) -> pd.DataFrame:
+        return self.summary.social_media_counts()
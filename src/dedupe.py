@@ -0,0 +1,347 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+import re
+import unicodedata
+
+from src import profiling
+
+# Minimum name similarity (0-1) for two officials of the same block to count as one person
+DEFAULT_THRESHOLD = 0.88
+# Each official is compared with this many neighbours in each sort order of its block
+DEFAULT_WINDOW = 4
+# An exact key shared by more officials than this is generic (an office switchboard, a shared inbox)
+MAX_KEY_GROUP = 20
+# Blocks are sent to worker processes in batches of about this many officials
+BLOCK_BATCH_RECORDS = 50000
+
+# Titles dropped from names before comparison
+NAME_TITLES = {
+    'hon', 'honorable', 'the', 'dr', 'mr', 'mrs', 'ms', 'rep', 'sen', 'senator',
+    'representative', 'gov', 'governor', 'mayor', 'councilmember', 'councilman', 'councilwoman',
+}
+# Name tokens that tell relatives apart; they (and any token with digits) must agree exactly
+GENERATIONAL = {'jr', 'sr', 'ii', 'iii', 'iv'}
+
+_DROPPED = re.compile(r"[.'’]")
+_SEPARATORS = re.compile(r'[^\w\s]+')
+_PROFILE_URL = re.compile(r'^(?:https?://)?(?:www\.)?(?:twitter|x|instagram|facebook)\.com/', re.IGNORECASE)
+
+# (position, comparison name, distinguishing tokens) of one official in a block
+BlockEntry = Tuple[int, str, Tuple[str, ...]]
+
+
+def normalize_text(value: Any) -> str:
+    """Lowercase without accents or punctuation, whitespace collapsed ("U.S. Señator" -> "us senator")"""
+    if not isinstance(value, str):
+        return ''
+    if not value.isascii():
+        value = ''.join(c for c in unicodedata.normalize('NFKD', value) if not unicodedata.combining(c))
+    return ' '.join(_SEPARATORS.sub(' ', _DROPPED.sub('', value.lower())).split())
+
+
+def name_key(name: Any) -> Tuple[str, Tuple[str, ...]]:
+    """(comparison name, distinguishing tokens) of a name, without titles"""
+    tokens = [token for token in normalize_text(name).split() if token not in NAME_TITLES]
+    distinguishing = tuple(sorted(token for token in tokens
+                                  if token in GENERATIONAL or not token.isalpha()))
+    words = [token for token in tokens if token.isalpha() and token not in GENERATIONAL]
+    return ' '.join(words), distinguishing
+
+
+def handle_key(value: Any) -> str:
+    """A social handle or profile URL reduced to the lowercase account name"""
+    if not isinstance(value, str):
+        return ''
+    return _PROFILE_URL.sub('', value.strip()).strip('@/').lower()
+
+
+def phone_key(value: Any) -> str:
+    """The last ten digits of a phone number, so country-code and formatting variants agree"""
+    if not isinstance(value, str):
+        return ''
+    digits = ''.join(c for c in value if c.isdigit())
+    return digits[-10:] if len(digits) >= 7 else ''
+
+
+def exact_keys(official: Dict[str, Any]) -> List[str]:
+    """Identifiers that on their own mark two officials as the same person"""
+    keys = []
+    social_media = official.get('social_media')
+    if isinstance(social_media, dict):
+        for platform, handle in social_media.items():
+            handle = handle_key(handle)
+            if handle:
+                keys.append(f"{platform}:{handle}")
+    contact = official.get('contact')
+    if isinstance(contact, dict):
+        email = contact.get('email')
+        if isinstance(email, str) and email.strip():
+            keys.append(f"email:{email.strip().lower()}")
+        phone = phone_key(contact.get('phone'))
+        if phone:
+            keys.append(f"phone:{phone}")
+    return keys
+
+
+def block_key(official: Dict[str, Any]) -> str:
+    """Officials are only compared by name within the same jurisdiction and designation"""
+    return f"{normalize_text(official.get('jurisdiction'))}\x1f{normalize_text(official.get('designation'))}"
+
+
+def _sorted_words(name: str) -> str:
+    return ' '.join(sorted(name.split()))
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Similarity of two comparison names in written or in alphabetical word order, whichever is higher"""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    score = SequenceMatcher(None, a, b, autojunk=False).ratio()
+    sorted_a, sorted_b = _sorted_words(a), _sorted_words(b)
+    if score < 1.0 and (sorted_a != a or sorted_b != b):
+        score = max(score, SequenceMatcher(None, sorted_a, sorted_b, autojunk=False).ratio())
+    return score
+
+
+def _similar(a: str, b: str, threshold: float) -> bool:
+    """name_similarity(a, b) >= threshold, ruling most pairs out with cheap upper bounds first"""
+    if a == b:
+        return True
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    # Both bounds only depend on the letters, so they hold for either word order
+    if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+        return False
+    if matcher.ratio() >= threshold:
+        return True
+    sorted_a, sorted_b = _sorted_words(a), _sorted_words(b)
+    if sorted_a == a and sorted_b == b:
+        return False
+    return SequenceMatcher(None, sorted_a, sorted_b, autojunk=False).ratio() >= threshold
+
+
+def _block_matches(block: List[BlockEntry], threshold: float, window: int) -> Tuple[List[Tuple[int, int]], int]:
+    """Fuzzy name matches in one block and the number of names compared.
+
+    Sorted neighbourhood: the block is sorted by its words in alphabetical
+    order, forwards and reversed (so a typo early in the name still lands
+    near its original), and each official is compared with the next
+    `window` officials of both orders.
+    """
+    matches = []
+    compared = set()
+    words = {position: _sorted_words(name) for position, name, _ in block}
+    for reverse in (False, True):
+        order = sorted(block, key=lambda entry: (entry[2], words[entry[0]][::-1] if reverse
+                                                 else words[entry[0]]))
+        for position, (left, left_name, left_tokens) in enumerate(order):
+            for right, right_name, right_tokens in order[position + 1:position + 1 + window]:
+                if left_tokens != right_tokens:
+                    continue
+                pair = (left, right) if left < right else (right, left)
+                if pair in compared:
+                    continue
+                compared.add(pair)
+                if _similar(left_name, right_name, threshold):
+                    matches.append(pair)
+    return matches, len(compared)
+
+
+def _match_blocks(task: Tuple[List[List[BlockEntry]], float, int]) -> Tuple[List[Tuple[int, int]], int]:
+    blocks, threshold, window = task
+    matches, compared = [], 0
+    for block in blocks:
+        block_matches, block_compared = _block_matches(block, threshold, window)
+        matches.extend(block_matches)
+        compared += block_compared
+    return matches, compared
+
+
+def _block_batches(blocks: Iterable[List[BlockEntry]]) -> Iterator[List[List[BlockEntry]]]:
+    batch, size = [], 0
+    for block in blocks:
+        batch.append(block)
+        size += len(block)
+        if size >= BLOCK_BATCH_RECORDS:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+class _UnionFind:
+    """Disjoint sets over positions; each set's root is its first position"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, position: int) -> int:
+        parent = self.parent
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+@dataclass
+class DuplicateCluster:
+    """Positions of officials that are one person (first occurrence first) and the evidence"""
+    members: List[int]
+    reasons: List[str]
+
+
+@dataclass
+class DedupeResult:
+    total: int = 0
+    clusters: List[DuplicateCluster] = field(default_factory=list)
+    blocks: int = 0
+    compared: int = 0
+    generic_keys: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        """Officials that would be dropped by merging each cluster into one"""
+        return sum(len(cluster.members) - 1 for cluster in self.clusters)
+
+    def summary(self, officials: Optional[List[Dict[str, Any]]] = None, limit: int = 10) -> List[str]:
+        """Human-readable cluster lines, at most `limit`"""
+        lines = []
+        for cluster in self.clusters[:limit]:
+            if officials is not None:
+                members = '; '.join(f"{officials[position].get('name', '?')} (record {position})"
+                                    for position in cluster.members)
+            else:
+                members = ', '.join(f"record {position}" for position in cluster.members)
+            lines.append(f"{members} [{', '.join(cluster.reasons)}]")
+        if len(self.clusters) > limit:
+            lines.append(f"... and {len(self.clusters) - limit} more cluster(s)")
+        return lines
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'duplicates': self.duplicates,
+            'blocks': self.blocks,
+            'compared': self.compared,
+            'generic_keys': self.generic_keys,
+            'clusters': [{'members': cluster.members, 'reasons': cluster.reasons}
+                         for cluster in self.clusters],
+        }
+
+
+def find_duplicates(officials: Iterable[Dict[str, Any]], threshold: float = DEFAULT_THRESHOLD,
+                    window: int = DEFAULT_WINDOW, workers: int = 1,
+                    max_key_group: int = MAX_KEY_GROUP) -> DedupeResult:
+    """Cluster officials that are the same person.
+
+    Two officials are linked when they share a normalized social handle,
+    email or phone (keys shared by more than max_key_group officials are
+    ignored as generic), or when their names are at least `threshold`
+    similar within the same jurisdiction and designation. Links are
+    transitive. Name comparisons only happen between neighbours in sorted
+    order within a block, so the work grows linearly with the roster; with
+    workers > 1 blocks are compared in a process pool. Cluster members are
+    positions in `officials`.
+    """
+    result = DedupeResult()
+    blocks: Dict[str, List[BlockEntry]] = defaultdict(list)
+    keys: Dict[str, List[int]] = defaultdict(list)
+
+    with profiling.stage('dedupe.keys') as stats:
+        for position, official in enumerate(officials):
+            for key in exact_keys(official):
+                keys[key].append(position)
+            name, distinguishing = name_key(official.get('name'))
+            if name:
+                blocks[block_key(official)].append((position, name, distinguishing))
+            result.total += 1
+        if stats:
+            stats.add_records(result.total)
+
+    sets = _UnionFind(result.total)
+    # (position, reason) of every link, assigned to clusters once all links are known
+    evidence: List[Tuple[int, str]] = []
+
+    with profiling.stage('dedupe.exact'):
+        for key, positions in keys.items():
+            if len(positions) < 2:
+                continue
+            if len(positions) > max_key_group:
+                result.generic_keys += 1
+                continue
+            first = positions[0]
+            for position in positions[1:]:
+                sets.union(first, position)
+            evidence.append((first, key.split(':', 1)[0]))
+    del keys
+
+    with profiling.stage('dedupe.fuzzy', result.total):
+        comparable = [block for block in blocks.values() if len(block) > 1]
+        result.blocks = len(blocks)
+        del blocks
+        tasks = ((batch, threshold, window) for batch in _block_batches(comparable))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                outcomes = list(pool.map(_match_blocks, tasks))
+        else:
+            outcomes = [_match_blocks(task) for task in tasks]
+        for matches, compared in outcomes:
+            result.compared += compared
+            for left, right in matches:
+                sets.union(left, right)
+                evidence.append((left, 'name'))
+
+    with profiling.stage('dedupe.clusters'):
+        # Roots are the smallest position of their set, so members come out in input order
+        members: Dict[int, List[int]] = defaultdict(list)
+        for position in range(result.total):
+            root = sets.find(position)
+            if root != position:
+                members[root].append(position)
+        reasons: Dict[int, set] = defaultdict(set)
+        for position, reason in evidence:
+            reasons[sets.find(position)].add(reason)
+        result.clusters = [
+            DuplicateCluster([root] + positions, sorted(reasons[root]))
+            for root, positions in sorted(members.items())
+        ]
+    return result
+
+
+def merge_officials(officials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """One record from several of the same person; earlier records win, later ones fill gaps"""
+    merged: Dict[str, Any] = {}
+    for official in officials:
+        for key, value in official.items():
+            if isinstance(value, dict):
+                target = merged.setdefault(key, {})
+                if isinstance(target, dict):
+                    for nested_key, nested_value in value.items():
+                        if nested_value not in (None, '') and target.get(nested_key) in (None, ''):
+                            target[nested_key] = nested_value
+            elif value not in (None, '') and merged.get(key) in (None, ''):
+                merged[key] = value
+    return merged
+
+
+def merged_roster(officials: List[Dict[str, Any]], result: DedupeResult) -> Iterator[Dict[str, Any]]:
+    """The officials in input order with each cluster merged into its first member"""
+    clusters = {cluster.members[0]: cluster for cluster in result.clusters}
+    duplicates = {position for cluster in result.clusters for position in cluster.members[1:]}
+    for position, official in enumerate(officials):
+        if position in duplicates:
+            continue
+        cluster = clusters.get(position)
+        if cluster is None:
+            yield official
+        else:
+            yield merge_officials([officials[member] for member in cluster.members])
@@ -1,47 +1,392 @@
-from typing import List, Dict, Any
+from contextlib import contextmanager
+from importlib.util import find_spec
+from typing import List, Dict, Any, BinaryIO, Iterable, Iterator, Optional, Sequence, Union
 import csv
+import gzip
+import io
 import json
+import os
+import tempfile
 from pathlib import Path
 
+from src import columnar
+from src.profiling import profiled, argument_records
+
+# Nested objects that are flattened into prefixed CSV columns
+FLATTENED_FIELDS = {'social_media': 'social', 'contact': 'contact'}
+
+EXPORT_FORMATS = ('csv', 'json', 'parquet', 'arrow')
+# Compression -> file suffix; zstd needs the optional zstandard package
+COMPRESSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+DEFAULT_CHUNK_BYTES = 2**20
+
+# A path, or an open binary file object (which writers leave open)
+ExportTarget = Union[str, Path, BinaryIO]
+
+
+def _is_file(target: ExportTarget) -> bool:
+    return hasattr(target, 'write')
+
+
+def _staging_path(file_path: ExportTarget) -> str:
+    """Where a new export is written before it replaces file_path"""
+    return f"{file_path}.tmp"
+
+
+def _finish_staged(staging: str, file_path: ExportTarget, succeeded: bool) -> None:
+    """Move a completed export into place, or remove an abandoned one"""
+    if succeeded:
+        os.replace(staging, file_path)
+    elif os.path.exists(staging):
+        os.remove(staging)
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only sink that collects bytes until they are taken"""
+
+    def __init__(self):
+        super().__init__()
+        self.size = 0
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+@contextmanager
+def _compressing(target: BinaryIO, compression: Optional[str]) -> Iterator[BinaryIO]:
+    """A binary file object that compresses into target, which stays open"""
+    if compression is None:
+        yield target
+    elif compression == 'gzip':
+        # A fixed mtime keeps the output identical for identical input
+        with gzip.GzipFile(fileobj=target, mode='wb', mtime=0) as f:
+            yield f
+    elif compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstandard is required for zstd compression: pip install zstandard") from None
+        with zstandard.ZstdCompressor().stream_writer(target, closefd=False) as f:
+            yield f
+    else:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+
 class DataExporter:
     @staticmethod
-    def export_to_csv(officials: List[Dict[str, Any]], file_path: str) -> None:
-        """Export officials data to CSV file"""
-        if not officials:
-            raise ValueError("No officials data to export")
-        
-        # Flatten nested structures
-        flattened = []
-        for official in officials:
-            flat_official = official.copy()
-            
-            # Flatten social media
-            if 'social_media' in flat_official:
-                for platform, handle in flat_official['social_media'].items():
-                    flat_official[f'social_{platform}'] = handle
-                del flat_official['social_media']
-            
-            # Flatten contact
-            if 'contact' in flat_official:
-                for method, value in flat_official['contact'].items():
-                    flat_official[f'contact_{method}'] = value
-                del flat_official['contact']
-            
-            flattened.append(flat_official)
-        
-        # Get all possible fieldnames
-        fieldnames = set()
-        for record in flattened:
-            fieldnames.update(record.keys())
-        
-        # Write to CSV
-        with open(file_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=sorted(fieldnames))
-            writer.writeheader()
-            writer.writerows(flattened)
-    
-    @staticmethod
-    def export_to_json(officials: List[Dict[str, Any]], file_path: str) -> None:
+    def csv_fieldnames(schema: Dict[str, Any]) -> List[str]:
+        """Derive the flattened CSV columns of an official from the JSON schema"""
+        item_schema = schema.get('properties', {}).get('officials', {}).get('items', {})
+        fieldnames = []
+        for name, prop in item_schema.get('properties', {}).items():
+            if name in FLATTENED_FIELDS:
+                prefix = FLATTENED_FIELDS[name]
+                fieldnames.extend(f'{prefix}_{key}' for key in prop.get('properties', {}))
+            else:
+                fieldnames.append(name)
+        return sorted(fieldnames)
+
+    @staticmethod
+    def flatten_official(official: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten nested social media and contact fields into prefixed columns"""
+        flat_official = official.copy()
+
+        # Flatten social media
+        if 'social_media' in flat_official:
+            for platform, handle in flat_official['social_media'].items():
+                flat_official[f'social_{platform}'] = handle
+            del flat_official['social_media']
+
+        # Flatten contact
+        if 'contact' in flat_official:
+            for method, value in flat_official['contact'].items():
+                flat_official[f'contact_{method}'] = value
+            del flat_official['contact']
+
+        return flat_official
+
+    @staticmethod
+    def _flattened_keys(official: Dict[str, Any]) -> Iterable[str]:
+        """Column names flatten_official would produce, without copying the record"""
+        for key, value in official.items():
+            if key in FLATTENED_FIELDS:
+                yield from (f'{FLATTENED_FIELDS[key]}_{sub}' for sub in value)
+            else:
+                yield key
+
+    @staticmethod
+    def _csv_columns(officials: Iterable[Dict[str, Any]],
+                     fieldnames: Optional[List[str]]) -> Optional[List[str]]:
+        """fieldnames, or the union of flattened keys when officials is a list"""
+        if isinstance(officials, Sequence):
+            if not officials:
+                raise ValueError("No officials data to export")
+            if fieldnames is None:
+                fieldnames = sorted({
+                    key for official in officials for key in DataExporter._flattened_keys(official)
+                })
+        return fieldnames
+
+    @staticmethod
+    @profiled('export_to_csv', records=argument_records(0))
+    def export_to_csv(officials: Iterable[Dict[str, Any]], file_path: ExportTarget,
+                      fieldnames: Optional[List[str]] = None) -> None:
+        """Export officials data to CSV file.
+
+        Rows are written as they are flattened. Without fieldnames the columns
+        are the union of all flattened keys: a list is scanned for them first,
+        any other iterable is spilled to a temporary file.
+        """
+        fieldnames = DataExporter._csv_columns(officials, fieldnames)
+        with CSVStreamWriter(file_path, fieldnames) as writer:
+            for official in officials:
+                writer.write(official)
+
+    @staticmethod
+    @profiled('export_to_json', records=argument_records(0))
+    def export_to_json(officials: Iterable[Dict[str, Any]], file_path: ExportTarget) -> None:
         """Export officials data to JSON file"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump({"officials": officials}, f, indent=2)
\ No newline at end of file
+        with JSONStreamWriter(file_path) as writer:
+            for official in officials:
+                writer.write(official)
+
+    @staticmethod
+    @profiled('export_to_parquet', records=argument_records(0))
+    def export_to_parquet(officials: Iterable[Dict[str, Any]], file_path: ExportTarget,
+                          schema: Optional[Dict[str, Any]] = None) -> None:
+        """Export officials data to a Parquet file (requires pyarrow).
+
+        social_media and contact become struct columns; party and designation
+        are dictionary-encoded. The column types come from the JSON schema when given.
+        """
+        columnar.write_officials(officials, file_path, schema, file_format='parquet')
+
+    @staticmethod
+    @profiled('export_to_arrow', records=argument_records(0))
+    def export_to_arrow(officials: Iterable[Dict[str, Any]], file_path: ExportTarget,
+                        schema: Optional[Dict[str, Any]] = None) -> None:
+        """Export officials data to an uncompressed Arrow IPC (Feather v2) file that can be memory-mapped"""
+        columnar.write_officials(officials, file_path, schema, file_format='arrow')
+
+    @staticmethod
+    def stream_writer(target: ExportTarget, file_format: str, schema: Optional[Dict[str, Any]] = None,
+                      fieldnames: Optional[List[str]] = None):
+        """Streaming writer for one of EXPORT_FORMATS, to a path or a binary file object"""
+        if file_format == 'csv':
+            return CSVStreamWriter(target, fieldnames)
+        if file_format == 'json':
+            return JSONStreamWriter(target)
+        if file_format in ('parquet', 'arrow'):
+            return columnar.ColumnarStreamWriter(target, schema, file_format=file_format)
+        raise ValueError(f"Unsupported export format: {file_format}")
+
+    @staticmethod
+    def export_file_name(stem: str, file_format: str, compression: Optional[str] = None) -> str:
+        """File name for an export, e.g. officials.csv.gz"""
+        return f"{stem}.{file_format}{COMPRESSIONS[compression] if compression else ''}"
+
+    @staticmethod
+    def available_compressions() -> List[str]:
+        """Compressions usable here (zstd only with zstandard installed)"""
+        return [name for name in COMPRESSIONS if name != 'zstd' or find_spec('zstandard') is not None]
+
+    @staticmethod
+    def iter_export(officials: Iterable[Dict[str, Any]], file_format: str,
+                    compression: Optional[str] = None, schema: Optional[Dict[str, Any]] = None,
+                    fieldnames: Optional[List[str]] = None,
+                    chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Iterator[bytes]:
+        """Export officials as a stream of byte chunks, optionally gzip/zstd compressed.
+
+        Nothing touches the filesystem, except that a CSV export of a
+        non-list without fieldnames spills to a temporary file as in
+        export_to_csv. Parquet and Arrow arrive a record batch at a time.
+        """
+        if file_format == 'csv':
+            fieldnames = DataExporter._csv_columns(officials, fieldnames)
+        buffer = _ChunkBuffer()
+        with _compressing(buffer, compression) as out:
+            with DataExporter.stream_writer(out, file_format, schema, fieldnames) as writer:
+                for official in officials:
+                    writer.write(official)
+                    if buffer.size >= chunk_bytes:
+                        yield buffer.take()
+        yield buffer.take()
+
+    @staticmethod
+    @profiled('export_to_bytes', records=argument_records(0))
+    def export_to_bytes(officials: Iterable[Dict[str, Any]], file_format: str,
+                        compression: Optional[str] = None, schema: Optional[Dict[str, Any]] = None,
+                        fieldnames: Optional[List[str]] = None) -> bytes:
+        """Export officials in memory, e.g. for a download"""
+        return b''.join(DataExporter.iter_export(officials, file_format, compression, schema, fieldnames))
+
+
+class JSONStreamWriter:
+    """Write officials one at a time as a {"officials": [...]} document.
+
+    The output is byte-identical to json.dump(..., indent=2) of the whole list.
+    A new file is written next to file_path and moved into place only when
+    the writer exits without an exception. file_path may also be a binary
+    file object, which is left open (and unterminated after an exception).
+    With append=True, officials are added to the end of a file this writer
+    produced earlier instead of replacing it; an exception leaves that file
+    without its closing brackets, so it does not parse as complete.
+    """
+
+    _OPEN = '{\n  "officials": ['
+    _CLOSE = '\n  ]\n}'
+    _CLOSE_EMPTY = ']\n}'
+
+    def __init__(self, file_path: ExportTarget, append: bool = False):
+        if append and _is_file(file_path):
+            raise ValueError("Appending to a JSON export requires its file path")
+        self.file_path = file_path
+        self.append = append
+        self.count = 0
+        self._existing = False
+        self._file = None
+
+    def __enter__(self) -> 'JSONStreamWriter':
+        if _is_file(self.file_path):
+            self._file = self.file_path
+            self._file.write(self._OPEN.encode('utf-8'))
+        elif self.append:
+            self._file = open(self.file_path, 'rb+')
+            self._reopen()
+        else:
+            self._file = open(_staging_path(self.file_path), 'wb')
+            self._file.write(self._OPEN.encode('utf-8'))
+        return self
+
+    def _reopen(self) -> None:
+        """Strip the closing brackets of an existing export so more officials can follow"""
+        size = self._file.seek(0, 2)
+        self._file.seek(max(size - len(self._CLOSE), 0))
+        tail = self._file.read().decode('utf-8', errors='replace')
+        if tail.endswith(self._CLOSE):
+            self._existing = True
+            self._file.truncate(size - len(self._CLOSE))
+        elif tail.endswith(self._OPEN[-1] + self._CLOSE_EMPTY):
+            self._file.truncate(size - len(self._CLOSE_EMPTY))
+        else:
+            self._file.close()
+            raise ValueError(f"Cannot append to {self.file_path}: not an officials JSON export")
+        self._file.seek(0, 2)
+
+    def write(self, official: Dict[str, Any]) -> None:
+        body = json.dumps(official, indent=2).replace('\n', '\n    ')
+        first = self.count == 0 and not self._existing
+        self._file.write((('\n    ' if first else ',\n    ') + body).encode('utf-8'))
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            closing = self._CLOSE if self.count or self._existing else self._CLOSE_EMPTY
+            self._file.write(closing.encode('utf-8'))
+        if self._file is self.file_path:
+            return
+        self._file.close()
+        if not self.append:
+            _finish_staged(_staging_path(self.file_path), self.file_path, exc_type is None)
+
+
+class CSVStreamWriter:
+    """Write flattened officials to CSV as they arrive.
+
+    With fieldnames (e.g. from DataExporter.csv_fieldnames) rows go straight to
+    the file. Otherwise the column set is the union of all flattened keys, so
+    rows are spilled to a temporary file until close and written below the header.
+    Like JSONStreamWriter, a new file only replaces file_path when the writer
+    exits without an exception. file_path may also be a binary file object,
+    which is left open. append=True adds rows to an existing file with the
+    same fieldnames (rows written before an exception stay there).
+    """
+
+    def __init__(self, file_path: ExportTarget, fieldnames: Optional[List[str]] = None, append: bool = False):
+        if append and fieldnames is None:
+            raise ValueError("Appending to a CSV export requires its fieldnames")
+        if append and _is_file(file_path):
+            raise ValueError("Appending to a CSV export requires its file path")
+        self.file_path = file_path
+        self.fieldnames = fieldnames
+        self.append = append
+        self.count = 0
+        self._fieldnames = set()
+        self._spill = None
+        self._file = None
+        self._writer = None
+
+    def __enter__(self) -> 'CSVStreamWriter':
+        if self.fieldnames is None:
+            self._spill = tempfile.TemporaryFile('w+', encoding='utf-8')
+        else:
+            self._file = self._open('a' if self.append else 'w')
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+            if not self.append:
+                self._writer.writeheader()
+        return self
+
+    def _open(self, mode: str):
+        if _is_file(self.file_path):
+            return io.TextIOWrapper(self.file_path, encoding='utf-8', newline='', write_through=True)
+        path = self.file_path if mode == 'a' else _staging_path(self.file_path)
+        return open(path, mode, newline='', encoding='utf-8')
+
+    def _close(self, f) -> None:
+        if isinstance(f, io.TextIOWrapper) and f.buffer is self.file_path:
+            f.flush()
+            f.detach()
+        else:
+            f.close()
+
+    def write(self, official: Dict[str, Any]) -> None:
+        self.write_row(DataExporter.flatten_official(official))
+
+    def write_row(self, row: Dict[str, Any]) -> None:
+        """Write a row that has already been flattened"""
+        if self._writer is not None:
+            self._writer.writerow(row)
+        else:
+            self._fieldnames.update(row.keys())
+            self._spill.write(json.dumps(row) + '\n')
+        self.count += 1
+
+    def _finish(self, succeeded: bool) -> None:
+        if not _is_file(self.file_path) and not self.append:
+            _finish_staged(_staging_path(self.file_path), self.file_path, succeeded)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._file is not None:
+            self._close(self._file)
+            self._finish(exc_type is None)
+            return
+        try:
+            if exc_type is None:
+                if not self.count:
+                    raise ValueError("No officials data to export")
+                self._spill.seek(0)
+                f = self._open('w')
+                succeeded = False
+                try:
+                    writer = csv.DictWriter(f, fieldnames=sorted(self._fieldnames))
+                    writer.writeheader()
+                    for line in self._spill:
+                        writer.writerow(json.loads(line))
+                    succeeded = True
+                finally:
+                    self._close(f)
+                    self._finish(succeeded)
+        finally:
+            self._spill.close()
@@ -0,0 +1,273 @@
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+import hashlib
+import json
+import os
+
+from src import profiling
+from src.analyzer import OfficialsSummary
+from src.columnar import ColumnarStreamWriter
+from src.data_loader import DataLoader
+from src.exporter import DataExporter, CSVStreamWriter, JSONStreamWriter
+from src.validator import DataValidator, RecordError
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = 'officials.manifest.json'
+
+# Export formats that can be appended to in place; Parquet and Arrow files are rewritten
+APPENDABLE_FORMATS = {'csv', 'json'}
+
+
+def record_key(official: Dict[str, Any]) -> str:
+    """Stable identity of an official across runs"""
+    return '\x1f'.join(str(official.get(field, '')) for field in ('name', 'jurisdiction', 'designation'))
+
+
+def record_hash(official: Dict[str, Any]) -> str:
+    """Content hash of an official, independent of key order"""
+    encoded = json.dumps(official, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(encoded.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _file_hash(file_path: str) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _file_state(file_path: str) -> Optional[Dict[str, int]]:
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+@dataclass
+class Manifest:
+    """Per-record content hashes of the last run, in input order, and the state of its exports"""
+    schema_hash: str
+    keys: List[str] = field(default_factory=list)
+    hashes: List[str] = field(default_factory=list)
+    valid: List[bool] = field(default_factory=list)
+    exports: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @staticmethod
+    def load(file_path: str) -> Optional['Manifest']:
+        """Read a manifest, or None if there is none (or it is from an older format)"""
+        path = Path(file_path)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != MANIFEST_VERSION:
+            return None
+        records = data.get('records', [])
+        return Manifest(
+            data['schema_hash'],
+            [record[0] for record in records],
+            [record[1] for record in records],
+            [record[2] for record in records],
+            data.get('exports', {}),
+        )
+
+    def save(self, file_path: str) -> None:
+        # Written to a temporary file first so an interrupted run keeps the old manifest
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'schema_hash': self.schema_hash,
+                'records': [list(record) for record in zip(self.keys, self.hashes, self.valid)],
+                'exports': self.exports,
+            }, f)
+        os.replace(tmp_path, file_path)
+
+
+@dataclass
+class ChangeReport:
+    """What changed since the last run and what was done about it"""
+    total: int = 0
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    errors: List[RecordError] = field(default_factory=list)
+    invalid: int = 0
+    full_run_reason: Optional[str] = None
+    exports: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+    @staticmethod
+    def _label(key: str) -> str:
+        return ' / '.join(part for part in key.split('\x1f') if part)
+
+    def summary(self, limit: int = 10) -> List[str]:
+        """Human-readable change lines, at most `limit` per kind"""
+        lines = []
+        if self.full_run_reason:
+            lines.append(f"full run: {self.full_run_reason}")
+        for kind, keys in (('added', self.added), ('modified', self.modified), ('removed', self.removed)):
+            lines.extend(f"{kind}: {self._label(key)}" for key in keys[:limit])
+            if len(keys) > limit:
+                lines.append(f"... and {len(keys) - limit} more {kind}")
+        return lines
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'added': [self._label(key) for key in self.added],
+            'modified': [self._label(key) for key in self.modified],
+            'removed': [self._label(key) for key in self.removed],
+            'invalid': self.invalid,
+            'errors': [vars(error) for error in self.errors],
+            'full_run_reason': self.full_run_reason,
+            'exports': self.exports,
+        }
+
+
+def default_manifest_path(input_file: str, exports: Dict[str, str]) -> str:
+    """The manifest lives next to the first export (or the input when nothing is exported)"""
+    anchor = next(iter(exports.values()), input_file)
+    return str(Path(anchor).parent / MANIFEST_NAME)
+
+
+def _scan(officials: Iterator[Dict[str, Any]], previous: Optional[Manifest], manifest: Manifest,
+          report: ChangeReport, summary: Optional[OfficialsSummary]) -> List[Tuple[int, Dict[str, Any]]]:
+    """Hash every official, reuse the previous verdict for unchanged ones and return the rest"""
+    known: Dict[str, Tuple[str, bool]] = {}
+    if previous is not None:
+        known = {key: (digest, valid) for key, digest, valid in
+                 zip(previous.keys, previous.hashes, previous.valid)}
+    seen: Dict[str, int] = {}
+    changed = []
+    for index, official in enumerate(officials):
+        key = record_key(official)
+        # Repeated identities are told apart by occurrence
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        if occurrence:
+            key = f"{key}\x1f#{occurrence + 1}"
+        digest = record_hash(official)
+
+        manifest.keys.append(key)
+        manifest.hashes.append(digest)
+        previous_record = known.pop(key, None)
+        if previous_record is not None and previous_record[0] == digest:
+            manifest.valid.append(previous_record[1])
+            if summary is not None and previous_record[1]:
+                summary.add(official)
+            continue
+        manifest.valid.append(False)
+        changed.append((index, official))
+        if previous is not None:
+            (report.added if previous_record is None else report.modified).append(key)
+    report.total = len(manifest.keys)
+    report.removed = list(known)
+    return changed
+
+
+def _untouched(export_format: str, file_path: str, previous: Optional[Manifest]) -> bool:
+    """Whether the export is still exactly what the previous run wrote"""
+    state = previous.exports.get(file_path) if previous is not None else None
+    if state is None or state.get('format') != export_format:
+        return False
+    return _file_state(file_path) == {'size': state['size'], 'mtime_ns': state['mtime_ns']}
+
+
+def _appendable(export_format: str, file_path: str, previous: Optional[Manifest],
+                manifest: Manifest, report: ChangeReport, fieldnames: List[str]) -> bool:
+    """Whether the export can be brought up to date by appending the added officials"""
+    if previous is None or report.modified or report.removed or export_format not in APPENDABLE_FORMATS:
+        return False
+    if not _untouched(export_format, file_path, previous):
+        return False
+    if export_format == 'csv' and previous.exports[file_path].get('fieldnames') != fieldnames:
+        return False
+    # Officials added anywhere but the end would land out of order
+    return manifest.keys[:len(previous.keys)] == previous.keys
+
+
+def _writer(export_format: str, file_path: str, schema: Dict[str, Any], append: bool):
+    if export_format == 'csv':
+        return CSVStreamWriter(file_path, DataExporter.csv_fieldnames(schema), append=append)
+    if export_format == 'json':
+        return JSONStreamWriter(file_path, append=append)
+    return ColumnarStreamWriter(file_path, schema, file_format=export_format)
+
+
+def sync(input_file: str, schema_file: str, exports: Dict[str, str],
+         manifest_path: Optional[str] = None, summary: Optional[OfficialsSummary] = None) -> ChangeReport:
+    """Bring exports up to date with input_file, validating only officials that changed.
+
+    exports maps a format ('csv', 'json', 'parquet' or 'arrow') to its output
+    path. Unchanged officials keep their validity from the manifest; exports
+    are appended to when officials were only added at the end of the input,
+    rewritten from the input otherwise, and left alone when nothing changed.
+    Invalid officials are not exported. If summary is given, it is updated
+    with every valid official.
+    """
+    manifest_path = manifest_path or default_manifest_path(input_file, exports)
+    schema_hash = _file_hash(schema_file)
+    report = ChangeReport()
+
+    previous = Manifest.load(manifest_path)
+    if previous is None:
+        report.full_run_reason = 'no manifest from an earlier run'
+    elif previous.schema_hash != schema_hash:
+        report.full_run_reason = 'schema changed'
+        previous = None
+    manifest = Manifest(schema_hash)
+
+    with profiling.stage('incremental.scan') as stats:
+        changed = _scan(DataLoader.iter_officials(input_file), previous, manifest, report, summary)
+        if stats:
+            stats.add_records(report.total)
+
+    validator = DataValidator(schema_file)
+    with profiling.stage('incremental.validate', len(changed)):
+        for index, official in changed:
+            errors = validator.record_errors(official, index)
+            report.errors.extend(errors)
+            manifest.valid[index] = not errors
+            if not errors and summary is not None:
+                summary.add(official)
+    report.invalid = manifest.valid.count(False)
+
+    fieldnames = DataExporter.csv_fieldnames(validator.schema)
+    rewrites = {}
+    with profiling.stage('incremental.export'):
+        for export_format, file_path in exports.items():
+            if not report.changed and _untouched(export_format, file_path, previous):
+                report.exports[file_path] = 'up to date'
+            elif _appendable(export_format, file_path, previous, manifest, report, fieldnames):
+                added = [official for index, official in changed if manifest.valid[index]]
+                with _writer(export_format, file_path, validator.schema, append=True) as writer:
+                    for official in added:
+                        writer.write(official)
+                report.exports[file_path] = f'appended {len(added)}'
+            else:
+                rewrites[export_format] = file_path
+
+        if rewrites:
+            # One more pass over the input feeds every export that has to be rewritten
+            with ExitStack() as stack:
+                writers = [stack.enter_context(_writer(export_format, file_path, validator.schema, append=False))
+                           for export_format, file_path in rewrites.items()]
+                for index, official in enumerate(DataLoader.iter_officials(input_file)):
+                    if manifest.valid[index]:
+                        for writer in writers:
+                            writer.write(official)
+            for file_path in rewrites.values():
+                report.exports[file_path] = 'rewritten'
+
+    for export_format, file_path in exports.items():
+        manifest.exports[file_path] = dict(_file_state(file_path) or {}, format=export_format)
+        if export_format == 'csv':
+            manifest.exports[file_path]['fieldnames'] = fieldnames
+    manifest.save(manifest_path)
+    return report
+
@@ -0,0 +1,201 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+import os
+
+from src import profiling
+from src.data_loader import DataLoader
+from src.exporter import DataExporter
+from src.validator import DataValidator, RecordError, DEFAULT_CHUNK_SIZE
+
+# Per-process validator, set up once by _init_worker
+_worker_validator: Optional[DataValidator] = None
+
+
+@dataclass
+class ProcessedChunk:
+    """Valid officials of one chunk, with their flattened rows and the chunk's errors"""
+    start: int
+    total: int
+    officials: List[Dict[str, Any]]
+    rows: List[Dict[str, Any]]
+    errors: List[RecordError]
+
+
+@dataclass
+class FileResult:
+    """Valid officials of one input file, its record errors, or why the whole file failed"""
+    path: str
+    total: int = 0
+    officials: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[RecordError] = field(default_factory=list)
+    failure: Optional[str] = None
+
+
+# Files are sent to worker processes in batches of about this many bytes (or files)
+INGEST_BATCH_BYTES = 1 << 20
+INGEST_BATCH_FILES = 64
+
+
+def _init_worker(schema_file: str) -> None:
+    global _worker_validator
+    _worker_validator = DataValidator(schema_file)
+
+
+def _process_chunk(task: Tuple[List[Dict[str, Any]], int, bool]) -> Tuple[List[RecordError], List[Dict[str, Any]]]:
+    """Validate a chunk and flatten its valid officials"""
+    chunk, start, flatten = task
+    # Stages only record in the profiled process, i.e. without worker processes
+    with profiling.stage('pipeline.validate', len(chunk)):
+        errors = _worker_validator.validate_chunk(chunk, start)
+    invalid = {error.index - start for error in errors}
+    rows = []
+    if flatten:
+        with profiling.stage('pipeline.flatten', len(chunk) - len(invalid)):
+            rows = [
+                DataExporter.flatten_official(official)
+                for offset, official in enumerate(chunk) if offset not in invalid
+            ]
+    return errors, rows
+
+
+def _chunks(officials: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[Tuple[List[Dict[str, Any]], int]]:
+    iterator = iter(officials)
+    start = 0
+    while True:
+        # Reading covers parsing for streamed input
+        with profiling.stage('pipeline.read') as stats:
+            chunk = list(islice(iterator, chunk_size))
+            if stats:
+                stats.add_records(len(chunk))
+        if not chunk:
+            return
+        yield chunk, start
+        start += len(chunk)
+
+
+def _result(chunk: List[Dict[str, Any]], start: int, errors: List[RecordError],
+            rows: List[Dict[str, Any]]) -> ProcessedChunk:
+    invalid = {error.index - start for error in errors}
+    valid = [official for offset, official in enumerate(chunk) if offset not in invalid]
+    return ProcessedChunk(start, len(chunk), valid, rows, errors)
+
+
+def process_officials(officials: Iterable[Dict[str, Any]], schema_file: str,
+                      workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      flatten: bool = True) -> Iterator[ProcessedChunk]:
+    """Validate and flatten officials chunk by chunk, yielding results in input order.
+
+    With workers > 1 the chunks are processed in a process pool; at most two
+    chunks per worker are in flight, so memory stays bounded for streamed input.
+    Profiling stages: pipeline.read, then pipeline.validate and pipeline.flatten
+    in-process, or pipeline.wait for the workers' results.
+    """
+    if workers <= 1:
+        _init_worker(schema_file)
+        for chunk, start in _chunks(officials, chunk_size):
+            errors, rows = _process_chunk((chunk, start, flatten))
+            yield _result(chunk, start, errors, rows)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(schema_file,)) as pool:
+        pending = deque()
+        for chunk, start in _chunks(officials, chunk_size):
+            pending.append((chunk, start, pool.submit(_process_chunk, (chunk, start, flatten))))
+            if len(pending) >= workers * 2:
+                chunk, start, future = pending.popleft()
+                yield _result(chunk, start, *_wait(future, len(chunk)))
+        while pending:
+            chunk, start, future = pending.popleft()
+            yield _result(chunk, start, *_wait(future, len(chunk)))
+
+
+def _wait(future, records: int):
+    with profiling.stage('pipeline.wait', records):
+        return future.result()
+
+
+def _read_file(path: str) -> Tuple[str, Optional[bytes], Optional[str]]:
+    try:
+        return path, Path(path).read_bytes(), None
+    except OSError as e:
+        return path, None, f"cannot read file: {e.strerror or e}"
+
+
+def _read_ahead(paths: Iterable[str], io_threads: int) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+    """Read files on a thread pool, a bounded number ahead, yielding them in order"""
+    with ThreadPoolExecutor(max_workers=io_threads) as io:
+        pending = deque()
+        for path in paths:
+            pending.append(io.submit(_read_file, path))
+            if len(pending) >= io_threads * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _file_batches(reads: Iterator[Tuple[str, Optional[bytes], Optional[str]]]) -> Iterator[List[Tuple[str, Optional[bytes], Optional[str]]]]:
+    """Group small files so each worker task carries a useful amount of data"""
+    batch, size = [], 0
+    for read in reads:
+        batch.append(read)
+        size += len(read[1] or b'')
+        if size >= INGEST_BATCH_BYTES or len(batch) >= INGEST_BATCH_FILES:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def _process_file(path: str, content: Optional[bytes], failure: Optional[str]) -> FileResult:
+    """Parse and validate one file; problems with the file itself become its failure"""
+    if failure is not None:
+        return FileResult(path, failure=failure)
+    try:
+        data = DataLoader.loads(content, path)
+    except Exception as e:
+        return FileResult(path, failure=f"cannot parse file: {e}")
+    officials = data.get('officials') if isinstance(data, dict) else None
+    if not isinstance(officials, list):
+        return FileResult(path, failure='no "officials" array')
+    errors = _worker_validator.validate_chunk(officials)
+    invalid = {error.index for error in errors}
+    valid = [official for index, official in enumerate(officials) if index not in invalid]
+    return FileResult(path, len(officials), valid, errors)
+
+
+def _process_files(batch: List[Tuple[str, Optional[bytes], Optional[str]]]) -> List[FileResult]:
+    return [_process_file(*read) for read in batch]
+
+
+def ingest_files(paths: Iterable[str], schema_file: str, workers: Optional[int] = None,
+                 io_threads: int = 8) -> Iterator[FileResult]:
+    """Read, parse and validate many files concurrently, yielding one result per file in order.
+
+    Files are read by io_threads threads and parsed and validated in a pool of
+    worker processes (one per CPU by default; workers=1 parses in this
+    process). Small files travel to the workers in batches. A file that
+    cannot be read or parsed is reported in its FileResult.failure and the
+    rest of the batch carries on. Record error indices are per file.
+    """
+    batches = _file_batches(_read_ahead(paths, io_threads))
+    if workers == 1:
+        _init_worker(schema_file)
+        for batch in batches:
+            yield from _process_files(batch)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(schema_file,)) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(_process_files, batch))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
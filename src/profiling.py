@@ -0,0 +1,236 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from functools import wraps
+from typing import Dict, List, Any, Callable, Iterator, Optional, Sized
+import json
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows; max RSS is then not reported
+    resource = None
+
+# The active profiler, if any. Instrumented code only pays for one lookup when profiling is off.
+_active: ContextVar[Optional['Profiler']] = ContextVar('profiler', default=None)
+
+
+def _max_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+@dataclass
+class StageStats:
+    """Totals for one named stage over all of its calls"""
+    name: str
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    records: Optional[int] = None
+    peak_traced_bytes: Optional[int] = None
+    max_rss_bytes: Optional[int] = None
+
+    def add_records(self, count: Optional[int]) -> None:
+        if count is not None:
+            self.records = (self.records or 0) + count
+
+    @property
+    def records_per_sec(self) -> Optional[float]:
+        if self.records is None or not self.wall_seconds:
+            return None
+        return self.records / self.wall_seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Profiler:
+    """Collects per-stage wall time, CPU time, memory and record counts.
+
+    Activate it with `with Profiler():` (or start()/stop()); stage() and
+    @profiled code running in the same context report to it. With
+    trace_memory, tracemalloc runs for the whole session and each stage
+    records the peak Python allocation above what was live when it started.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.stages: Dict[str, StageStats] = {}
+        self._token = None
+        self._started_tracing = False
+        # (allocated at stage start, peak seen so far) for each open stage
+        self._peaks: List[List[int]] = []
+
+    def start(self) -> 'Profiler':
+        self._token = _active.set(self)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def stop(self) -> None:
+        if self._token is not None:
+            _active.reset(self._token)
+            self._token = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self) -> 'Profiler':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _enter_memory(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            # Resetting the peak below would lose the enclosing stage's peak
+            self._peaks[-1][1] = max(self._peaks[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._peaks.append([current, current])
+
+    def _exit_memory(self) -> int:
+        start, peak = self._peaks.pop()
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        if self._peaks:
+            self._peaks[-1][1] = max(self._peaks[-1][1], peak)
+        return peak - start
+
+    @contextmanager
+    def stage(self, name: str, records: Optional[int] = None) -> Iterator[StageStats]:
+        stats = self.stages.setdefault(name, StageStats(name))
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            self._enter_memory()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.calls += 1
+            stats.wall_seconds += time.perf_counter() - wall
+            stats.cpu_seconds += time.process_time() - cpu
+            stats.add_records(records)
+            if tracing:
+                peak = self._exit_memory()
+                stats.peak_traced_bytes = max(stats.peak_traced_bytes or 0, peak)
+            stats.max_rss_bytes = _max_rss_bytes()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'max_rss_bytes': _max_rss_bytes(),
+            'stages': [stats.to_dict() for stats in self.stages.values()],
+        }
+
+    def to_prometheus(self, prefix: str = 'officials') -> str:
+        """Render the stages in the Prometheus text exposition format (for node_exporter textfiles)"""
+        metrics = [
+            ('calls', 'Number of times the stage ran'),
+            ('wall_seconds', 'Wall-clock time spent in the stage'),
+            ('cpu_seconds', 'Process CPU time spent in the stage'),
+            ('records', 'Records processed by the stage'),
+            ('peak_traced_bytes', 'Peak Python allocation during the stage'),
+            ('max_rss_bytes', 'Process peak resident set size after the stage'),
+        ]
+        lines = []
+        for metric, help_text in metrics:
+            samples = [(stats.name, getattr(stats, metric)) for stats in self.stages.values()
+                       if getattr(stats, metric) is not None]
+            if not samples:
+                continue
+            lines.append(f"# HELP {prefix}_stage_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_stage_{metric} gauge")
+            for name, value in samples:
+                lines.append(f'{prefix}_stage_{metric}{{stage="{name}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def table(self) -> List[str]:
+        """Human-readable report lines"""
+        lines = [f"{'stage':<34} {'calls':>6} {'wall s':>9} {'cpu s':>9} {'records':>10} {'peak MiB':>9}"]
+        for stats in self.stages.values():
+            records = f"{stats.records:>10}" if stats.records is not None else f"{'-':>10}"
+            peak = (f"{stats.peak_traced_bytes / 2**20:>9.1f}"
+                    if stats.peak_traced_bytes is not None else f"{'-':>9}")
+            lines.append(f"{stats.name:<34} {stats.calls:>6} {stats.wall_seconds:>9.3f} "
+                         f"{stats.cpu_seconds:>9.3f} {records} {peak}")
+        rss = _max_rss_bytes()
+        if rss is not None:
+            lines.append(f"max RSS: {rss / 2**20:.1f} MiB")
+        return lines
+
+    def write(self, file_path: str) -> None:
+        """Write the report as Prometheus text (.prom) or JSON (anything else)"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            if file_path.endswith('.prom'):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.to_dict(), f, indent=2)
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _active.get()
+
+
+@contextmanager
+def stage(name: str, records: Optional[int] = None) -> Iterator[Optional[StageStats]]:
+    """Time a block as a named stage of the active profiler (a no-op without one).
+
+    The yielded StageStats (None when not profiling) can take record counts
+    that are only known at the end: `if stats: stats.add_records(n)`.
+    """
+    profiler = _active.get()
+    if profiler is None:
+        yield None
+        return
+    with profiler.stage(name, records) as stats:
+        yield stats
+
+
+def count_officials(value: Any) -> Optional[int]:
+    """Number of officials in a {"officials": [...]} document or a sized collection"""
+    if isinstance(value, dict):
+        return len(value.get('officials', []))
+    if isinstance(value, Sized):
+        return len(value)
+    return None
+
+
+def result_records(result: Any, *args, **kwargs) -> Optional[int]:
+    """records= helper for @profiled: count the officials returned"""
+    return count_officials(result)
+
+
+def argument_records(position: int) -> Callable[..., Optional[int]]:
+    """records= helper for @profiled: count the officials passed as positional argument `position`"""
+    def count(result: Any, *args, **kwargs) -> Optional[int]:
+        return count_officials(args[position]) if len(args) > position else None
+    return count
+
+
+def profiled(name: Optional[str] = None, records: Optional[Callable[..., Optional[int]]] = None):
+    """Decorator recording each call as a stage of the active profiler.
+
+    records, if given, is called as records(result, *args, **kwargs) and
+    returns the record count for the call (None if unknown).
+    """
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with profiler.stage(stage_name) as stats:
+                result = func(*args, **kwargs)
+                if records is not None:
+                    stats.add_records(records(result, *args, **kwargs))
+                return result
+        return wrapper
+    return decorator
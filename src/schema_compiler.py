@@ -0,0 +1,340 @@
+from typing import Dict, List, Any, Callable, Tuple
+import numbers
+import re
+import threading
+
+# Keywords turned into code; a subschema using anything else is handed to jsonschema
+COMPILED_KEYWORDS = {
+    'type', 'properties', 'required', 'additionalProperties', 'minLength', 'maxLength', 'pattern', 'items',
+}
+# Keywords that never produce errors here ('format' only asserts with a format checker, which is not used)
+ANNOTATIONS = {
+    '$schema', '$id', '$comment', 'title', 'description', 'default', 'examples', 'format', 'readOnly', 'writeOnly',
+}
+# Drafts whose semantics for the compiled keywords match the generated code
+COMPILED_DRAFTS = {'Draft6Validator', 'Draft7Validator'}
+
+_TYPE_CHECKS = {
+    'object': 'isinstance({0}, dict)',
+    'array': 'isinstance({0}, list)',
+    'string': 'isinstance({0}, str)',
+    'boolean': 'isinstance({0}, bool)',
+    'null': '{0} is None',
+    'number': '_is_number({0})',
+    'integer': '_is_integer({0})',
+}
+
+# Path of an error within the instance, and its message
+ErrorTuple = Tuple[Tuple[Any, ...], str]
+
+# The generated code spells out jsonschema's error messages. Before a draft
+# is compiled, these instances are checked against it with the installed
+# jsonschema; if the messages differ (e.g. reworded by a new release),
+# schemas of that draft are left to jsonschema.
+_PROBE_SCHEMA = {
+    "type": "object",
+    "required": ["required"],
+    "additionalProperties": False,
+    "properties": {
+        "types": {"type": ["string", "null"]},
+        "type": {"type": "integer"},
+        "nonempty": {"type": "string", "minLength": 1},
+        "short": {"type": "string", "minLength": 3},
+        "empty": {"type": "string", "maxLength": 0},
+        "long": {"type": "string", "maxLength": 2},
+        "pattern": {"type": "string", "pattern": "^a"},
+        "items": {"type": "array", "items": {"type": "number"}},
+        "required": {},
+    },
+}
+_PROBE_INSTANCES = [
+    {"types": 1, "type": 1.5, "nonempty": "", "short": "ab", "empty": "x", "long": "abc",
+     "pattern": "b", "items": [1, "x", True], "extra": 1, "other": 2},
+    {"required": None, "types": None, "items": []},
+    "not an object",
+]
+_messages_checked: Dict[Any, bool] = {}
+_messages_lock = threading.Lock()
+
+
+def _is_number(instance: Any) -> bool:
+    return isinstance(instance, numbers.Number) and not isinstance(instance, bool)
+
+
+def _is_integer(instance: Any) -> bool:
+    if isinstance(instance, bool):
+        return False
+    return isinstance(instance, int) or (isinstance(instance, float) and instance.is_integer())
+
+
+def error_path(error: Any) -> Tuple[Any, ...]:
+    """Path of the offending field; for a missing required property, the property itself"""
+    parts = tuple(error.absolute_path)
+    if error.validator == 'required' and isinstance(error.instance, dict):
+        for prop in error.validator_value:
+            if prop not in error.instance and repr(prop) in error.message:
+                return parts + (prop,)
+    return parts
+
+
+def _fallback_errors(validator: Any, instance: Any, path: Tuple[Any, ...], errors: List[ErrorTuple]) -> None:
+    for error in validator.iter_errors(instance):
+        errors.append((path + error_path(error), error.message))
+
+
+def _has_ref(schema: Any) -> bool:
+    if isinstance(schema, dict):
+        return '$ref' in schema or any(_has_ref(value) for value in schema.values())
+    if isinstance(schema, list):
+        return any(_has_ref(value) for value in schema)
+    return False
+
+
+class CompiledValidator:
+    """Validation code generated from one schema.
+
+    is_valid(instance) answers like jsonschema's is_valid; errors(instance)
+    returns (path, message) for every error jsonschema's iter_errors would
+    yield, in the same order and with the same messages. `source` is the
+    generated code and `fallbacks` the number of subschemas left to jsonschema.
+    """
+
+    def __init__(self, is_valid: Callable[[Any], bool], errors: Callable[[Any], List[ErrorTuple]],
+                 source: str, fallbacks: int):
+        self.is_valid = is_valid
+        self.errors = errors
+        self.source = source
+        self.fallbacks = fallbacks
+
+
+class _Compiler:
+    def __init__(self, cls: Any):
+        self.cls = cls
+        self.namespace: Dict[str, Any] = {
+            '_is_number': _is_number,
+            '_is_integer': _is_integer,
+            '_fallback_errors': _fallback_errors,
+            '_MISSING': object(),
+        }
+        self.fallbacks: Dict[int, str] = {}
+        self.counter = 0
+
+    def name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, prefix: str, value: Any) -> str:
+        name = self.name(prefix)
+        self.namespace[name] = value
+        return name
+
+    def compilable(self, schema: Any) -> bool:
+        """Whether the generated code can handle this subschema itself"""
+        if not isinstance(schema, dict):
+            return False
+        for keyword, value in schema.items():
+            if keyword in ANNOTATIONS:
+                continue
+            if keyword not in COMPILED_KEYWORDS:
+                return False
+            if keyword == 'type':
+                types = [value] if isinstance(value, str) else value
+                if not isinstance(types, list) or not all(t in _TYPE_CHECKS for t in types):
+                    return False
+            elif keyword == 'properties' and not isinstance(value, dict):
+                return False
+            elif keyword == 'required' and not (isinstance(value, list)
+                                                and all(isinstance(prop, str) for prop in value)):
+                return False
+            # An additionalProperties schema reports extras in set order, which cannot be reproduced
+            elif keyword == 'additionalProperties' and not isinstance(value, bool):
+                return False
+            elif keyword in ('minLength', 'maxLength') and (not isinstance(value, int) or isinstance(value, bool)):
+                return False
+            elif keyword == 'pattern':
+                if not isinstance(value, str):
+                    return False
+                try:
+                    re.compile(value)
+                except re.error:
+                    return False
+            elif keyword == 'items' and not isinstance(value, dict):
+                return False
+        return True
+
+    def fallback(self, schema: Any) -> str:
+        key = id(schema)
+        if key not in self.fallbacks:
+            self.fallbacks[key] = self.constant('_fallback', self.cls(schema))
+        return self.fallbacks[key]
+
+    @staticmethod
+    def types(schema: Dict[str, Any]) -> List[str]:
+        types = schema.get('type', [])
+        return [types] if isinstance(types, str) else types
+
+    def valid(self, schema: Any, var: str, indent: str) -> List[str]:
+        """Statements that return False unless `var` is valid against schema"""
+        if not self.compilable(schema):
+            return [f"{indent}if not {self.fallback(schema)}.is_valid({var}):",
+                    f"{indent}    return False"]
+        lines = []
+        types = self.types(schema)
+        if 'type' in schema:
+            check = ' or '.join(_TYPE_CHECKS[t].format(var) for t in types)
+            lines += [f"{indent}if not ({check}):", f"{indent}    return False"]
+
+        object_lines = []
+        if 'required' in schema and schema['required']:
+            required = self.constant('_required', frozenset(schema['required']))
+            object_lines += [f"{indent}    if not {var}.keys() >= {required}:",
+                             f"{indent}        return False"]
+        if schema.get('additionalProperties') is False:
+            allowed = self.constant('_allowed', frozenset(schema.get('properties', {})))
+            object_lines += [f"{indent}    if not {var}.keys() <= {allowed}:",
+                             f"{indent}        return False"]
+        for prop, subschema in schema.get('properties', {}).items():
+            child = self.name('v')
+            object_lines += [f"{indent}    {child} = {var}.get({prop!r}, _MISSING)",
+                             f"{indent}    if {child} is not _MISSING:"]
+            object_lines += self.valid(subschema, child, indent + '        ') or [f"{indent}        pass"]
+        lines += self.guard(types, 'object', var, indent, object_lines)
+
+        string_lines = []
+        if 'minLength' in schema:
+            string_lines += [f"{indent}    if len({var}) < {schema['minLength']}:", f"{indent}        return False"]
+        if 'maxLength' in schema:
+            string_lines += [f"{indent}    if len({var}) > {schema['maxLength']}:", f"{indent}        return False"]
+        if 'pattern' in schema:
+            pattern = self.constant('_pattern', re.compile(schema['pattern']))
+            string_lines += [f"{indent}    if {pattern}.search({var}) is None:", f"{indent}        return False"]
+        lines += self.guard(types, 'string', var, indent, string_lines)
+
+        if 'items' in schema:
+            item = self.name('v')
+            array_lines = [f"{indent}    for {item} in {var}:"]
+            array_lines += self.valid(schema['items'], item, indent + '        ') or [f"{indent}        pass"]
+            lines += self.guard(types, 'array', var, indent, array_lines)
+        return lines
+
+    @staticmethod
+    def guard(types: List[str], kind: str, var: str, indent: str, lines: List[str]) -> List[str]:
+        """Keyword checks only apply to instances of their kind; skip the test when type already ensured it"""
+        if not lines:
+            return []
+        if types == [kind]:
+            return [line[4:] for line in lines]
+        return [f"{indent}if {_TYPE_CHECKS[kind].format(var)}:"] + lines
+
+    def errors(self, schema: Any, var: str, parts: List[str], indent: str) -> List[str]:
+        """Statements appending every error of `var` (at path `parts`) against schema, in jsonschema's order"""
+        path = f"({', '.join(parts)},)" if parts else '()'
+        if not self.compilable(schema):
+            return [f"{indent}_fallback_errors({self.fallback(schema)}, {var}, {path}, errors)"]
+        lines = []
+        types = self.types(schema)
+        for keyword, value in schema.items():
+            if keyword == 'type':
+                check = ' or '.join(_TYPE_CHECKS[t].format(var) for t in types)
+                message = ' is not of type ' + ', '.join(repr(t) for t in types)
+                lines += [f"{indent}if not ({check}):",
+                          f"{indent}    errors.append(({path}, repr({var}) + {message!r}))"]
+            elif keyword == 'required':
+                required = self.constant('_required', list(value))
+                prop = self.name('p')
+                # Like the other errors of a record, a missing property is reported at its own path
+                prop_path = f"({', '.join(parts + [prop])},)"
+                lines += [f"{indent}if isinstance({var}, dict):",
+                          f"{indent}    for {prop} in {required}:",
+                          f"{indent}        if {prop} not in {var}:",
+                          f"{indent}            errors.append(({prop_path}, repr({prop}) + ' is a required property'))"]
+            elif keyword == 'additionalProperties' and value is False:
+                allowed = self.constant('_allowed', frozenset(schema.get('properties', {})))
+                extras = self.name('extras')
+                lines += [f"{indent}if isinstance({var}, dict) and not {var}.keys() <= {allowed}:",
+                          f"{indent}    {extras} = sorted(({var}.keys() - {allowed}), key=str)",
+                          f"{indent}    errors.append(({path}, 'Additional properties are not allowed (%s %s unexpected)'"
+                          f" % (', '.join(repr(extra) for extra in {extras}), "
+                          f"'was' if len({extras}) == 1 else 'were')))"]
+            elif keyword == 'properties':
+                body = []
+                for prop, subschema in value.items():
+                    child = self.name('v')
+                    body += [f"{indent}    {child} = {var}.get({prop!r}, _MISSING)",
+                             f"{indent}    if {child} is not _MISSING:"]
+                    body += self.errors(subschema, child, parts + [repr(prop)], indent + '        ') \
+                        or [f"{indent}        pass"]
+                if body:
+                    lines += [f"{indent}if isinstance({var}, dict):"] + body
+            elif keyword in ('minLength', 'maxLength'):
+                if keyword == 'minLength':
+                    failed = f"len({var}) < {value}"
+                    message = ' should be non-empty' if value == 1 else ' is too short'
+                else:
+                    failed = f"len({var}) > {value}"
+                    message = ' is expected to be empty' if value == 0 else ' is too long'
+                lines += [f"{indent}if isinstance({var}, str) and {failed}:",
+                          f"{indent}    errors.append(({path}, repr({var}) + {message!r}))"]
+            elif keyword == 'pattern':
+                pattern = self.constant('_pattern', re.compile(value))
+                message = f" does not match {value!r}"
+                lines += [f"{indent}if isinstance({var}, str) and {pattern}.search({var}) is None:",
+                          f"{indent}    errors.append(({path}, repr({var}) + {message!r}))"]
+            elif keyword == 'items':
+                index, item = self.name('i'), self.name('v')
+                lines += [f"{indent}if isinstance({var}, list):",
+                          f"{indent}    for {index}, {item} in enumerate({var}):"]
+                lines += self.errors(value, item, parts + [index], indent + '        ') \
+                    or [f"{indent}        pass"]
+        return lines
+
+
+def compile_schema(schema: Any, cls: Any = None) -> CompiledValidator:
+    """Generate validation code for schema.
+
+    cls is the jsonschema validator class whose behaviour to reproduce (by
+    default the one the schema's $schema names). Subschemas with keywords the
+    compiler does not handle are checked by cls; schemas using $ref, of
+    drafts other than 6 and 7, or of a draft whose messages in the installed
+    jsonschema differ from the generated ones (see messages_match), are
+    checked by cls entirely.
+    """
+    from jsonschema import validators
+
+    cls = cls or validators.validator_for(schema, default=validators.Draft7Validator)
+    drafts = [getattr(validators, name) for name in COMPILED_DRAFTS]
+    compiled = cls in drafts and not _has_ref(schema) and messages_match(cls)
+    return _generate(schema, cls, compiled)
+
+
+def messages_match(cls: Any) -> bool:
+    """Whether the generated code reports the same errors as the installed jsonschema for cls"""
+    with _messages_lock:
+        if cls not in _messages_checked:
+            reference = cls(_PROBE_SCHEMA)
+            generated = _generate(_PROBE_SCHEMA, cls, True)
+            _messages_checked[cls] = all(
+                generated.errors(instance) == [(error_path(error), error.message)
+                                               for error in reference.iter_errors(instance)]
+                for instance in _PROBE_INSTANCES
+            )
+        return _messages_checked[cls]
+
+
+def _generate(schema: Any, cls: Any, compiled: bool) -> CompiledValidator:
+    """Build the validator; with compiled=False it only delegates to cls"""
+    compiler = _Compiler(cls)
+    if not compiled:
+        valid_lines = [f"    if not {compiler.fallback(schema)}.is_valid(instance):", "        return False"]
+        error_lines = [f"    _fallback_errors({compiler.fallback(schema)}, instance, (), errors)"]
+    else:
+        valid_lines = compiler.valid(schema, 'instance', '    ')
+        error_lines = compiler.errors(schema, 'instance', [], '    ')
+
+    source = '\n'.join(
+        ['def is_valid(instance):'] + valid_lines + ['    return True', '', '',
+         'def errors(instance):', '    errors = []'] + error_lines + ['    return errors', '']
+    )
+    namespace = dict(compiler.namespace)
+    exec(compile(source, '<compiled schema>', 'exec'), namespace)
+    return CompiledValidator(namespace['is_valid'], namespace['errors'], source, len(compiler.fallbacks))
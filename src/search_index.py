@@ -0,0 +1,279 @@
+from bisect import bisect_left
+from collections import OrderedDict
+import threading
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src import columnar
+
+# Free-text fields get a trigram index; keyword fields an exact-value inverted index
+TEXT_FIELDS = ('name', 'jurisdiction')
+KEYWORD_FIELDS = ('party', 'designation')
+
+# Trigram codes pack three code points (21 bits each) into one uint64
+_BITS = 21
+_PAD = '\0\0'
+_EMPTY = np.empty(0, dtype=np.int64)
+# Intersections switch from binary search to a bitmap for large, similar-sized operands
+_BITMAP_MIN = 4096
+_BITMAP_RATIO = 16
+
+
+def _intersect2(small: np.ndarray, large: np.ndarray) -> np.ndarray:
+    """Intersect two sorted, unique arrays of row ids"""
+    if not len(small) or not len(large):
+        return _EMPTY
+    if len(small) >= _BITMAP_MIN and len(small) * _BITMAP_RATIO >= len(large):
+        # One pass over a row bitmap beats a binary search per element
+        present = np.zeros(int(max(small[-1], large[-1])) + 1, dtype=bool)
+        present[large] = True
+        return small[present[small]]
+    positions = np.searchsorted(large, small)
+    positions[positions == len(large)] = len(large) - 1
+    return small[large[positions] == small]
+
+
+def _intersect(results: List[np.ndarray], stop_below: int = 0) -> np.ndarray:
+    """Intersect sorted, unique row-id arrays, smallest first.
+
+    Stops early once fewer than stop_below rows remain; callers that pass it
+    verify the remaining candidates themselves.
+    """
+    results = sorted(results, key=len)
+    found = results[0]
+    for other in results[1:]:
+        if len(found) < stop_below:
+            break
+        found = _intersect2(found, other)
+    return found
+
+
+class _TrigramIndex:
+    """Lowercase trigram postings for one text field, stored as sorted arrays.
+
+    Every row is padded with two NULs so that each character starts a
+    trigram; one- and two-character queries then map to a contiguous range of
+    trigram codes.
+    """
+
+    # Candidate count below which remaining trigrams are checked by substring search
+    VERIFY_BELOW = 256
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.size = len(texts)
+        # pyarrow, when installed, verifies large candidate sets in C
+        self.arrow_texts = columnar.pa.array(texts, columnar.pa.string()) if columnar.has_pyarrow() else None
+        lengths = np.fromiter((len(text) + len(_PAD) for text in texts), dtype=np.int64, count=len(texts))
+        points = np.frombuffer((_PAD.join(texts) + _PAD).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+
+        # Trigrams starting on a padding character would span two rows
+        starts = np.flatnonzero(points[:-2] != 0) if len(points) > 2 else _EMPTY
+        codes = (points[starts] << np.uint64(2 * _BITS)) | (points[starts + 1] << np.uint64(_BITS)) | points[starts + 2]
+        rows = rows[starts]
+
+        order = np.lexsort((rows, codes))
+        codes, rows = codes[order], rows[order]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+        codes, rows = codes[keep], rows[keep]
+
+        boundaries = np.flatnonzero(np.diff(codes)) + 1 if len(codes) else _EMPTY
+        self.keys = codes[np.concatenate(([0], boundaries))] if len(codes) else codes
+        self.offsets = np.concatenate(([0], boundaries, [len(codes)])).astype(np.int64)
+        self.rows = rows
+        self._short: Dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def _code(gram: str) -> int:
+        a, b, c = (ord(char) for char in gram)
+        return (a << 2 * _BITS) | (b << _BITS) | c
+
+    def _code_range(self, low: int, high: int) -> np.ndarray:
+        start, stop = np.searchsorted(self.keys, [np.uint64(low), np.uint64(high)])
+        return self.rows[self.offsets[start]:self.offsets[stop]]
+
+    def _postings(self, gram: str) -> np.ndarray:
+        code = self._code(gram)
+        return self._code_range(code, code + 1)
+
+    def candidates(self, query: str) -> Tuple[np.ndarray, bool]:
+        """Rows that may contain query (already lowercased), and whether they all do.
+
+        Rows sharing every trigram of a query longer than three characters
+        still need verify(); callers can narrow them down with other filters
+        first.
+        """
+        if len(query) < 3:
+            # All trigrams that start with the query, cached per short query
+            if query not in self._short:
+                padded = query + '\0' * (3 - len(query))
+                low = self._code(padded)
+                span = 1 << (_BITS * (3 - len(query)))
+                self._short[query] = np.unique(self._code_range(low, low + span))
+            return self._short[query], True
+
+        grams = {query[i:i + 3] for i in range(len(query) - 2)}
+        postings = [self._postings(gram) for gram in grams]
+        # A trigram found in every row (e.g. "dis" in "District N") filters nothing
+        selective = [rows for rows in postings if len(rows) < self.size]
+        if not selective:
+            return np.arange(self.size, dtype=np.int64), len(query) == 3
+        found = _intersect(selective, self.VERIFY_BELOW)
+        return found, len(query) == 3 or not len(found)
+
+    def verify(self, rows: np.ndarray, query: str) -> np.ndarray:
+        """The subset of rows whose text really contains query"""
+        if self.arrow_texts is not None and len(rows) >= self.VERIFY_BELOW:
+            import pyarrow.compute as pc
+            mask = pc.match_substring(self.arrow_texts.take(rows), query)
+            return rows[mask.to_numpy(zero_copy_only=False)]
+        texts = self.texts
+        return np.array([row for row in rows.tolist() if query in texts[row]], dtype=np.int64)
+
+    def contains(self, query: str) -> np.ndarray:
+        """Rows whose text contains query (already lowercased)"""
+        rows, exact = self.candidates(query)
+        return rows if exact else self.verify(rows, query)
+
+
+class _PrefixIndex:
+    """Lowercase values in sorted order, for prefix lookups by bisection"""
+
+    def __init__(self, texts: List[str]):
+        order = sorted(range(len(texts)), key=texts.__getitem__)
+        self.order = np.array(order, dtype=np.int64)
+        self.sorted = [texts[row] for row in order]
+
+    def startswith(self, query: str) -> np.ndarray:
+        start = bisect_left(self.sorted, query)
+        stop = bisect_left(self.sorted, query + '\U0010ffff', start)
+        return np.sort(self.order[start:stop])
+
+
+class SearchIndex:
+    """Read-only search index over a list of officials, built once per dataset.
+
+    Results are sorted numpy arrays of row positions, so they can be passed
+    to DataFrame.iloc (or OfficialsDataset.take) without copying the frame.
+    Name and jurisdiction support case-insensitive substring and prefix
+    search; party and designation are matched exactly.
+    """
+
+    def __init__(self, officials: Sequence[Dict[str, Any]]):
+        self.size = len(officials)
+        if isinstance(officials, columnar.TableOfficials):
+            # Read just the indexed columns, once, instead of whole records per pass
+            table = officials.table
+            fields = [name for name in TEXT_FIELDS + KEYWORD_FIELDS if name in table.column_names]
+            officials = list(columnar.TableOfficials(table.select(fields)))
+        self._texts = {
+            field: [str(official.get(field) or '').lower() for official in officials]
+            for field in TEXT_FIELDS
+        }
+        self._trigrams = {field: _TrigramIndex(texts) for field, texts in self._texts.items()}
+        self._prefixes: Dict[str, _PrefixIndex] = {}
+        # Streamlit reruns the script on every interaction, repeating the same search
+        self._results: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._keywords: Dict[str, Dict[str, np.ndarray]] = {}
+        for field in KEYWORD_FIELDS:
+            postings: Dict[str, List[int]] = {}
+            for row, official in enumerate(officials):
+                value = official.get(field)
+                if value is not None:
+                    postings.setdefault(value, []).append(row)
+            self._keywords[field] = {
+                value: np.array(rows, dtype=np.int64) for value, rows in postings.items()
+            }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def values(self, field: str) -> List[str]:
+        """Distinct values of a keyword field"""
+        return sorted(self._keywords[field])
+
+    def contains(self, field: str, query: str) -> np.ndarray:
+        """Rows whose text field contains query, ignoring case"""
+        query = query.lower()
+        if not query:
+            return np.arange(self.size, dtype=np.int64)
+        return self._trigrams[field].contains(query)
+
+    def startswith(self, field: str, query: str) -> np.ndarray:
+        """Rows whose text field starts with query, ignoring case"""
+        if field not in self._prefixes:
+            # Built on first use; substring search does not need it
+            self._prefixes[field] = _PrefixIndex(self._texts[field])
+        return self._prefixes[field].startswith(query.lower())
+
+    def equals(self, field: str, value: str) -> np.ndarray:
+        """Rows whose keyword field equals value"""
+        return self._keywords[field].get(value, _EMPTY)
+
+    # Number of recent search() results kept
+    RESULT_CACHE_SIZE = 64
+
+    def search(self, name: Optional[str] = None, jurisdiction: Optional[str] = None,
+               party: Optional[str] = None, designation: Optional[str] = None,
+               prefix: bool = False) -> np.ndarray:
+        """Rows matching every given filter (None or '' means no filter).
+
+        The returned array is shared with later identical searches; do not modify it.
+        """
+        key = (name or None, jurisdiction or None, party, designation, prefix)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        found = self._search(name, jurisdiction, party, designation, prefix)
+        with self._lock:
+            self._results[key] = found
+            while len(self._results) > self.RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return found
+
+    def _search(self, name: Optional[str], jurisdiction: Optional[str], party: Optional[str],
+                designation: Optional[str], prefix: bool) -> np.ndarray:
+        results = []
+        unverified = []
+        for field, query in (('name', name), ('jurisdiction', jurisdiction)):
+            if not query:
+                continue
+            if prefix:
+                results.append(self.startswith(field, query))
+                continue
+            rows, exact = self._trigrams[field].candidates(query.lower())
+            results.append(rows)
+            if not exact:
+                unverified.append((field, query.lower()))
+        for field, value in (('party', party), ('designation', designation)):
+            if value is not None:
+                results.append(self.equals(field, value))
+        if not results:
+            return np.arange(self.size, dtype=np.int64)
+        # Substring checks run last, on the rows every index agrees on
+        found = _intersect(results)
+        for field, query in unverified:
+            found = self._trigrams[field].verify(found, query)
+        return found
+
+    @staticmethod
+    def matches(official: Dict[str, Any], name: Optional[str] = None,
+                jurisdiction: Optional[str] = None, party: Optional[str] = None,
+                designation: Optional[str] = None, prefix: bool = False) -> bool:
+        """Whether one official matches the same filters as search()"""
+        for field, query in (('name', name), ('jurisdiction', jurisdiction)):
+            if query:
+                text = str(official.get(field) or '').lower()
+                found = text.startswith(query.lower()) if prefix else query.lower() in text
+                if not found:
+                    return False
+        for field, value in (('party', party), ('designation', designation)):
+            if value is not None and official.get(field) != value:
+                return False
+        return True
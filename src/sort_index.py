@@ -0,0 +1,90 @@
+import threading
+from typing import Dict, Any, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Rank given to missing values, which sort last in either direction
+MISSING_RANK = np.inf
+
+
+def sort_keys(values: pd.Series) -> pd.Series:
+    """Values as case-folded strings, <NA> where missing"""
+    return values.astype('string').str.casefold()
+
+
+def directed(ranks: np.ndarray, descending: bool) -> np.ndarray:
+    """Ranks to sort ascending on, keeping missing values last when descending"""
+    if not descending:
+        return ranks
+    return np.where(ranks == MISSING_RANK, MISSING_RANK, -ranks)
+
+
+class SortIndex:
+    """Per-column sort ranks over a read-only DataFrame, built on first use.
+
+    A row's rank is twice the position of its (case-folded) value among the
+    column's sorted distinct values, plus one; equal values share a rank and
+    missing values rank last. Any subset of rows can then be ordered with a
+    numeric sort, and rows added later are ranked into the gaps between the
+    base values by binary search, without re-sorting the base.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self._df = df
+        self._ranks: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._df)
+
+    def _column(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(ranks of the rows, sorted distinct keys) for a column"""
+        with self._lock:
+            if column not in self._ranks:
+                if column in self._df.columns:
+                    codes, uniques = pd.factorize(sort_keys(self._df[column]), sort=True)
+                    ranks = codes * 2.0 + 1
+                    ranks[codes < 0] = MISSING_RANK
+                    uniques = np.asarray(uniques, dtype=object)
+                else:
+                    ranks = np.full(len(self._df), MISSING_RANK)
+                    uniques = np.empty(0, dtype=object)
+                self._ranks[column] = (ranks, uniques)
+            return self._ranks[column]
+
+    def ranks(self, column: str) -> np.ndarray:
+        """Sort ranks of every row for a column"""
+        return self._column(column)[0]
+
+    def rank_values(self, column: str, values: Sequence[Any]) -> np.ndarray:
+        """Ranks for values outside the DataFrame, consistent with ranks(column)"""
+        _, uniques = self._column(column)
+        keys = sort_keys(pd.Series(list(values), dtype=object))
+        ranks = np.full(len(keys), MISSING_RANK)
+        present = keys.notna().to_numpy()
+        found = keys[present].to_numpy(dtype=object)
+        if not len(found):
+            return ranks
+        slots = np.searchsorted(uniques, found) if len(uniques) else np.zeros(len(found), dtype=np.int64)
+        exact = np.zeros(len(found), dtype=bool)
+        inside = slots < len(uniques)
+        exact[inside] = uniques[slots[inside]] == found[inside]
+        # Values not in the base go strictly between their neighbours, in their own order
+        _, new_order = np.unique(found[~exact].astype(str), return_inverse=True)
+        present_ranks = slots * 2.0 + 1
+        present_ranks[~exact] = slots[~exact] * 2.0 + (new_order + 1) / (new_order.max(initial=0) + 2)
+        ranks[present] = present_ranks
+        return ranks
+
+    def order(self, column: str, descending: bool = False) -> np.ndarray:
+        """All row positions sorted by a column, ties in position order"""
+        key = (column, descending)
+        with self._lock:
+            order = self._orders.get(key)
+        if order is None:
+            order = np.argsort(directed(self.ranks(column), descending), kind='stable')
+            with self._lock:
+                self._orders[key] = order
+        return order
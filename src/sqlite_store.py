@@ -0,0 +1,374 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Sequence, Tuple
+import hashlib
+import json
+import sqlite3
+import threading
+
+import numpy as np
+
+from src.analyzer import OfficialsSummary
+from src.exporter import FLATTENED_FIELDS
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Columns of the officials table, in the order officials are rebuilt
+OFFICIAL_FIELDS = ('name', 'designation', 'jurisdiction', 'party')
+# Nested objects stored one row per key: field -> (table, key column, value column)
+NESTED_TABLES = {
+    'social_media': ('social_media', 'platform', 'handle'),
+    'contact': ('contact', 'method', 'value'),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS officials (
+    id INTEGER PRIMARY KEY,
+    name TEXT COLLATE NOCASE,
+    designation TEXT,
+    jurisdiction TEXT COLLATE NOCASE,
+    party TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS social_media (
+    official_id INTEGER NOT NULL REFERENCES officials(id) ON DELETE CASCADE,
+    platform TEXT NOT NULL,
+    handle TEXT
+);
+CREATE TABLE IF NOT EXISTS contact (
+    official_id INTEGER NOT NULL REFERENCES officials(id) ON DELETE CASCADE,
+    method TEXT NOT NULL,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Created after a bulk load rather than maintained row by row during it
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS officials_name ON officials(name);
+CREATE INDEX IF NOT EXISTS officials_party ON officials(party);
+CREATE INDEX IF NOT EXISTS officials_designation ON officials(designation);
+CREATE INDEX IF NOT EXISTS officials_jurisdiction ON officials(jurisdiction);
+CREATE INDEX IF NOT EXISTS social_media_official ON social_media(official_id);
+CREATE INDEX IF NOT EXISTS social_media_platform ON social_media(platform);
+CREATE INDEX IF NOT EXISTS contact_official ON contact(official_id);
+"""
+
+# Substring search on name/jurisdiction; the trigram tokenizer needs SQLite 3.34+
+_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS officials_fts USING fts5(
+    name, jurisdiction, content='officials', content_rowid='id', tokenize='trigram'
+);
+"""
+
+
+def _like_pattern(query: str, prefix: bool) -> str:
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"{escaped}%" if prefix else f"%{escaped}%"
+
+
+class OfficialsStore:
+    """Officials in a local SQLite database, for rosters too large to hold in memory.
+
+    social_media and contact are normalized into one row per platform/method.
+    The database runs in WAL mode, so any number of readers (e.g. Streamlit
+    sessions) can share it while one writer appends. Each thread gets its own
+    connection. Row ids are 0-based positions in load order.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        # Sort orders by (column, descending), valid while fingerprint() is _orders_state
+        self._orders: Dict[Tuple[str, bool], Tuple[np.ndarray, np.ndarray]] = {}
+        self._orders_state: Optional[str] = None
+        self._orders_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        try:
+            conn.executescript(_FTS)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # Writing
+
+    def get_metadata(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_metadata(self, key: str, value: str) -> None:
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)", (key, value))
+
+    @staticmethod
+    def _rows(official_id: int, official: Dict[str, Any], officials: List[tuple],
+              nested: Dict[str, List[tuple]]) -> None:
+        extra = {key: value for key, value in official.items()
+                 if key not in OFFICIAL_FIELDS and key not in NESTED_TABLES}
+        officials.append((official_id, *(official.get(field) for field in OFFICIAL_FIELDS),
+                          json.dumps(extra) if extra else None))
+        for field in NESTED_TABLES:
+            values = official.get(field)
+            if isinstance(values, dict):
+                nested[field].extend((official_id, key, value) for key, value in values.items())
+
+    def _insert(self, conn: sqlite3.Connection, start_id: int, batch: List[Dict[str, Any]]) -> None:
+        officials: List[tuple] = []
+        nested: Dict[str, List[tuple]] = {field: [] for field in NESTED_TABLES}
+        for offset, official in enumerate(batch):
+            self._rows(start_id + offset, official, officials, nested)
+        conn.executemany(
+            "INSERT INTO officials (id, name, designation, jurisdiction, party, extra) VALUES (?, ?, ?, ?, ?, ?)",
+            officials
+        )
+        for field, (table, key_column, value_column) in NESTED_TABLES.items():
+            conn.executemany(
+                f"INSERT INTO {table} (official_id, {key_column}, {value_column}) VALUES (?, ?, ?)",
+                nested[field]
+            )
+
+    def load(self, officials: Iterable[Dict[str, Any]], batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+        """Replace the stored officials in one transaction and return how many were loaded"""
+        with self._write_lock:
+            conn = self._conn()
+            count = 0
+            with conn:
+                for table in ('social_media', 'contact', 'officials'):
+                    conn.execute(f"DELETE FROM {table}")
+                # Bulk inserts are faster without indexes to maintain; they are rebuilt below
+                for (name,) in conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL").fetchall():
+                    conn.execute(f"DROP INDEX {name}")
+                batch = []
+                for official in officials:
+                    batch.append(official)
+                    if len(batch) >= batch_size:
+                        self._insert(conn, count, batch)
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    self._insert(conn, count, batch)
+                    count += len(batch)
+                for statement in filter(str.strip, _INDEXES.split(';')):
+                    conn.execute(statement)
+                if self.has_fts:
+                    conn.execute("INSERT INTO officials_fts(officials_fts) VALUES ('rebuild')")
+            conn.execute("ANALYZE")
+        return count
+
+    def append(self, official: Dict[str, Any]) -> int:
+        """Add one official and return its position"""
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                official_id = conn.execute("SELECT COALESCE(MAX(id) + 1, 0) FROM officials").fetchone()[0]
+                self._insert(conn, official_id, [official])
+                if self.has_fts:
+                    conn.execute("INSERT INTO officials_fts (rowid, name, jurisdiction) VALUES (?, ?, ?)",
+                                 (official_id, official.get('name'), official.get('jurisdiction')))
+        return official_id
+
+    # Reading
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM officials").fetchone()[0]
+
+    def _counts(self, sql: str) -> Counter:
+        return Counter(dict(self._conn().execute(sql).fetchall()))
+
+    def summary(self) -> OfficialsSummary:
+        """Party, designation and social platform counts, computed by SQL"""
+        summary = OfficialsSummary()
+        summary.total = len(self)
+        summary.parties = self._counts(
+            "SELECT party, COUNT(*) FROM officials WHERE party IS NOT NULL GROUP BY party")
+        summary.designations = self._counts(
+            "SELECT designation, COUNT(*) FROM officials WHERE designation IS NOT NULL GROUP BY designation")
+        summary.social_platforms = self._counts(
+            "SELECT platform, COUNT(*) FROM social_media WHERE handle IS NOT NULL GROUP BY platform")
+        return summary
+
+    def count_by_party(self):
+        """Count officials by political party, shaped like DataAnalyzer.count_by_party"""
+        return self.summary().count_by_party()
+
+    def officials_by_designation(self):
+        """Group officials by designation, shaped like DataAnalyzer.officials_by_designation"""
+        return self.summary().officials_by_designation()
+
+    def search(self, name: Optional[str] = None, jurisdiction: Optional[str] = None,
+               party: Optional[str] = None, designation: Optional[str] = None,
+               prefix: bool = False) -> np.ndarray:
+        """Sorted positions of officials matching every given filter, like SearchIndex.search.
+
+        Name and jurisdiction match case-insensitively; substring queries of
+        three or more characters use the trigram index, shorter ones and
+        prefixes use LIKE (which only folds ASCII case).
+        """
+        clauses, params, phrases = [], [], []
+        for field, query in (('name', name), ('jurisdiction', jurisdiction)):
+            if not query:
+                continue
+            if self.has_fts and not prefix and len(query) >= 3:
+                # A trigram phrase query matches the substring anywhere, ignoring case
+                phrases.append(f'{field} : "{query.replace(chr(34), chr(34) * 2)}"')
+            else:
+                clauses.append(f"{field} LIKE ? ESCAPE '\\'")
+                params.append(_like_pattern(query, prefix))
+        if phrases:
+            clauses.append("id IN (SELECT rowid FROM officials_fts WHERE officials_fts MATCH ?)")
+            params.append(' AND '.join(phrases))
+        for field, value in (('party', party), ('designation', designation)):
+            if value is not None:
+                clauses.append(f"{field} = ?")
+                params.append(value)
+        sql = "SELECT id FROM officials"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        rows = self._conn().execute(sql + " ORDER BY id", params).fetchall()
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+    def fingerprint(self) -> str:
+        """Hash of the database and WAL file states; it changes whenever the store is written"""
+        parts: List[Any] = [self.db_path, len(self)]
+        for suffix in ('', '-wal'):
+            path = Path(self.db_path + suffix)
+            if path.exists():
+                stat = path.stat()
+                parts.extend([stat.st_mtime_ns, stat.st_size])
+        return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+    def columns(self) -> List[str]:
+        """Flattened column names, like those of a normalized officials DataFrame"""
+        conn = self._conn()
+        columns = list(OFFICIAL_FIELDS)
+        for field, (table, key_column, _) in NESTED_TABLES.items():
+            prefix = FLATTENED_FIELDS[field]
+            columns.extend(f'{prefix}_{key}' for (key,) in conn.execute(
+                f"SELECT DISTINCT {key_column} FROM {table} ORDER BY {key_column}"))
+        return columns
+
+    @staticmethod
+    def _sort_expression(column: str) -> Tuple[str, str, List[Any]]:
+        """(SQL expression, join, join parameters) for sorting by a flattened column"""
+        if column in OFFICIAL_FIELDS:
+            return f"o.{column}", "", []
+        for field, (table, key_column, value_column) in NESTED_TABLES.items():
+            prefix = FLATTENED_FIELDS[field] + '_'
+            if column.startswith(prefix):
+                join = f" LEFT JOIN {table} AS s ON s.official_id = o.id AND s.{key_column} = ?"
+                return f"s.{value_column}", join, [column[len(prefix):]]
+        raise ValueError(f"Cannot sort by unknown column: {column}")
+
+    def sort_order(self, column: str, descending: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions sorted by a flattened column, rank of each position in that order).
+
+        Sorting ignores ASCII case, puts missing values last and keeps ties in
+        position order. The result is computed by SQL once and cached until
+        fingerprint() changes, so writes from other processes are seen too.
+        Positions added after the order was taken are not in ranks.
+        """
+        key = (column, descending)
+        # Taken before reading, so a write racing the query only costs a rebuild
+        state = self.fingerprint()
+        with self._orders_lock:
+            if self._orders_state != state:
+                self._orders.clear()
+                self._orders_state = state
+            if key in self._orders:
+                return self._orders[key]
+        expression, join, params = self._sort_expression(column)
+        direction = "DESC" if descending else "ASC"
+        rows = self._conn().execute(
+            f"SELECT o.id FROM officials AS o{join} "
+            f"ORDER BY {expression} IS NULL, {expression} COLLATE NOCASE {direction}, o.id", params).fetchall()
+        order = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        ranks = np.full(int(order.max()) + 1 if len(order) else 0, len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        with self._orders_lock:
+            if self._orders_state == state:
+                self._orders[key] = (order, ranks)
+        return order, ranks
+
+    def social_positions(self) -> np.ndarray:
+        """Sorted positions of officials with at least one social media handle"""
+        rows = self._conn().execute(
+            "SELECT DISTINCT official_id FROM social_media WHERE handle IS NOT NULL ORDER BY official_id").fetchall()
+        return np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+
+    def _fetch(self, conn: sqlite3.Connection, sql: str, params: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Rebuild officials from the rows selected by sql, in its order"""
+        rows = conn.execute(sql, params).fetchall()
+        ids = json.dumps([row[0] for row in rows])
+        nested: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        for field, (table, key_column, value_column) in NESTED_TABLES.items():
+            nested[field] = {}
+            for official_id, key, value in conn.execute(
+                    f"SELECT official_id, {key_column}, {value_column} FROM {table} "
+                    f"WHERE official_id IN (SELECT value FROM json_each(?)) ORDER BY rowid", (ids,)):
+                nested[field].setdefault(official_id, {})[key] = value
+
+        officials = []
+        for official_id, *values, extra in rows:
+            official = {field: value for field, value in zip(OFFICIAL_FIELDS, values) if value is not None}
+            for field in NESTED_TABLES:
+                if official_id in nested[field]:
+                    official[field] = nested[field][official_id]
+            if extra:
+                official.update(json.loads(extra))
+            officials.append(official)
+        return officials
+
+    def get(self, positions: Sequence[int]) -> List[Dict[str, Any]]:
+        """Officials at the given positions, in the given order"""
+        return self._fetch(
+            self._conn(),
+            "SELECT o.id, o.name, o.designation, o.jurisdiction, o.party, o.extra "
+            "FROM json_each(?) AS p JOIN officials AS o ON o.id = p.value ORDER BY p.key",
+            (json.dumps([int(position) for position in positions]),)
+        )
+
+    def iter_officials(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """Yield every official in position order, one batch in memory at a time"""
+        conn = self._conn()
+        last_id = -1
+        while True:
+            ids = [row[0] for row in conn.execute(
+                "SELECT id FROM officials WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size))]
+            if not ids:
+                return
+            yield from self.get(ids)
+            last_id = ids[-1]
+
+_stores: Dict[str, OfficialsStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(db_path: str) -> OfficialsStore:
+    """The shared store for a database file (one per process, with per-thread connections)"""
+    key = str(Path(db_path).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = OfficialsStore(db_path)
+        return _stores[key]
@@ -1,31 +1,188 @@
-from jsonschema import validate, ValidationError
-from typing import Dict, List, Any
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, List, Any, Iterable, Sequence, Tuple, Optional
 from pathlib import Path
 import json
+import threading
+import time
+
+from src.data_loader import DataLoader
+from src.profiling import profiled, argument_records
+from src.schema_compiler import CompiledValidator, compile_schema
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Compiled validators shared by every DataValidator, keyed by schema path and mtime
+_compiled_cache: Dict[Tuple[str, int], Tuple[Dict[str, Any], Any, Any, CompiledValidator]] = {}
+_compiled_lock = threading.Lock()
+
+
+@dataclass
+class RecordError:
+    """A single schema violation in one official record.
+
+    index is the record's position in its source file, named by source when
+    the records came from several files.
+    """
+    index: int
+    field: str
+    message: str
+    source: Optional[str] = None
+
+
+@dataclass
+class ValidationReport:
+    """Outcome of validating a batch of officials"""
+    total: int = 0
+    errors: List[RecordError] = field(default_factory=list)
+    document_errors: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors and not self.document_errors
+
+    @property
+    def invalid_indices(self) -> List[int]:
+        return sorted({error.index for error in self.errors})
+
+    @property
+    def invalid_records(self) -> int:
+        """Number of invalid records, counted per source file"""
+        return len({(error.source, error.index) for error in self.errors})
+
+    @property
+    def records_per_sec(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def summary(self, limit: int = 10) -> List[str]:
+        """Human-readable lines describing the first `limit` errors"""
+        lines = [f"document: {message}" for message in self.document_errors]
+        for error in self.errors[:limit]:
+            where = f"{error.source} record" if error.source else "record"
+            lines.append(f"{where} {error.index} [{error.field}]: {error.message}")
+        if len(self.errors) > limit:
+            lines.append(f"... and {len(self.errors) - limit} more error(s)")
+        return lines
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "invalid_records": self.invalid_records,
+            "errors": [{key: value for key, value in vars(error).items()
+                        if key != 'source' or value is not None} for error in self.errors],
+            "document_errors": self.document_errors,
+            "elapsed": self.elapsed,
+            "records_per_sec": self.records_per_sec,
+        }
+
+
+def _compile(schema_file: str) -> Tuple[Dict[str, Any], Any, Any, CompiledValidator]:
+    """Load and compile a schema once per file version"""
+    path = Path(schema_file)
+    if not path.exists():
+        raise FileNotFoundError(f"Schema file not found: {schema_file}")
+
+    key = (str(path.resolve()), path.stat().st_mtime_ns)
+    with _compiled_lock:
+        compiled = _compiled_cache.get(key)
+    if compiled is not None:
+        return compiled
+
+    # jsonschema takes a while to import; commands that never validate should not pay for it
+    from jsonschema.validators import validator_for
+
+    with open(path, 'r', encoding='utf-8') as f:
+        schema = json.load(f)
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    item_schema = schema.get('properties', {}).get('officials', {}).get('items', {})
+    # Records go through generated code; jsonschema checks the document around them
+    compiled = (schema, cls(schema), cls(item_schema), compile_schema(item_schema, cls))
+
+    with _compiled_lock:
+        _compiled_cache[key] = compiled
+    return compiled
+
+
+def _error_field(path: Tuple[Any, ...]) -> str:
+    """Dotted path of the offending field within a record"""
+    return '.'.join(str(part) for part in path) or '<record>'
+
 
 class DataValidator:
     def __init__(self, schema_file: str):
-        self.schema = self._load_schema(schema_file)
-    
-    def _load_schema(self, schema_file: str) -> Dict[str, Any]:
-        """Load JSON schema from file"""
-        path = Path(schema_file)
-        if not path.exists():
-            raise FileNotFoundError(f"Schema file not found: {schema_file}")
-        
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
+        self.schema, self._validator, self._record_validator, self._record_check = _compile(schema_file)
+
+    @profiled('validate_data', records=argument_records(1))
     def validate_data(self, data: Dict[str, Any]) -> bool:
         """Validate data against schema"""
-        try:
-            validate(instance=data, schema=self.schema)
-            return True
-        except ValidationError as e:
-            print(f"Validation error: {e.message}")
+        from jsonschema.exceptions import best_match
+        error = best_match(self._validator.iter_errors(data))
+        if error is not None:
+            print(f"Validation error: {error.message}")
             return False
-    
+        return True
+
+    def document_errors(self, shell: Dict[str, Any]) -> List[str]:
+        """Schema violations of a document outside its officials (pass it with "officials": [])"""
+        return [error.message for error in self._validator.iter_errors(shell)]
+
     def validate_official(self, official: Dict[str, Any]) -> bool:
         """Validate a single official against the schema"""
-        dummy_data = {"officials": [official]}
-        return self.validate_data(dummy_data)
\ No newline at end of file
+        if self._record_check.is_valid(official):
+            return True
+        from jsonschema.exceptions import best_match
+        error = best_match(self._record_validator.iter_errors(official))
+        if error is not None:
+            print(f"Validation error: {error.message}")
+            return False
+        return True
+
+    def record_errors(self, official: Dict[str, Any], index: int = 0) -> List[RecordError]:
+        """Collect every schema violation in a single official"""
+        return [
+            RecordError(index, _error_field(path), message)
+            for path, message in self._record_check.errors(official)
+        ]
+
+    def validate_chunk(self, officials: List[Dict[str, Any]], start_index: int = 0) -> List[RecordError]:
+        """Collect errors for a chunk of officials, numbered from start_index"""
+        is_valid = self._record_check.is_valid
+        errors = []
+        for offset, official in enumerate(officials):
+            if not is_valid(official):
+                errors.extend(self.record_errors(official, start_index + offset))
+        return errors
+
+    @profiled('validate_records', records=argument_records(1))
+    def validate_records(self, officials: Iterable[Dict[str, Any]],
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> ValidationReport:
+        """Validate officials in chunks and report every invalid record"""
+        report = ValidationReport()
+        started = time.perf_counter()
+        iterator = iter(officials)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            report.errors.extend(self.validate_chunk(chunk, report.total))
+            report.total += len(chunk)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    @profiled('validate_report', records=argument_records(1))
+    def validate_report(self, data: Dict[str, Any],
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> ValidationReport:
+        """Validate a whole document, reporting every invalid record instead of the first"""
+        officials: Optional[Sequence[Dict[str, Any]]] = None
+        shell = data
+        if isinstance(data, dict) and DataLoader.is_officials_list(data.get('officials')):
+            officials = data['officials']
+            shell = dict(data, officials=[])
+
+        started = time.perf_counter()
+        report = self.validate_records(officials or [], chunk_size)
+        report.document_errors = self.document_errors(shell)
+        report.elapsed = time.perf_counter() - started
+        return report
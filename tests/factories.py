@@ -0,0 +1,128 @@
+"""Deterministic officials and fuzzed records for the tests.
+
+Kept separate from benchmarks/ so the suite does not change when the
+benchmark scripts do.
+"""
+import random
+from typing import Dict, List, Any
+
+from jsonschema.validators import validator_for
+
+from src.schema_compiler import compile_schema, error_path
+
+PARTIES = ['Democratic', 'Republican', 'Independent', 'Green']
+PARTY_WEIGHTS = [45, 45, 8, 2]
+DESIGNATIONS = ['U.S. Senator', 'Governor', 'Mayor', 'State Representative', 'Council Member']
+DESIGNATION_WEIGHTS = [1, 1, 10, 25, 50]
+FIRST_NAMES = ['Alex', 'Maria', 'John', 'Priya', 'Wei', 'Fatima', 'Carlos', 'Grace']
+LAST_NAMES = ['Smith', 'Garcia', 'Nguyen', 'Johnson', 'Patel', 'Okafor', 'Rossi', 'Cohen']
+
+
+def make_official(i: int, rng: random.Random) -> Dict[str, Any]:
+    """One schema-valid official; the index keeps names and handles unique"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    official = {
+        "name": f"{first} {last} {i}",
+        "designation": rng.choices(DESIGNATIONS, DESIGNATION_WEIGHTS)[0],
+        "jurisdiction": f"District {i % 50}",
+    }
+    if rng.random() < 0.95:
+        official["party"] = rng.choices(PARTIES, PARTY_WEIGHTS)[0]
+    handle = f"{first[:4]}{last[:4]}{i}"
+    social_media = {}
+    if rng.random() < 0.7:
+        social_media["twitter"] = f"@{handle}"
+    if rng.random() < 0.3:
+        social_media["facebook"] = f"https://www.facebook.com/{handle}"
+    if rng.random() < 0.3:
+        social_media["instagram"] = f"@{handle}"
+    if social_media:
+        official["social_media"] = social_media
+    if rng.random() < 0.5:
+        official["contact"] = {"email": f"{handle.lower()}@example.gov", "phone": f"+1202{i:07d}"}
+    return official
+
+
+def make_officials(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """`count` officials, identical for the same seed"""
+    rng = random.Random(seed)
+    return [make_official(i, rng) for i in range(count)]
+
+
+# Schemas exercising arrays, numeric types, maxLength and keywords left to jsonschema
+EXTRA_SCHEMAS = [
+    {
+        "type": "object",
+        "properties": {
+            "name": {"type": ["string", "null"], "maxLength": 5, "minLength": 1},
+            "terms": {"type": "array", "items": {"type": "integer"}},
+            "score": {"type": "number"},
+            "flags": {"type": "array", "items": {"type": "object", "required": ["id"],
+                                                 "properties": {"id": {"type": "boolean"}}}},
+        },
+        "required": ["name", "terms"],
+    },
+    {
+        "type": "object",
+        "properties": {
+            "party": {"enum": ["Democratic", "Republican"]},
+            "name": {"type": "string", "pattern": "^[A-Z]"},
+            "contact": {"type": "object", "minProperties": 1, "additionalProperties": {"type": "string"}},
+        },
+        "additionalProperties": False,
+    },
+]
+
+
+def random_value(rng: random.Random, depth: int = 0) -> Any:
+    """Random JSON, biased towards values near the schema's limits"""
+    kind = rng.randrange(9 if depth < 2 else 7)
+    if kind == 0:
+        return None
+    if kind == 1:
+        return rng.choice([True, False])
+    if kind == 2:
+        return rng.randint(-3, 3)
+    if kind == 3:
+        return rng.choice([0.5, 2.0, -1.0, 1e300])
+    if kind in (4, 5, 6):
+        return rng.choice(['', 'a', 'ab', 'abcdef', 'A', '@x', '@toolong_handle_1234', 'https://twitter.com/x',
+                           'https://www.facebook.com/a.b', '+12025550100', '555', 'é', 'x' * 20, '\n'])
+    if kind == 7:
+        return [random_value(rng, depth + 1) for _ in range(rng.randrange(3))]
+    return {rng.choice(['id', 'name', 'twitter', 'phone', 'email', 'x', '1']): random_value(rng, depth + 1)
+            for _ in range(rng.randrange(3))}
+
+
+def mutate(value: Any, rng: random.Random, depth: int = 0) -> Any:
+    """A copy of value with a few random changes"""
+    if isinstance(value, dict):
+        value = dict(value)
+        for _ in range(rng.randrange(1, 3)):
+            action = rng.randrange(4)
+            if action == 0 and value:
+                del value[rng.choice(list(value))]
+            elif action == 1 and value:
+                key = rng.choice(list(value))
+                value[key] = mutate(value[key], rng, depth + 1)
+            elif action == 2:
+                value[rng.choice(['nickname', 'name', 'id', 'terms', 'score', 'zz', 'aa'])] = random_value(rng)
+            elif value:
+                value[rng.choice(list(value))] = random_value(rng)
+        return value
+    if isinstance(value, str) and rng.random() < 0.5:
+        return value[:rng.randrange(len(value) + 1)]
+    return random_value(rng, depth)
+
+
+def differences(schema: Dict[str, Any], instances: List[Any]) -> List[Any]:
+    """Instances where the generated validator disagrees with jsonschema"""
+    cls = validator_for(schema)
+    reference = cls(schema)
+    compiled = compile_schema(schema, cls)
+    mismatches = []
+    for instance in instances:
+        expected = [(error_path(error), error.message) for error in reference.iter_errors(instance)]
+        if compiled.errors(instance) != expected or compiled.is_valid(instance) != (not expected):
+            mismatches.append(instance)
+    return mismatches
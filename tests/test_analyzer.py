@@ -0,0 +1,35 @@
+from factories import make_officials
+from src.analyzer import DataAnalyzer
+
+
+def officials_frame():
+    return DataAnalyzer.officials_to_dataframe(make_officials(50))
+
+
+def test_normalize_is_idempotent():
+    df = DataAnalyzer.normalize(officials_frame())
+    assert DataAnalyzer.normalize(df) is df
+    assert not df.columns.duplicated().any()
+
+
+def test_projection_is_normalized_again():
+    df = DataAnalyzer.normalize(officials_frame())
+    projected = df[['name', 'social_media']].copy()
+    renormalized = DataAnalyzer.normalize(projected)
+    assert renormalized is not projected
+    assert DataAnalyzer.social_media_columns(renormalized) == DataAnalyzer.social_media_columns(df)
+    assert DataAnalyzer.normalize(renormalized) is renormalized
+
+
+def test_filtered_frame_keeps_its_expansion():
+    df = DataAnalyzer.normalize(officials_frame())
+    filtered = df[df['party'] == df['party'].iloc[0]]
+    assert DataAnalyzer.normalize(filtered) is filtered
+
+
+def test_flattened_columns_without_attrs_are_replaced():
+    df = DataAnalyzer.normalize(officials_frame())
+    df.attrs.clear()
+    renormalized = DataAnalyzer.normalize(df)
+    assert not renormalized.columns.duplicated().any()
+    assert set(renormalized.columns) == set(df.columns)
@@ -0,0 +1,102 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from factories import make_officials
+from src import columnar
+from src.analyzer import DataAnalyzer
+from src.cache import DatasetCache, export_dataset, load_dataset_bytes, load_dataset_file
+from src.data_loader import DataLoader
+from src.dataset import OfficialsDataset
+
+SCHEMA = str(Path(__file__).resolve().parent.parent / 'data' / 'schema.json')
+
+
+@dataclass
+class Entry:
+    value: int
+    nbytes: int = 10
+
+
+def test_concurrent_requests_load_once():
+    cache = DatasetCache(max_bytes=100)
+    loads = []
+
+    def load():
+        loads.append(1)
+        time.sleep(0.01)
+        return Entry(len(loads))
+
+    for _ in range(20):
+        cache.clear()
+        loads.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('key', load)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(loads) == 1
+        assert len({id(result) for result in results}) == 1
+        assert cache.nbytes == 10
+
+
+def test_byte_bound_evicts_oldest():
+    cache = DatasetCache(max_bytes=25)
+    for key in range(4):
+        cache.get_or_load(key, lambda: Entry(key))
+    assert len(cache) == 2
+    assert cache.nbytes == 20
+    assert cache.get_or_load(3, lambda: Entry(-1)).value == 3
+
+
+def test_failed_load_is_retried():
+    cache = DatasetCache()
+
+    def fail():
+        raise ValueError("broken")
+
+    try:
+        cache.get_or_load('key', fail)
+    except ValueError:
+        pass
+    assert cache.get_or_load('key', lambda: Entry(1)).value == 1
+    assert cache.nbytes == 10
+
+
+@pytest.mark.skipif(not columnar.has_pyarrow(), reason="pyarrow not installed")
+def test_arrow_snapshot_stays_a_table(tmp_path):
+    officials = make_officials(500)
+    path = str(tmp_path / 'officials.arrow')
+    columnar.write_officials(officials, path)
+    loaded = load_dataset_file(path, SCHEMA)
+    rows = DataLoader.get_officials(loaded.data)
+    assert isinstance(rows, columnar.TableOfficials)
+    assert loaded.report.valid and loaded.report.total == len(officials)
+    assert list(rows) == officials
+    assert rows[-1] == officials[-1] and list(rows[10:20]) == officials[10:20]
+    assert loaded.search_index().size == len(officials)
+
+
+@pytest.mark.skipif(not columnar.has_pyarrow(), reason="pyarrow not installed")
+@pytest.mark.parametrize('file_format', ['parquet', 'arrow'])
+def test_export_keeps_keys_first_seen_after_the_first_batch(file_format):
+    officials = [{"name": f"Official {i}", "designation": "Mayor", "jurisdiction": "District 1"}
+                 for i in range(columnar.DEFAULT_BATCH_SIZE + 10)]
+    officials.append({"name": "Late Official", "designation": "Mayor", "jurisdiction": "District 2",
+                      "party": "Green", "social_media": {"twitter": "@late"}})
+    exported = export_dataset(OfficialsDataset(officials), file_format, schema_file=SCHEMA)
+    table = columnar.read_table_bytes(exported.data, exported.file_name)
+    assert {'party', 'social_media'} <= set(table.column_names)
+    assert columnar.TableOfficials(table)[-1] == officials[-1]
+
+
+def test_cached_upload_counts_its_parsed_source():
+    content = json.dumps({"officials": make_officials(200)}).encode('utf-8')
+    loaded = load_dataset_bytes(content, 'officials.json', SCHEMA)
+    assert loaded.nbytes >= DataAnalyzer.memory_usage(loaded.df) + len(content)
@@ -0,0 +1,181 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE = ROOT / 'data' / 'officials.json'
+SCHEMA = ROOT / 'data' / 'schema.json'
+
+
+def run_main(*args):
+    return subprocess.run([sys.executable, str(ROOT / 'main.py'), *map(str, args)],
+                          capture_output=True, text=True, cwd=ROOT)
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return path
+
+
+def test_validate_accepts_sample():
+    result = run_main('validate', SAMPLE, '--schema', SCHEMA)
+    assert result.returncode == 0, result.stdout
+
+
+@pytest.mark.parametrize('document', [
+    {"officials_typo": []},
+    {"officials": 5},
+])
+def test_validate_rejects_document_errors(tmp_path, document):
+    report = tmp_path / 'report.json'
+    result = run_main('validate', write_json(tmp_path / 'doc.json', document),
+                      '--schema', SCHEMA, '--report', report)
+    assert result.returncode == 1, result.stdout
+    assert json.loads(report.read_text())['document_errors']
+
+
+def test_validate_rejects_invalid_record(tmp_path):
+    officials = json.loads(SAMPLE.read_text())['officials']
+    del officials[0]['name']
+    result = run_main('validate', write_json(tmp_path / 'bad.json', {"officials": officials}),
+                      '--schema', SCHEMA)
+    assert result.returncode == 1
+    assert "'name' is a required property" in result.stdout
+
+
+def invalid_roster(tmp_path):
+    officials = json.loads(SAMPLE.read_text())['officials'] * 20
+    officials = [dict(official) for official in officials]
+    del officials[3]['name']
+    officials[40]['designation'] = 7
+    return write_json(tmp_path / 'bad.json', {"officials": officials})
+
+
+@pytest.mark.parametrize('mode', [['--stream'], ['--workers', '2', '--chunk-size', '8']])
+def test_pipeline_exports_match_default_path(tmp_path, mode):
+    default = run_main('--input', SAMPLE, '--schema', SCHEMA,
+                       '--export-json', tmp_path / 'default.json', '--export-csv', tmp_path / 'default.csv')
+    assert default.returncode == 0, default.stdout
+    piped = run_main('--input', SAMPLE, '--schema', SCHEMA, *mode,
+                     '--export-json', tmp_path / 'piped.json', '--export-csv', tmp_path / 'piped.csv')
+    assert piped.returncode == 0, piped.stdout
+    assert (tmp_path / 'piped.json').read_bytes() == (tmp_path / 'default.json').read_bytes()
+    assert (tmp_path / 'piped.csv').read_bytes() == (tmp_path / 'default.csv').read_bytes()
+
+
+@pytest.mark.parametrize('mode', [[], ['--stream'], ['--workers', '2', '--chunk-size', '8']])
+def test_invalid_records_are_not_exported(tmp_path, mode):
+    export = tmp_path / 'out.json'
+    result = run_main('--input', invalid_roster(tmp_path), '--schema', SCHEMA, *mode, '--export-json', export)
+    assert "Data validation failed (2 invalid record(s))" in result.stdout
+    assert not export.exists()
+    assert [path.name for path in tmp_path.iterdir()] == ['bad.json']
+
+
+@pytest.mark.parametrize('mode', [[], ['--stream'], ['--workers', '2']])
+def test_document_errors_are_not_exported(tmp_path, mode):
+    export = tmp_path / 'out.json'
+    result = run_main('--input', write_json(tmp_path / 'doc.json', {"officials_typo": []}),
+                      '--schema', SCHEMA, *mode, '--export-json', export)
+    assert "'officials' is a required property" in result.stdout
+    assert not export.exists()
+
+
+@pytest.mark.parametrize('flags', [
+    ['--incremental', '--input', ROOT / 'data'],
+    ['--sqlite', 'officials.db', '--dedupe'],
+    ['--sqlite', 'officials.db', '--incremental'],
+    ['--sqlite', 'officials.db', '--input', ROOT / 'data'],
+    ['--dedupe', '--incremental'],
+    ['--incremental', '--workers', '2'],
+    ['--merge-duplicates'],
+    ['--source-field', 'source'],
+])
+def test_unsupported_flag_combinations_are_rejected(tmp_path, flags):
+    result = run_main(*flags, '--export-json', tmp_path / 'out.json')
+    assert result.returncode == 2
+    assert 'error:' in result.stderr
+    assert not (tmp_path / 'out.json').exists()
+
+
+def strict_schema(tmp_path):
+    """data/schema.json plus a required field the sample does not have"""
+    schema = json.loads(SCHEMA.read_text())
+    schema['properties']['officials']['items']['required'].append('birthday')
+    return write_json(tmp_path / 'strict.json', schema)
+
+
+@pytest.mark.parametrize('before', [True, False])
+def test_flags_before_the_command_are_kept(tmp_path, before):
+    schema = ['--schema', strict_schema(tmp_path)]
+    args = [*schema, 'validate', SAMPLE] if before else ['validate', SAMPLE, *schema]
+    result = run_main(*args)
+    assert result.returncode == 1, result.stdout
+
+
+def test_export_flags_before_the_command_are_kept(tmp_path):
+    export = tmp_path / 'out.json'
+    result = run_main('--export-json', export, '--chunk-size', '1', 'export', SAMPLE)
+    assert result.returncode == 0, result.stdout
+    assert len(json.loads(export.read_text())['officials']) == 3
+
+
+def test_validate_counts_invalid_records_per_file(tmp_path):
+    roster = json.loads(SAMPLE.read_text())
+    bad = dict(roster['officials'][0], name='X')
+    for name in ('a.json', 'b.json'):
+        write_json(tmp_path / name, {"officials": [bad] + roster['officials'][1:]})
+    report = tmp_path / 'report.json'
+    result = run_main('validate', tmp_path / '*.json', '--schema', SCHEMA, '--report', report, '--workers', '1')
+    assert result.returncode == 1, result.stdout
+    assert "2 invalid record(s)" in result.stdout
+    assert str(tmp_path / 'a.json') in result.stdout and str(tmp_path / 'b.json') in result.stdout
+    written = json.loads(report.read_text())
+    assert written['invalid_records'] == 2
+    assert {error['source'] for error in written['errors']} == {str(tmp_path / 'a.json'), str(tmp_path / 'b.json')}
+
+
+def test_sqlite_reports_invalid_input_on_every_run(tmp_path):
+    args = ('--input', invalid_roster(tmp_path), '--schema', SCHEMA, '--sqlite', tmp_path / 'officials.db')
+    for _ in range(2):
+        result = run_main(*args)
+        assert "Data validation failed for 2 record(s)" in result.stdout, result.stdout
+        assert "already in" not in result.stdout
+    valid = ('--input', SAMPLE, '--schema', SCHEMA, '--sqlite', tmp_path / 'valid.db')
+    run_main(*valid)
+    assert "Using 3 officials already in" in run_main(*valid).stdout
+
+
+@pytest.mark.parametrize('mode', [
+    [], ['--stream'], ['--workers', '2'], ['--dedupe'], ['--incremental'], ['--sqlite', 'officials.db'],
+])
+@pytest.mark.parametrize('valid', [True, False])
+def test_exit_status_reports_invalid_input(tmp_path, mode, valid):
+    roster = SAMPLE if valid else invalid_roster(tmp_path)
+    mode = [tmp_path / value if value.endswith('.db') else value for value in mode]
+    result = run_main('--input', roster, '--schema', SCHEMA, *mode, '--export-json', tmp_path / 'out.json')
+    assert result.returncode == (0 if valid else 1), result.stdout
+
+
+@pytest.mark.parametrize('valid', [True, False])
+def test_exit_status_for_directory_input(tmp_path, valid):
+    directory = tmp_path / 'rosters'
+    directory.mkdir()
+    write_json(directory / 'a.json', json.loads(SAMPLE.read_text()))
+    if not valid:
+        write_json(directory / 'b.json', {"officials": [{"name": "X"}]})
+    result = run_main('--input', directory, '--schema', SCHEMA, '--export-json', tmp_path / 'out.json')
+    assert result.returncode == (0 if valid else 1), result.stdout
+
+
+def test_stream_profile_breaks_down_stages(tmp_path):
+    profile = tmp_path / 'profile.json'
+    result = run_main('--input', SAMPLE, '--schema', SCHEMA, '--stream', '--analyze',
+                      '--export-csv', tmp_path / 'out.csv', '--profile-output', profile)
+    assert result.returncode == 0, result.stdout
+    stages = {stage['name']: stage for stage in json.loads(profile.read_text())['stages']}
+    for name in ('pipeline.read', 'pipeline.validate', 'pipeline.flatten', 'pipeline.export', 'pipeline.analyze'):
+        assert stages[name]['records'] == 3, name
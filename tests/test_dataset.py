@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from factories import make_official, make_officials
+from src.analyzer import DataAnalyzer
+from src.dataset import OfficialsDataset
+
+
+def check_consistency(dataset):
+    """Running counters must match DataAnalyzer on a DataFrame rebuilt from every official"""
+    df = DataAnalyzer.normalize(DataAnalyzer.officials_to_dataframe(list(dataset.officials())))
+    summary = dataset.summary
+    assert len(dataset) == len(df)
+    assert summary.unique_parties == df['party'].nunique()
+    assert summary.unique_designations == df['designation'].nunique()
+    expected = DataAnalyzer.count_by_party(df).sort_values('party').reset_index(drop=True)
+    actual = dataset.count_by_party().sort_values('party').reset_index(drop=True)
+    assert expected['party'].tolist() == actual['party'].tolist()
+    assert expected['count'].tolist() == actual['count'].tolist()
+    expected = DataAnalyzer.officials_by_designation(df)
+    actual = dataset.officials_by_designation()
+    assert expected['designation'].tolist() == actual['designation'].tolist()
+    assert expected['count'].tolist() == actual['count'].tolist()
+    social_columns = DataAnalyzer.social_media_columns(df)
+    assert set(summary.social_platforms) == {col.split('_', 1)[1] for col in social_columns
+                                             if df[col].notna().any()}
+    for col in social_columns:
+        assert summary.social_platforms[col.split('_', 1)[1]] == df[col].notna().sum(), col
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_counters_match_recompute_after_appends(compact):
+    officials = make_officials(500, seed=3)
+    dataset = OfficialsDataset(officials, compact=compact)
+    check_consistency(dataset)
+
+    rng = random.Random(4)
+    added = [make_official(500 + i, rng) for i in range(20)]
+    # A party, a designation and a social platform the base roster does not have
+    added.append({"name": "Nia Brook", "designation": "Harbour Master", "jurisdiction": "Port",
+                  "party": "Tidal Party", "social_media": {"mastodon": "@nia@example.social"}})
+    added.append({"name": "Omar Reyes", "designation": "Mayor", "jurisdiction": "Town",
+                  "party": "Tidal Party", "social_media": {"mastodon": "@omar@example.social",
+                                                           "twitter": None}})
+    added.append({"name": "Pat Lee", "designation": "Mayor", "jurisdiction": "Town"})
+    for official in added:
+        dataset.append(official)
+        check_consistency(dataset)
+
+    assert dataset.summary.parties['Tidal Party'] == 2
+    assert dataset.summary.social_platforms['mastodon'] == 2
+    assert len(officials) == 500
+
+
+def test_appends_do_not_change_shared_base():
+    officials = make_officials(100, seed=5)
+    base = OfficialsDataset(officials)
+    counts = base.count_by_party()
+    session = OfficialsDataset(officials, base.df, base.summary)
+    session.append({"name": "Nia Brook", "designation": "Mayor", "jurisdiction": "Port", "party": "Tidal Party"})
+    assert base.count_by_party().equals(counts)
+    assert len(base) == 100 and len(session) == 101
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+
+import pytest
+
+from src.columnar import ColumnarStreamWriter
+from src.exporter import DataExporter, CSVStreamWriter, JSONStreamWriter
+
+OFFICIALS = [
+    {"name": "Ada Lovelace", "designation": "Senator", "jurisdiction": "State",
+     "social_media": {"twitter": "@ada"}},
+    {"name": "Alan Turing", "designation": "Mayor", "jurisdiction": "City",
+     "contact": {"email": "alan@example.org"}},
+]
+FIELDNAMES = ['contact_email', 'designation', 'jurisdiction', 'name', 'social_twitter']
+
+
+def failing(officials):
+    yield from officials
+    raise RuntimeError("source failed")
+
+
+def test_json_export_matches_json_dump(tmp_path):
+    path = tmp_path / 'out.json'
+    DataExporter.export_to_json(iter(OFFICIALS), str(path))
+    assert path.read_text(encoding='utf-8') == json.dumps({"officials": OFFICIALS}, indent=2)
+    assert not (tmp_path / 'out.json.tmp').exists()
+
+
+def test_csv_export_reads_back(tmp_path):
+    path = tmp_path / 'out.csv'
+    DataExporter.export_to_csv(OFFICIALS, str(path))
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['name'] for row in rows] == ['Ada Lovelace', 'Alan Turing']
+    assert rows[0]['social_twitter'] == '@ada'
+
+
+@pytest.mark.parametrize('make_writer', [
+    lambda path: JSONStreamWriter(path),
+    lambda path: CSVStreamWriter(path, FIELDNAMES),
+    lambda path: CSVStreamWriter(path),
+    lambda path: ColumnarStreamWriter(path, file_format='parquet', batch_size=1),
+    lambda path: ColumnarStreamWriter(path, file_format='arrow', batch_size=1),
+])
+def test_failed_export_leaves_previous_file(tmp_path, make_writer):
+    path = tmp_path / 'out'
+    path.write_text('previous export', encoding='utf-8')
+    with pytest.raises(RuntimeError):
+        with make_writer(str(path)) as writer:
+            for official in failing(OFFICIALS):
+                writer.write(official)
+    assert path.read_text(encoding='utf-8') == 'previous export'
+    assert [p.name for p in tmp_path.iterdir()] == ['out']
+
+
+def test_failed_export_to_file_object_is_unterminated():
+    buffer = io.BytesIO()
+    with pytest.raises(RuntimeError):
+        with JSONStreamWriter(buffer) as writer:
+            for official in failing(OFFICIALS):
+                writer.write(official)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(buffer.getvalue())
+
+
+def test_failed_append_is_unterminated(tmp_path):
+    path = tmp_path / 'out.json'
+    DataExporter.export_to_json(OFFICIALS[:1], str(path))
+    with pytest.raises(RuntimeError):
+        with JSONStreamWriter(str(path), append=True) as writer:
+            for official in failing(OFFICIALS[1:]):
+                writer.write(official)
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(path.read_text(encoding='utf-8'))
+
+
+@pytest.mark.parametrize('compression', [None, 'gzip'])
+def test_in_memory_export_matches_file(tmp_path, compression):
+    import gzip
+    path = tmp_path / 'out.json'
+    DataExporter.export_to_json(OFFICIALS, str(path))
+    data = DataExporter.export_to_bytes(OFFICIALS, 'json', compression)
+    assert (gzip.decompress(data) if compression else data) == path.read_bytes()
@@ -0,0 +1,55 @@
+import json
+import random
+from pathlib import Path
+
+import pytest
+from jsonschema import validators
+from jsonschema.exceptions import ValidationError
+from jsonschema.validators import validator_for
+
+from factories import EXTRA_SCHEMAS, differences, make_officials, mutate, random_value
+from src import schema_compiler
+from src.schema_compiler import compile_schema, messages_match
+
+SCHEMA_FILE = Path(__file__).resolve().parent.parent / 'data' / 'schema.json'
+DOCUMENT_SCHEMA = json.loads(SCHEMA_FILE.read_text(encoding='utf-8'))
+RECORD_SCHEMA = DOCUMENT_SCHEMA['properties']['officials']['items']
+
+
+def fuzzed_records(seed, count=3000):
+    rng = random.Random(seed)
+    base = make_officials(200, seed)
+    records = [mutate(rng.choice(base), rng) if rng.random() < 0.8 else rng.choice(base)
+               for _ in range(count)]
+    return records + [random_value(rng) for _ in range(count // 10)]
+
+
+@pytest.mark.parametrize('schema', [RECORD_SCHEMA] + EXTRA_SCHEMAS)
+def test_same_errors_as_jsonschema(schema):
+    schema = dict(schema, **{'$schema': DOCUMENT_SCHEMA['$schema']})
+    assert differences(schema, fuzzed_records(seed=len(json.dumps(schema)))) == []
+
+
+def test_installed_jsonschema_messages_are_compiled():
+    compiled = compile_schema(RECORD_SCHEMA, validator_for(DOCUMENT_SCHEMA))
+    assert compiled.fallbacks == 0
+
+
+def test_reworded_messages_are_detected():
+    def min_length(validator, length, instance, schema):
+        if validator.is_type(instance, 'string') and len(instance) < length:
+            yield ValidationError(f"{instance!r} is shorter than {length}")
+
+    reworded = validators.extend(validators.Draft7Validator, {'minLength': min_length})
+    assert messages_match(validators.Draft7Validator)
+    assert not messages_match(reworded)
+
+
+def test_falls_back_when_messages_differ(monkeypatch):
+    monkeypatch.setattr(schema_compiler, 'messages_match', lambda cls: False)
+    cls = validator_for(DOCUMENT_SCHEMA)
+    compiled = compile_schema(RECORD_SCHEMA, cls)
+    assert compiled.fallbacks == 1
+    reference = cls(RECORD_SCHEMA)
+    for record in fuzzed_records(seed=1, count=300):
+        assert compiled.is_valid(record) == reference.is_valid(record)
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from factories import make_officials
+from src.dataset import StoreDataset
+from src.sqlite_store import OfficialsStore
+
+
+def open_pair(tmp_path, officials):
+    """Two stores on one database file, like the app and a `main.py --sqlite` run"""
+    path = str(tmp_path / 'officials.db')
+    writer = OfficialsStore(path)
+    writer.load(officials)
+    return writer, OfficialsStore(path)
+
+
+def test_sort_order_sees_writes_from_another_store(tmp_path):
+    officials = make_officials(50)
+    writer, reader = open_pair(tmp_path, officials)
+    order, _ = reader.sort_order('name')
+    assert len(order) == 50
+
+    writer.load(officials[:20])
+    order, ranks = reader.sort_order('name')
+    assert len(order) == 20 and len(ranks) == 20
+
+    writer.append({"name": "Aaron Aardvark", "designation": "Mayor", "jurisdiction": "District 1"})
+    order, _ = reader.sort_order('name')
+    assert order[0] == 20
+
+
+def test_page_places_unranked_positions_last(tmp_path, monkeypatch):
+    writer, reader = open_pair(tmp_path, make_officials(30))
+    dataset = StoreDataset(reader)
+    # Keep the cached order stale, as between a write and the next fingerprint check
+    monkeypatch.setattr(reader, 'fingerprint', lambda: 'unchanged')
+    dataset.page(0, 10, sort='name')
+    new_id = writer.append({"name": "Aaron Aardvark", "designation": "Mayor", "jurisdiction": "District 1"})
+    page = dataset.page(0, 5, positions=np.array([new_id, 1, 0]), sort='name')
+    assert len(page) == 3
+    assert page['name'].iloc[-1] == "Aaron Aardvark"
+
+
+def test_take_rejects_missing_positions(tmp_path):
+    store = OfficialsStore(str(tmp_path / 'officials.db'))
+    officials = make_officials(10)
+    store.load(officials)
+    dataset = StoreDataset(store)
+    df = dataset.take([7, 2])
+    assert list(df.index) == [7, 2]
+    assert df['name'].tolist() == [officials[7]['name'], officials[2]['name']]
+    with pytest.raises(IndexError):
+        dataset.take([2, 10, 3])